@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩配置基准测试 - 对比各预设在样本语料上的吞吐量与压缩率
+
+用法: python benchmarks/compression_profiles.py [语料目录]
+未指定目录时在临时目录中生成混合样本 (文本、半结构化数据、随机数据)。
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+src_path = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from core.archive_manager import ArchiveManager
+from utils.helpers import format_size
+
+PRESETS = ('fastest', 'balanced', 'smallest')
+FORMATS = ('zip', '7z')
+
+
+def generate_corpus(directory: Path, total_size: int = 32 * 1024 * 1024):
+    """生成样本语料：约一半文本，四分之一 CSV，四分之一随机数据"""
+    rng = random.Random(2025)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+             for _ in range(2000)]
+    
+    text_dir = directory / 'text'
+    text_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(16):
+        with open(text_dir / f'doc_{i}.txt', 'w', encoding='utf-8') as f:
+            written = 0
+            while written < total_size // 32:
+                line = ' '.join(rng.choice(words) for _ in range(12)) + '\n'
+                written += f.write(line)
+    
+    with open(directory / 'data.csv', 'w', encoding='utf-8') as f:
+        written = 0
+        while written < total_size // 4:
+            row = f"{rng.randint(1, 10 ** 6)},{rng.choice(words)},{rng.random():.6f}\n"
+            written += f.write(row)
+    
+    with open(directory / 'random.bin', 'wb') as f:
+        f.write(os.urandom(total_size // 4))
+
+
+def corpus_size(directory: Path) -> int:
+    """语料的总字节数"""
+    return sum(p.stat().st_size for p in directory.rglob('*') if p.is_file())
+
+
+def run(corpus: Path, output_dir: Path):
+    """对每种格式与预设创建一次压缩包并打印结果"""
+    manager = ArchiveManager(str(output_dir / 'bench.db'))
+    original = corpus_size(corpus)
+    print(f"语料: {corpus} ({format_size(original)})")
+    print(f"{'格式':<6}{'预设':<10}{'耗时(s)':>10}{'吞吐(MB/s)':>12}{'大小':>12}{'压缩率':>8}")
+    
+    try:
+        for format_type in FORMATS:
+            for preset in PRESETS:
+                archive_path = output_dir / f'bench_{preset}.{format_type}'
+                start = time.perf_counter()
+                ok = manager.create_archive([str(corpus)], str(archive_path), format_type, profile=preset)
+                elapsed = time.perf_counter() - start
+                if not ok:
+                    print(f"{format_type:<6}{preset:<10}{'失败':>10}")
+                    continue
+                
+                size = archive_path.stat().st_size
+                throughput = original / elapsed / (1024 * 1024)
+                print(f"{format_type:<6}{preset:<10}{elapsed:>10.2f}{throughput:>12.1f}"
+                      f"{format_size(size):>12}{size / original:>8.1%}")
+                archive_path.unlink()
+    finally:
+        manager.close()
+
+
+def main():
+    """主函数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        if len(sys.argv) > 1:
+            corpus = Path(sys.argv[1])
+        else:
+            corpus = tmp_path / 'corpus'
+            generate_corpus(corpus)
+        run(corpus, tmp_path)
+
+
+if __name__ == "__main__":
+    main()
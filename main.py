@@ -15,7 +15,11 @@ src_path = Path(__file__).parent / 'src'
 sys.path.insert(0, str(src_path))
 
 def main():
-    """主函数"""
+    """主函数：带参数时运行命令行界面 (不导入 tkinter)，否则启动图形界面"""
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     try:
         from gui.main_window import MainWindow
         app = MainWindow()
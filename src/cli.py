@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行界面 - 无需图形环境的 zipmaster 命令 (不导入 tkinter)
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import List, Optional
+
+from core.archive_manager import ArchiveManager
+from utils.helpers import format_size, format_datetime
+
+# 与图形界面共用的默认索引数据库
+DEFAULT_DB = 'archives.db'
+
+# 按扩展名推断 create 的格式 (长后缀在前)
+CREATE_FORMATS = (
+    ('.tar.gz', 'tar.gz'), ('.tgz', 'tar.gz'),
+    ('.tar.bz2', 'tar.bz2'), ('.tbz2', 'tar.bz2'),
+    ('.tar.xz', 'tar.xz'), ('.txz', 'tar.xz'),
+    ('.tar', 'tar'), ('.zip', 'zip'), ('.7z', '7z'),
+)
+
+
+class _Progress:
+    """在终端的同一行显示进度 (stderr 不是终端时不显示)"""
+    
+    def __init__(self, label: str):
+        self.label = label
+        self.enabled = sys.stderr.isatty()
+        self.shown = False
+    
+    def __call__(self, done, total, stats=None):
+        if not self.enabled:
+            return
+        if total:
+            text = f"{self.label}: {done * 100 // total}% ({format_size(done)}/{format_size(total)})"
+        else:
+            text = f"{self.label}: {format_size(done)}"
+        sys.stderr.write('\r' + text.ljust(60))
+        sys.stderr.flush()
+        self.shown = True
+    
+    def close(self):
+        if self.shown:
+            sys.stderr.write('\n')
+            self.shown = False
+
+
+def _create_format(archive_path: str) -> Optional[str]:
+    """按扩展名推断压缩格式"""
+    name = archive_path.lower()
+    for suffix, format_type in CREATE_FORMATS:
+        if name.endswith(suffix):
+            return format_type
+    return None
+
+
+def cmd_scan(manager: ArchiveManager, args) -> int:
+    """扫描目录并更新索引"""
+    ok = True
+    for directory in args.directories:
+        try:
+            manager.scan_directory(directory, incremental=not args.full,
+                                   use_processes=args.processes)
+        except Exception as e:
+            print(f"扫描失败 {directory}: {e}", file=sys.stderr)
+            ok = False
+            continue
+        
+        # 与图形界面一样登记为扫描根目录，供实时监控使用
+        manager.add_scan_root(directory)
+        stats = manager.last_scan_stats
+        print(f"{directory}: 新增 {stats['added']}，更新 {stats['updated']}，"
+              f"未变化 {stats['unchanged']}，移除 {len(stats['removed'])}")
+    return 0 if ok else 1
+
+
+def cmd_search(manager: ArchiveManager, args) -> int:
+    """在索引中搜索压缩包"""
+    results = manager.search_archives(args.keyword, limit=args.limit)
+    for archive in results:
+        print(f"{format_size(archive['size'] or 0):>10}  {archive['file_count'] or 0:>7}  {archive['path']}")
+    return 0 if results else 1
+
+
+def cmd_list(manager: ArchiveManager, args) -> int:
+    """列出压缩包成员"""
+    try:
+        for member in manager.iter_archive_members(args.archive):
+            print(f"{format_size(member['size'] or 0):>10}  "
+                  f"{format_datetime(member['modified']):<19}  {member['name']}")
+    except BrokenPipeError:
+        raise
+    except Exception as e:
+        print(f"无法读取压缩包 {args.archive}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_extract(manager: ArchiveManager, args) -> int:
+    """解压压缩包"""
+    if args.delete and not args.sync:
+        print("--delete 只能与 --sync 一起使用", file=sys.stderr)
+        return 2
+    
+    progress = _Progress("解压")
+    try:
+        ok = manager.extract_archive(
+            args.archive, args.output, args.members or None, progress,
+            mode='sync' if args.sync else 'overwrite',
+            verify_crc=args.verify_crc, delete_extraneous=args.delete
+        )
+    finally:
+        progress.close()
+    
+    if ok and args.sync:
+        stats = manager.last_extract_stats
+        print(f"写出 {stats['extracted']}，跳过 {stats['skipped']}，删除 {stats['deleted']}")
+    return 0 if ok else 1
+
+
+def cmd_create(manager: ArchiveManager, args) -> int:
+    """创建压缩包"""
+    format_type = args.format or _create_format(args.archive)
+    if format_type is None:
+        print(f"无法从文件名推断格式，请使用 --format: {args.archive}", file=sys.stderr)
+        return 2
+    
+    progress = _Progress("压缩")
+    try:
+        ok = manager.create_archive(args.files, args.archive, format_type, progress,
+                                    profile=args.profile)
+    finally:
+        progress.close()
+    return 0 if ok else 1
+
+
+def cmd_verify(manager: ArchiveManager, args) -> int:
+    """校验压缩包完整性"""
+    failed = 0
+    for archive in args.archives:
+        progress = _Progress(os.path.basename(archive))
+        try:
+            ok = manager.verify_archive(archive, progress)
+        finally:
+            progress.close()
+        print(f"{'OK' if ok else '损坏'}  {archive}")
+        failed += not ok
+    return 0 if not failed else 1
+
+
+def cmd_stats(manager: ArchiveManager, args) -> int:
+    """显示索引统计"""
+    stats = manager.get_statistics()
+    if not stats:
+        return 1
+    
+    print(f"压缩包: {stats['archives']}")
+    print(f"总大小: {format_size(stats['total_size'])}")
+    print(f"成员总数: {stats['total_files']}")
+    print(f"监控目录: {stats['scan_roots']}")
+    for type_, count in stats['types'].items():
+        print(f"  {type_ or '?':<8} {count}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog='zipmaster', description="ZipMaster 压缩包管理工具")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"索引数据库路径 (默认 {DEFAULT_DB})")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出详细日志")
+    # 子命令之后也可以写 --db 与 -v；子命令中的默认值为 SUPPRESS，不会覆盖写在子命令之前的值
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', default=argparse.SUPPRESS, help="索引数据库路径")
+    common.add_argument('-v', '--verbose', action='store_true', default=argparse.SUPPRESS,
+                        help="输出详细日志")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+    
+    scan = commands.add_parser('scan', help="扫描目录并更新索引", parents=[common])
+    scan.add_argument('directories', nargs='+', metavar='DIR')
+    scan.add_argument('--full', action='store_true', help="重新探测全部压缩包 (默认增量)")
+    scan.add_argument('--processes', action='store_true', help="用进程池解析 7z 文件头")
+    scan.set_defaults(func=cmd_scan)
+    
+    search = commands.add_parser('search', help="在索引中搜索压缩包", parents=[common])
+    search.add_argument('keyword')
+    search.add_argument('--limit', type=int, default=1000)
+    search.set_defaults(func=cmd_search)
+    
+    list_ = commands.add_parser('list', help="列出压缩包成员", parents=[common])
+    list_.add_argument('archive')
+    list_.set_defaults(func=cmd_list)
+    
+    extract = commands.add_parser('extract', help="解压压缩包", parents=[common])
+    extract.add_argument('archive')
+    extract.add_argument('members', nargs='*', help="只解压这些成员 (默认全部)")
+    extract.add_argument('-o', '--output', default='.', help="输出目录 (默认当前目录)")
+    extract.add_argument('--sync', action='store_true', help="跳过输出目录中未变化的文件")
+    extract.add_argument('--verify-crc', action='store_true', help="同步时还比较 CRC")
+    extract.add_argument('--delete', action='store_true', help="同步时删除压缩包中没有的文件")
+    extract.set_defaults(func=cmd_extract)
+    
+    create = commands.add_parser('create', help="创建压缩包", parents=[common])
+    create.add_argument('archive')
+    create.add_argument('files', nargs='+', metavar='FILE')
+    create.add_argument('--format', choices=sorted({f for _, f in CREATE_FORMATS}),
+                        help="压缩格式 (默认按扩展名推断)")
+    create.add_argument('--profile', help="压缩预设: fastest/balanced/smallest")
+    create.set_defaults(func=cmd_create)
+    
+    verify = commands.add_parser('verify', help="校验压缩包完整性", parents=[common])
+    verify.add_argument('archives', nargs='+', metavar='ARCHIVE')
+    verify.set_defaults(func=cmd_verify)
+    
+    stats = commands.add_parser('stats', help="显示索引统计", parents=[common])
+    stats.set_defaults(func=cmd_stats)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回退出码"""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+    
+    try:
+        manager = ArchiveManager(args.db)
+    except Exception as e:
+        print(f"无法打开索引数据库 {args.db}: {e}", file=sys.stderr)
+        return 1
+    
+    try:
+        return args.func(manager, args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # 输出的读取方已提前退出 (如 | head)，避免解释器退出时再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
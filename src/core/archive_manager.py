@@ -5,24 +5,178 @@
 """
 
 import os
+import heapq
+import shutil
 import sqlite3
+import tempfile
 import threading
+import zlib
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
+from typing import BinaryIO, List, Dict, Optional, Callable, Iterable, Iterator, Tuple
 from datetime import datetime
 import logging
+import time
 
-# 压缩格式处理
-import py7zr
+# 压缩格式处理 (py7zr 与 rarfile 导入较慢，在第一次用到的函数中才导入)
 import zipfile
-import rarfile
-import patoolib
+
+from .database import ConnectionPool, BatchWriter
+from .cache import DetailsCache
+from .throttle import RateLimiter
+from .zipwriter import ParallelZipWriter, copy_entry
+from .profiles import CompressionProfile, resolve_profile
+from .compressibility import is_incompressible
+from .constants import CHUNK_SIZE
+from .paths import safe_member_path
+from .progress import ProgressTracker, TrackedReader
+from .jobs import JobCancelled
+from . import tarformat, zipindex
+
+
+def _count_members(file_path: str) -> int:
+    """获取压缩包内文件数量 (模块级函数，可在进程池中执行)"""
+    suffix = Path(file_path).suffix.lower()
+    
+    try:
+        if suffix == '.zip':
+            # 直接读取 EOCD 中的条目数，不构造 ZipInfo
+            return zipindex.count_entries(file_path)
+        elif suffix == '.7z':
+            import py7zr
+            with py7zr.SevenZipFile(file_path, mode='r') as szf:
+                return len(szf.getnames())
+        elif suffix == '.rar':
+            import rarfile
+            with rarfile.RarFile(file_path) as rf:
+                return len(rf.namelist())
+        elif suffix in tarformat.SUFFIXES:
+            return sum(1 for _ in tarformat.iter_members(file_path))
+        else:
+            return 0
+            
+    except Exception:
+        return 0
+
+
+def _iter_members(file_path: str) -> Iterator[Dict]:
+    """逐个产出压缩包内的条目"""
+    suffix = Path(file_path).suffix.lower()
+    
+    if suffix == '.zip':
+        # 直接解析中央目录，每个条目只是一个元组
+        for name, size, compressed_size, crc, dos_date, dos_time in zipindex.iter_entries(file_path):
+            yield {
+                'name': name,
+                'size': size,
+                'compressed_size': compressed_size,
+                'modified': zipindex.dos_datetime(dos_date, dos_time),
+                'crc': crc
+            }
+    elif suffix == '.7z':
+        import py7zr
+        with py7zr.SevenZipFile(file_path, mode='r') as szf:
+            for info in szf.list():
+                modified = info.creationtime if hasattr(info, 'creationtime') else datetime.now()
+                if modified is not None and modified.tzinfo is not None:
+                    # py7zr 返回带时区的时间，与其他格式一样统一为本地时间的 naive datetime
+                    modified = modified.astimezone().replace(tzinfo=None)
+                yield {
+                    'name': info.filename,
+                    'size': getattr(info, 'uncompressed', 0) or 0,
+                    # 固实压缩的成员没有独立的压缩大小
+                    'compressed_size': getattr(info, 'compressed', 0) or 0,
+                    'modified': modified,
+                    'crc': getattr(info, 'crc32', None)
+                }
+    elif suffix == '.rar':
+        import rarfile
+        with rarfile.RarFile(file_path) as rf:
+            for info in rf.infolist():
+                yield {
+                    'name': info.filename,
+                    'size': info.file_size,
+                    'compressed_size': info.compress_size,
+                    'modified': datetime(*info.date_time),
+                    'crc': info.CRC
+                }
+    elif suffix in tarformat.SUFFIXES:
+        yield from tarformat.iter_members(file_path)
+
+
+def _list_members(file_path: str) -> List[Dict]:
+    """列出压缩包内的全部条目 (模块级函数，可在进程池中执行)"""
+    return list(_iter_members(file_path))
+
+
+# 增量更新时不超过该大小的源文件总是比较 CRC (同大小、时间精度内的修改只有 CRC 能发现)
+UPDATE_CRC_MAX_SIZE = 1024 * 1024
+
+# UPSERT (INSERT ... ON CONFLICT DO UPDATE) 需要 SQLite 3.24+
+SQLITE_HAS_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+
+# 同步解压时修改时间之差小于该值视为相同 (ZIP/RAR 的 DOS 时间精度为 2 秒)
+SYNC_MTIME_TOLERANCE = 2.0
+
+
+def _member_from_row(row) -> Dict:
+    """成员索引的行转换为成员字典，modified 还原为 datetime (与直接读取压缩包时一致)"""
+    member = dict(row)
+    modified = member.get('modified')
+    if isinstance(modified, str):
+        try:
+            member['modified'] = datetime.fromisoformat(modified)
+        except ValueError:
+            member['modified'] = None
+    return member
+
+
+def _member_mtime(member: Dict) -> Optional[float]:
+    """成员修改时间的时间戳 (没有或无法解析时为 None)"""
+    modified = member.get('modified')
+    if isinstance(modified, str):
+        try:
+            modified = datetime.fromisoformat(modified)
+        except ValueError:
+            return None
+    if not isinstance(modified, datetime):
+        return None
+    return modified.timestamp()
+
+
+def _file_size(file_path: str) -> int:
+    """文件大小，无法读取时为 0"""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def _file_crc(file_path: str) -> int:
+    """计算文件内容的 CRC32"""
+    crc = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
 
 class ArchiveManager:
     """压缩包管理器"""
     
-    def __init__(self, db_path: str = "archives.db"):
+    # iter_archives 允许的排序列
+    SORTABLE_COLUMNS = ('name', 'path', 'size', 'modified', 'type', 'file_count')
+    
+    # ZIP 压缩数据总量低于此值时不值得启用并行解压
+    PARALLEL_EXTRACT_MIN_BYTES = 16 * 1024 * 1024
+    
+    def __init__(self, db_path: str = "archives.db", max_workers: Optional[int] = None,
+                 extract_workers: Optional[int] = None):
         self.db_path = db_path
+        # 扫描时并发探测压缩包的线程数 (读取文件头主要是 I/O 等待)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        # 解压单个 ZIP 时的并行线程数 (zlib 解压时释放 GIL)
+        self.extract_workers = extract_workers or os.cpu_count() or 1
         self.logger = logging.getLogger(__name__)
         
         # 支持的压缩格式及其处理器
@@ -31,64 +185,160 @@ class ArchiveManager:
             '.zip': self._handle_zip,
             '.rar': self._handle_rar,
             '.tar': self._handle_tar,
+            '.tgz': self._handle_tar,
+            '.tbz2': self._handle_tar,
+            '.txz': self._handle_tar,
             '.gz': self._handle_gz,
             '.bz2': self._handle_bz2,
             '.xz': self._handle_xz
         }
         
+        # 最近一次扫描的统计信息
+        self.last_scan_stats: Dict = {}
+        
+        # 详情缓存：内存 LRU，未命中时回落到数据库中的成员索引
+        self._details_cache = DetailsCache()
+        
+        # 持久化连接池：单一写连接 + 并发读连接 (WAL)
+        self._pool = ConnectionPool(db_path)
         self._init_database()
-        self._lock = threading.Lock()
     
     def _init_database(self):
         """初始化数据库"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 创建压缩包表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS archives (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    path TEXT UNIQUE NOT NULL,
-                    size INTEGER,
-                    modified DATETIME,
-                    type TEXT,
-                    file_count INTEGER,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # 创建文件表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS archive_files (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    archive_id INTEGER,
-                    name TEXT NOT NULL,
-                    path TEXT NOT NULL,
-                    size INTEGER,
-                    compressed_size INTEGER,
-                    modified DATETIME,
-                    FOREIGN KEY (archive_id) REFERENCES archives (id)
-                )
-            ''')
-            
-            # 创建索引
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_archives_path ON archives(path)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_archive ON archive_files(archive_id)')
-            
-            conn.commit()
-            conn.close()
-            
+            with self._pool.writer() as conn:
+                cursor = conn.cursor()
+                
+                # 创建压缩包表
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS archives (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        path TEXT UNIQUE NOT NULL,
+                        size INTEGER,
+                        modified DATETIME,
+                        type TEXT,
+                        file_count INTEGER,
+                        mtime_ns INTEGER,
+                        inode INTEGER,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # 创建文件表
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS archive_files (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        archive_id INTEGER,
+                        name TEXT NOT NULL,
+                        path TEXT NOT NULL,
+                        size INTEGER,
+                        compressed_size INTEGER,
+                        modified DATETIME,
+                        crc INTEGER,
+                        FOREIGN KEY (archive_id) REFERENCES archives (id)
+                    )
+                ''')
+                
+                # 创建扫描根目录表 (实时监控的目录)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS scan_roots (
+                        path TEXT PRIMARY KEY,
+                        added_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # 旧版本数据库补充指纹列 (用于增量扫描)
+                cursor.execute('PRAGMA table_info(archives)')
+                columns = {row[1] for row in cursor.fetchall()}
+                if 'mtime_ns' not in columns:
+                    cursor.execute('ALTER TABLE archives ADD COLUMN mtime_ns INTEGER')
+                if 'inode' not in columns:
+                    cursor.execute('ALTER TABLE archives ADD COLUMN inode INTEGER')
+                cursor.execute('PRAGMA table_info(archive_files)')
+                if 'crc' not in {row[1] for row in cursor.fetchall()}:
+                    cursor.execute('ALTER TABLE archive_files ADD COLUMN crc INTEGER')
+                
+                # 创建索引
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_archives_path ON archives(path)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_archive ON archive_files(archive_id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_name ON archive_files(name)')
+                # 分页排序列的索引 (索引隐含 rowid，天然按 (列, id) 有序)
+                for column in ('name', 'size', 'modified', 'type', 'file_count'):
+                    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_archives_{column} ON archives({column})')
+                
+                self._fts_enabled = self._create_fts(cursor)
+                
             self.logger.info("数据库初始化成功")
             
         except Exception as e:
             self.logger.error(f"数据库初始化失败: {e}")
             raise
     
-    def scan_directory(self, directory: str, progress_callback: Optional[Callable] = None) -> List[Dict]:
-        """扫描目录中的压缩包"""
+    def _create_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """创建 archives 的 FTS5 全文索引 (trigram 分词) 及同步触发器
+        
+        SQLite 未编译 FTS5 或版本过低 (trigram 需要 3.34+) 时返回 False，
+        搜索将退回 LIKE 查询。
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archives_fts'")
+        exists = cursor.fetchone() is not None
+        
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS archives_fts USING fts5(
+                    name, path, content='archives', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"全文索引不可用，搜索将使用 LIKE: {e}")
+            return False
+        
+        # 外部内容表需要触发器保持同步
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS archives_fts_ai AFTER INSERT ON archives BEGIN
+                INSERT INTO archives_fts(rowid, name, path) VALUES (new.id, new.name, new.path);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS archives_fts_ad AFTER DELETE ON archives BEGIN
+                INSERT INTO archives_fts(archives_fts, rowid, name, path)
+                VALUES ('delete', old.id, old.name, old.path);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS archives_fts_au AFTER UPDATE OF name, path ON archives BEGIN
+                INSERT INTO archives_fts(archives_fts, rowid, name, path)
+                VALUES ('delete', old.id, old.name, old.path);
+                INSERT INTO archives_fts(rowid, name, path) VALUES (new.id, new.name, new.path);
+            END
+        ''')
+        
+        if not exists:
+            # 为已有数据建立索引
+            cursor.execute("INSERT INTO archives_fts(archives_fts) VALUES ('rebuild')")
+        
+        return True
+    
+    def scan_directory(self, directory: str, progress_callback: Optional[Callable] = None,
+                       incremental: bool = True, max_workers: Optional[int] = None,
+                       use_processes: bool = False,
+                       checkpoint: Optional[Callable] = None) -> List[Dict]:
+        """扫描目录中的压缩包
+        
+        incremental 为 True 时，按 (size, mtime, inode) 指纹与数据库比对，
+        只重新探测新增或变化的压缩包，并删除已不存在的压缩包记录。
+        本次扫描的统计信息保存在 last_scan_stats 中。
+        
+        压缩包由 max_workers 个线程并发探测，结果统一交回扫描线程写入数据库；
+        use_processes 为 True 时，7z 文件头的解析 (CPU 密集) 转交进程池执行。
+        探测时同时读取成员列表并写入 archive_files，供 find_members 查询。
+        
+        checkpoint 在遍历每个目录和每个压缩包时调用；被取消时尚未开始的探测
+        被放弃，已完成与进行中的探测结果仍会写入数据库 (下次增量扫描可直接
+        复用)，但不会删除任何记录。
+        """
         archives = []
         path = Path(directory)
         
@@ -96,43 +346,268 @@ class ArchiveManager:
             raise ValueError(f"目录不存在或不是有效目录: {directory}")
         
         try:
-            # 获取所有文件
-            all_files = list(path.rglob('*'))
-            total_files = len(all_files)
-            processed = 0
+            root = path.absolute()
+            known = self._load_indexed_archives(root) if incremental else {}
+            seen = set()
+            stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': []}
             
-            for file_path in all_files:
-                if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
+            discovered = 0
+            workers = max_workers or self.max_workers
+            # 限制在途任务数量，避免遍历速度远快于探测时占用过多内存
+            max_pending = workers * 4
+            pending = {}
+            
+            def collect(done):
+                for future in done:
+                    key, row = pending.pop(future)
                     try:
-                        archive_info = self._get_archive_info(file_path)
-                        archives.append(archive_info)
-                        self._save_archive(archive_info)
-                        
+                        archive_info = future.result()
+                        members = archive_info.get('members', ())
+                        batch.add(archive_info, 1 + len(members))
+                        # 返回给调用方的结果不携带成员列表
+                        archives.append({k: v for k, v in archive_info.items() if k != 'members'})
+                        stats['updated' if row is not None else 'added'] += 1
                     except Exception as e:
-                        self.logger.warning(f"处理文件失败 {file_path}: {e}")
-                
-                processed += 1
-                if progress_callback:
-                    progress_callback(processed, total_files)
+                        self.logger.warning(f"处理文件失败 {key}: {e}")
             
-            self.logger.info(f"扫描完成，找到 {len(archives)} 个压缩包")
+            process_pool = None
+            if use_processes:
+                # 进程池会加载 multiprocessing，只在需要时导入
+                from concurrent.futures import ProcessPoolExecutor
+                process_pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool, \
+                        BatchWriter(self._pool, self._write_archives, batch_size=5000) as batch:
+                    try:
+                        for key, stat in self._iter_archive_files(root, checkpoint):
+                            if checkpoint:
+                                checkpoint()
+                            discovered += 1
+                            seen.add(key)
+                            
+                            row = known.get(key)
+                            if row is not None and self._fingerprint_matches(row, stat):
+                                archives.append(row)
+                                stats['unchanged'] += 1
+                            else:
+                                future = pool.submit(self._probe_archive, Path(key), stat, process_pool)
+                                pending[future] = (key, row)
+                                if len(pending) >= max_pending:
+                                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                                    collect(done)
+                            
+                            # 流式遍历无法预知总数，total 传 0 表示未知
+                            if progress_callback:
+                                progress_callback(discovered, 0)
+                        
+                        collect(wait(pending).done)
+                    except BaseException:
+                        # 被取消时放弃尚未开始的探测，等待进行中的探测结束并保留已完成的结果
+                        for future in pending:
+                            future.cancel()
+                        collect([future for future in wait(pending).done if not future.cancelled()])
+                        raise
+            finally:
+                if process_pool is not None:
+                    process_pool.shutdown()
+            
+            if incremental:
+                stats['removed'] = sorted(set(known) - seen)
+                self._delete_archives(stats['removed'])
+            
+            self.last_scan_stats = stats
+            self.logger.info(
+                f"扫描完成，找到 {len(archives)} 个压缩包 "
+                f"(新增 {stats['added']}，更新 {stats['updated']}，"
+                f"未变化 {stats['unchanged']}，移除 {len(stats['removed'])})"
+            )
             return archives
             
         except Exception as e:
             self.logger.error(f"扫描目录失败: {e}")
             raise
     
-    def _get_archive_info(self, file_path: Path) -> Dict:
+    def _iter_archive_files(self, root: Path, checkpoint: Optional[Callable] = None
+                            ) -> Iterator[Tuple[str, os.stat_result]]:
+        """流式遍历目录，逐个产出受支持格式的压缩包路径及其 stat 信息
+        
+        使用 os.scandir 显式栈代替 rglob，内存只与目录深度和单层宽度相关；
+        按后缀过滤在遍历时完成，文件类型判断复用 DirEntry 缓存的信息。
+        """
+        stack = [str(root)]
+        
+        while stack:
+            if checkpoint:
+                checkpoint()
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif (os.path.splitext(entry.name)[1].lower() in self.supported_formats
+                                  and entry.is_file()):
+                                yield entry.path, entry.stat()
+                        except OSError as e:
+                            self.logger.warning(f"读取文件信息失败 {entry.path}: {e}")
+            except OSError as e:
+                self.logger.warning(f"无法访问目录 {current}: {e}")
+    
+    def _load_indexed_archives(self, root: Path) -> Dict[str, Dict]:
+        """读取数据库中位于 root 之下的压缩包记录，以路径为键"""
+        prefix = str(root).rstrip(os.sep) + os.sep
+        # 利用路径索引做范围查询：os.sep 的下一个字符作为上界
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        
+        with self._pool.reader() as conn:
+            cursor = conn.execute('SELECT * FROM archives WHERE path >= ? AND path < ?', (prefix, upper))
+            return {row['path']: dict(row) for row in cursor}
+    
+    @staticmethod
+    def _fingerprint_matches(row: Dict, stat: os.stat_result) -> bool:
+        """比较数据库记录与文件当前的 (size, mtime, inode) 指纹
+        
+        Windows 上 os.scandir 的 DirEntry.stat() 不提供 inode (st_ino 为 0)，
+        而 Path.stat() 提供真实的文件索引号；任一方为 0 时不比较 inode。
+        """
+        inode = row.get('inode')
+        return (row.get('size') == stat.st_size
+                and row.get('mtime_ns') == stat.st_mtime_ns
+                and (not inode or not stat.st_ino or inode == stat.st_ino))
+    
+    def _delete_archives(self, paths: List[str]):
+        """从数据库删除指定路径的压缩包记录"""
+        if not paths:
+            return
+        
+        try:
+            with self._pool.writer() as conn:
+                params = [(p,) for p in paths]
+                conn.executemany('''
+                    DELETE FROM archive_files 
+                    WHERE archive_id = (SELECT id FROM archives WHERE path = ?)
+                ''', params)
+                conn.executemany('DELETE FROM archives WHERE path = ?', params)
+            
+        except Exception as e:
+            self.logger.error(f"删除压缩包记录失败: {e}")
+            raise
+    
+    def refresh_paths(self, paths: List[str]) -> Dict[str, List[Dict]]:
+        """按文件系统事件增量更新索引
+        
+        paths 为发生变化的文件或目录：存在的压缩包与数据库指纹比对，变化时重新
+        探测；存在的目录遍历其下的压缩包；已不存在的路径删除其本身及其下的全部
+        记录。返回 {'updated': [新增或更新后的记录], 'removed': [被删除的记录]}。
+        """
+        candidates: Dict[str, os.stat_result] = {}
+        removed: Dict[str, Dict] = {}
+        
+        for item in paths:
+            path = Path(item).absolute()
+            key = str(path)
+            try:
+                if path.is_dir():
+                    candidates.update(self._iter_archive_files(path))
+                elif path.is_file():
+                    if path.suffix.lower() in self.supported_formats:
+                        candidates[key] = path.stat()
+                else:
+                    row = self._get_indexed_archive(key)
+                    if row is not None:
+                        removed[key] = row
+                    removed.update(self._load_indexed_archives(path))
+            except OSError as e:
+                self.logger.warning(f"读取文件信息失败 {key}: {e}")
+        
+        updated = []
+        for key, stat in candidates.items():
+            row = self._get_indexed_archive(key)
+            if row is not None and self._fingerprint_matches(row, stat):
+                continue
+            try:
+                self._save_archive(self._probe_archive(Path(key), stat))
+            except Exception as e:
+                self.logger.warning(f"处理文件失败 {key}: {e}")
+                continue
+            self._details_cache.invalidate(key)
+            updated.append(self._get_indexed_archive(key))
+        
+        self._delete_archives(list(removed))
+        for key in removed:
+            self._details_cache.invalidate(key)
+        
+        if updated or removed:
+            self.logger.info(f"索引已更新: 更新 {len(updated)}，移除 {len(removed)}")
+        return {'updated': [row for row in updated if row is not None], 'removed': list(removed.values())}
+    
+    def _get_indexed_archive(self, path: str) -> Optional[Dict]:
+        """读取数据库中指定路径的压缩包记录"""
+        with self._pool.reader() as conn:
+            row = conn.execute('SELECT * FROM archives WHERE path = ?', (path,)).fetchone()
+            return dict(row) if row is not None else None
+    
+    def add_scan_root(self, directory: str):
+        """登记扫描根目录，供实时监控使用"""
+        try:
+            with self._pool.writer() as conn:
+                conn.execute('INSERT OR IGNORE INTO scan_roots (path) VALUES (?)',
+                             (str(Path(directory).absolute()),))
+            
+        except Exception as e:
+            self.logger.error(f"登记扫描目录失败: {e}")
+    
+    def remove_scan_root(self, directory: str):
+        """取消登记扫描根目录"""
+        try:
+            with self._pool.writer() as conn:
+                conn.execute('DELETE FROM scan_roots WHERE path = ?',
+                             (str(Path(directory).absolute()),))
+            
+        except Exception as e:
+            self.logger.error(f"取消登记扫描目录失败: {e}")
+    
+    def get_scan_roots(self) -> List[str]:
+        """获取已登记的扫描根目录"""
+        try:
+            with self._pool.reader() as conn:
+                return [row[0] for row in conn.execute('SELECT path FROM scan_roots ORDER BY path')]
+            
+        except Exception as e:
+            self.logger.error(f"获取扫描目录失败: {e}")
+            return []
+    
+    def _probe_archive(self, file_path: Path, stat: os.stat_result,
+                       process_pool: Optional[Executor] = None) -> Dict:
+        """在工作线程中探测单个压缩包，并读取其成员列表"""
+        try:
+            if process_pool is not None and file_path.suffix.lower() == '.7z':
+                members = process_pool.submit(_list_members, str(file_path)).result()
+            else:
+                members = _list_members(str(file_path))
+        except Exception as e:
+            self.logger.warning(f"读取成员列表失败 {file_path}: {e}")
+            members = []
+        
+        archive_info = self._get_archive_info(file_path, stat, len(members))
+        archive_info['members'] = members
+        return archive_info
+    
+    def _get_archive_info(self, file_path: Path, stat: Optional[os.stat_result] = None,
+                          file_count: Optional[int] = None) -> Dict:
         """获取压缩包信息"""
         try:
-            stat = file_path.stat()
+            if stat is None:
+                stat = file_path.stat()
             
             # 尝试获取文件数量
-            file_count = 0
-            try:
-                file_count = self._get_file_count(file_path)
-            except:
-                pass  # 如果获取失败，保持为0
+            if file_count is None:
+                file_count = 0
+                try:
+                    file_count = self._get_file_count(file_path)
+                except:
+                    pass  # 如果获取失败，保持为0
             
             return {
                 'name': file_path.name,
@@ -140,7 +615,9 @@ class ArchiveManager:
                 'size': stat.st_size,
                 'modified': datetime.fromtimestamp(stat.st_mtime),
                 'type': file_path.suffix[1:].lower(),
-                'file_count': file_count
+                'file_count': file_count,
+                'mtime_ns': stat.st_mtime_ns,
+                'inode': stat.st_ino
             }
             
         except Exception as e:
@@ -149,99 +626,315 @@ class ArchiveManager:
     
     def _get_file_count(self, file_path: Path) -> int:
         """获取压缩包内文件数量"""
-        suffix = file_path.suffix.lower()
-        
-        try:
-            if suffix == '.zip':
-                with zipfile.ZipFile(file_path, 'r') as zf:
-                    return len(zf.namelist())
-            elif suffix == '.7z':
-                with py7zr.SevenZipFile(file_path, mode='r') as szf:
-                    return len(szf.getnames())
-            elif suffix == '.rar':
-                with rarfile.RarFile(file_path) as rf:
-                    return len(rf.namelist())
-            else:
-                # 对于其他格式，使用 patoolib
-                return 0  # patoolib 不直接提供文件数量
-                
-        except Exception:
-            return 0
+        return _count_members(str(file_path))
     
     def _save_archive(self, archive_info: Dict):
         """保存压缩包信息到数据库"""
-        with self._lock:
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO archives 
-                    (name, path, size, modified, type, file_count, updated_at) 
-                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ''', (
-                    archive_info['name'],
-                    archive_info['path'],
-                    archive_info['size'],
-                    archive_info['modified'],
-                    archive_info['type'],
-                    archive_info.get('file_count', 0)
-                ))
-                
-                conn.commit()
-                conn.close()
-                
-            except Exception as e:
-                self.logger.error(f"保存压缩包信息失败: {e}")
-                raise
+        try:
+            with self._pool.writer() as conn:
+                self._write_archives(conn, [archive_info])
+            
+        except Exception as e:
+            self.logger.error(f"保存压缩包信息失败: {e}")
+            raise
+    
+    def _write_archives(self, conn: sqlite3.Connection, archive_infos: List[Dict]):
+        """在当前事务中批量写入压缩包信息
+        
+        带有 members 的记录会同时替换其在 archive_files 中的成员行。
+        使用 UPSERT 而不是 INSERT OR REPLACE，保证已有压缩包的 id 不变；
+        SQLite 低于 3.24 时没有 UPSERT，改为先 UPDATE、没有更新到行时再 INSERT。
+        """
+        rows = [(
+            info['name'],
+            info['size'],
+            info['modified'],
+            info['type'],
+            info.get('file_count', 0),
+            info.get('mtime_ns'),
+            info.get('inode'),
+            info['path']
+        ) for info in archive_infos]
+        
+        if SQLITE_HAS_UPSERT:
+            conn.executemany('''
+                INSERT INTO archives 
+                (name, size, modified, type, file_count, mtime_ns, inode, path, updated_at) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(path) DO UPDATE SET
+                    name = excluded.name,
+                    size = excluded.size,
+                    modified = excluded.modified,
+                    type = excluded.type,
+                    file_count = excluded.file_count,
+                    mtime_ns = excluded.mtime_ns,
+                    inode = excluded.inode,
+                    updated_at = excluded.updated_at
+            ''', rows)
+        else:
+            for row in rows:
+                cursor = conn.execute('''
+                    UPDATE archives SET
+                        name = ?, size = ?, modified = ?, type = ?, file_count = ?,
+                        mtime_ns = ?, inode = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE path = ?
+                ''', row)
+                if cursor.rowcount == 0:
+                    conn.execute('''
+                        INSERT INTO archives 
+                        (name, size, modified, type, file_count, mtime_ns, inode, path, updated_at) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ''', row)
+        
+        for info in archive_infos:
+            if 'members' in info:
+                self._write_members(conn, info['path'], info['members'])
+    
+    def _write_members(self, conn: sqlite3.Connection, archive_path: str, members: List[Dict]):
+        """在当前事务中替换某个压缩包的成员索引"""
+        row = conn.execute('SELECT id FROM archives WHERE path = ?', (archive_path,)).fetchone()
+        if row is None:
+            return
+        
+        archive_id = row[0]
+        conn.execute('DELETE FROM archive_files WHERE archive_id = ?', (archive_id,))
+        conn.executemany('''
+            INSERT INTO archive_files 
+            (archive_id, name, path, size, compressed_size, modified, crc) 
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            archive_id,
+            os.path.basename(m['name'].rstrip('/')),
+            m['name'],
+            m['size'],
+            m.get('compressed_size', 0),
+            m.get('modified'),
+            m.get('crc')
+        ) for m in members])
     
     def get_all_archives(self) -> List[Dict]:
         """获取所有压缩包"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM archives ORDER BY modified DESC')
-            rows = cursor.fetchall()
-            
-            archives = [dict(row) for row in rows]
-            conn.close()
-            
-            return archives
+            with self._pool.reader() as conn:
+                cursor = conn.execute('SELECT * FROM archives ORDER BY modified DESC')
+                return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"获取压缩包列表失败: {e}")
             return []
     
-    def search_archives(self, keyword: str) -> List[Dict]:
-        """搜索压缩包"""
+    def get_statistics(self) -> Dict:
+        """索引的汇总统计：压缩包数量、总大小、成员总数及各格式的数量"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._pool.reader() as conn:
+                row = conn.execute('''
+                    SELECT COUNT(*) AS archives, COALESCE(SUM(size), 0) AS total_size,
+                           COALESCE(SUM(file_count), 0) AS total_files
+                    FROM archives
+                ''').fetchone()
+                stats = dict(row)
+                stats['types'] = {
+                    type_: count for type_, count in conn.execute('''
+                        SELECT type, COUNT(*) FROM archives 
+                        GROUP BY type ORDER BY COUNT(*) DESC
+                    ''')
+                }
+                stats['scan_roots'] = conn.execute('SELECT COUNT(*) FROM scan_roots').fetchone()[0]
+                return stats
             
-            cursor.execute('''
-                SELECT * FROM archives 
-                WHERE name LIKE ? OR path LIKE ?
-                ORDER BY modified DESC
-            ''', (f'%{keyword}%', f'%{keyword}%'))
+        except Exception as e:
+            self.logger.error(f"获取统计信息失败: {e}")
+            return {}
+    
+    def iter_archives(self, after: Optional[Dict] = None, limit: Optional[int] = None,
+                      order_by: str = 'modified', descending: bool = True,
+                      page_size: int = 500) -> Iterator[Dict]:
+        """按键集分页逐条产出压缩包记录
+        
+        after 为上一页的最后一条记录，从其之后继续；排序键为 (order_by, id)，
+        每页都是索引范围查询，耗时与索引总量无关。limit 限制产出总数。
+        排序列为 NULL 的记录与 SQLite 的默认顺序一致，视为最小值
+        (分段方式见 _keyset_segments)。
+        """
+        if order_by not in self.SORTABLE_COLUMNS:
+            raise ValueError(f"不支持的排序列: {order_by}")
+        
+        direction = 'DESC' if descending else 'ASC'
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            try:
+                rows = []
+                with self._pool.reader() as conn:
+                    for where, params in self._keyset_segments(order_by, descending, after):
+                        cursor = conn.execute(f'''
+                            SELECT * FROM archives 
+                            WHERE {where}
+                            ORDER BY {order_by} {direction}, id {direction}
+                            LIMIT ?
+                        ''', (*params, size - len(rows)))
+                        rows.extend(dict(row) for row in cursor)
+                        if len(rows) >= size:
+                            break
+                    
+            except Exception as e:
+                self.logger.error(f"分页读取压缩包列表失败: {e}")
+                return
             
-            rows = cursor.fetchall()
-            archives = [dict(row) for row in rows]
-            conn.close()
+            # 逐页读取后释放连接再产出，避免调用方长时间占用读连接
+            yield from rows
             
-            return archives
+            if len(rows) < size:
+                return
+            after = rows[-1]
+            if remaining is not None:
+                remaining -= len(rows)
+    
+    @staticmethod
+    def _keyset_segments(order_by: str, descending: bool, after: Optional[Dict]
+                         ) -> List[Tuple[str, Tuple]]:
+        """返回 after 之后各段的 (WHERE 条件, 参数)，按顺序查询直到取满一页
+        
+        行值比较 (col, id) < (?, ?) 遇到 NULL 结果也是 NULL，会漏掉排序列为
+        NULL 的记录，因此 NULL 记录单独成段：升序时排在最前，降序时排在最后。
+        每一段都是一次索引范围查询。
+        """
+        if after is None:
+            return [('1', ())]
+        
+        compare = '<' if descending else '>'
+        value = after[order_by]
+        if value is None:
+            segments = [(f'{order_by} IS NULL AND id {compare} ?', (after['id'],))]
+            if not descending:
+                segments.append((f'{order_by} IS NOT NULL', ()))
+        else:
+            segments = [(f'({order_by}, id) {compare} (?, ?)', (value, after['id']))]
+            if descending:
+                segments.append((f'{order_by} IS NULL', ()))
+        return segments
+    
+    def search_archives(self, keyword: str, limit: int = 1000) -> List[Dict]:
+        """搜索压缩包
+        
+        优先使用 FTS5 全文索引，结果按相关度排序。空格分隔的多个词须同时匹配
+        (子串匹配，每个词至少 3 个字符)；包含双引号时按 FTS5 查询语法解析，
+        支持短语 "a b"、前缀 abc*、OR/NOT 以及 name:/path: 列过滤。
+        """
+        try:
+            with self._pool.reader() as conn:
+                query = self._build_fts_query(keyword) if self._fts_enabled else None
+                if query is not None:
+                    try:
+                        cursor = conn.execute('''
+                            SELECT a.* FROM archives_fts 
+                            JOIN archives a ON a.id = archives_fts.rowid
+                            WHERE archives_fts MATCH ?
+                            ORDER BY archives_fts.rank, a.modified DESC
+                            LIMIT ?
+                        ''', (query, limit))
+                        return [dict(row) for row in cursor]
+                    except sqlite3.OperationalError as e:
+                        self.logger.warning(f"全文检索语法无效，改用 LIKE 搜索: {e}")
+                
+                cursor = conn.execute('''
+                    SELECT * FROM archives 
+                    WHERE name LIKE ? OR path LIKE ?
+                    ORDER BY modified DESC
+                    LIMIT ?
+                ''', (f'%{keyword}%', f'%{keyword}%', limit))
+                return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"搜索压缩包失败: {e}")
             return []
     
+    @staticmethod
+    def _build_fts_query(keyword: str) -> Optional[str]:
+        """把搜索关键字转换为 FTS5 查询，无法使用全文索引时返回 None"""
+        keyword = keyword.strip()
+        if '"' in keyword:
+            # 用户自行书写的 FTS5 查询语法
+            return keyword
+        
+        # trigram 分词下子串匹配天然覆盖前缀，去掉末尾的 *
+        terms = [t.rstrip('*') for t in keyword.split()]
+        if not terms or any(len(t) < 3 for t in terms):
+            return None
+        return ' '.join('"' + t + '"' for t in terms)
+    
+    def find_members(self, pattern: Optional[str] = None,
+                     min_size: Optional[int] = None, max_size: Optional[int] = None,
+                     type: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """在成员索引中查找包含指定文件的压缩包
+        
+        pattern 支持 * 和 ? 通配符 (不含通配符时按子串匹配)；含 / 时匹配成员的
+        完整路径，否则只匹配文件名。type 按压缩包类型过滤，如 'zip'、'7z'。
+        """
+        conditions = []
+        params: List = []
+        
+        if pattern:
+            column = 'f.path' if '/' in pattern else 'f.name'
+            escaped = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            if '*' in pattern or '?' in pattern:
+                like = escaped.replace('*', '%').replace('?', '_')
+            else:
+                like = f'%{escaped}%'
+            conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(like)
+        if min_size is not None:
+            conditions.append('f.size >= ?')
+            params.append(min_size)
+        if max_size is not None:
+            conditions.append('f.size <= ?')
+            params.append(max_size)
+        if type:
+            conditions.append('a.type = ?')
+            params.append(type.lower().lstrip('.'))
+        
+        where = ' AND '.join(conditions) if conditions else '1'
+        params.append(limit)
+        
+        try:
+            with self._pool.reader() as conn:
+                cursor = conn.execute(f'''
+                    SELECT f.name, f.path, f.size, f.compressed_size, f.modified, f.crc,
+                           a.id AS archive_id, a.name AS archive_name,
+                           a.path AS archive_path, a.type AS archive_type
+                    FROM archive_files f JOIN archives a ON a.id = f.archive_id
+                    WHERE {where}
+                    ORDER BY a.path, f.path
+                    LIMIT ?
+                ''', params)
+                return [dict(row) for row in cursor]
+            
+        except Exception as e:
+            self.logger.error(f"查找压缩包成员失败: {e}")
+            return []
+    
     def extract_archive(self, archive_path: str, output_path: str, 
                        selected_files: Optional[List[str]] = None,
-                       progress_callback: Optional[Callable] = None) -> bool:
-        """解压缩文件"""
+                       progress_callback: Optional[Callable] = None,
+                       checkpoint: Optional[Callable] = None,
+                       mode: str = 'overwrite', verify_crc: bool = False,
+                       delete_extraneous: bool = False,
+                       workers: Optional[int] = None) -> bool:
+        """解压缩文件
+        
+        progress_callback(done, total, stats) 最多每秒调用 20 次，done/total 为
+        字节数，stats 的内容见 ProgressTracker。checkpoint 在解压循环中被反复
+        调用，可在其中阻塞 (暂停) 或抛出 JobCancelled (取消)。
+        workers 为单个 ZIP 内部并行解压的线程数上限，默认 extract_workers。
+        
+        mode 为 'sync' 时只写出与输出目录中现有文件不同的成员，见 _sync_extract；
+        verify_crc 与 delete_extraneous 只在该模式下有效。
+        """
         try:
+            if mode not in ('overwrite', 'sync'):
+                raise ValueError(f"未知的解压模式: {mode}")
+            
             path = Path(archive_path)
             if not path.exists():
                 raise FileNotFoundError(f"压缩包不存在: {archive_path}")
@@ -256,39 +949,679 @@ class ArchiveManager:
             if not handler:
                 raise ValueError(f"不支持的格式: {suffix}")
             
-            return handler('extract', str(path), str(output_dir), selected_files, progress_callback)
+            if mode == 'sync':
+                self._sync_extract(str(path), str(output_dir), selected_files, verify_crc,
+                                   delete_extraneous, progress_callback, checkpoint)
+                return True
+            
+            if suffix == '.zip':
+                # 只有 ZIP 会在单个压缩包内部并行解压
+                return self._handle_zip('extract', str(path), str(output_dir), selected_files,
+                                        progress_callback, checkpoint, workers)
+            return handler('extract', str(path), str(output_dir), selected_files,
+                           progress_callback, checkpoint)
             
         except Exception as e:
             self.logger.error(f"解压失败: {e}")
             return False
     
+    def _sync_extract(self, archive_path: str, output_path: str, files: Optional[List[str]],
+                      verify_crc: bool, delete_extraneous: bool,
+                      progress_callback: Optional[Callable], checkpoint: Optional[Callable]):
+        """同步解压：跳过输出目录中已经相同的成员
+        
+        先只读取成员元数据 (ZIP 直接解析中央目录)，与输出目录中的文件按
+        (大小, 修改时间) 比对，都相同即跳过；verify_crc 时还要求 CRC 相同，
+        而只有修改时间不同、CRC 相同的文件不再重写，只更新其修改时间。
+        其余成员只解压需要的部分，写入同目录的临时文件并设置成员的修改
+        时间后原子替换，中途失败不会留下半个文件。压缩包未变化时全程只有
+        元数据操作 (TAR 没有目录，仍需顺序读取一遍)。
+        delete_extraneous 时删除输出目录中压缩包里没有的文件与空目录，
+        只能在解压全部成员时使用。统计信息保存在 last_extract_stats 中。
+        """
+        if files and delete_extraneous:
+            raise ValueError("只解压部分成员时不能删除多余文件")
+        wanted = {name.rstrip('/') for name in files} if files else None
+        # 单文件压缩包不解压无法可靠得知原始大小 (gz 尾部只记录大小对 2^32 取模)，只比较修改时间
+        size_known = (tarformat.is_tarball(archive_path)
+                      or Path(archive_path).suffix.lower() not in ('.gz', '.bz2', '.xz'))
+        
+        targets: Dict[str, str] = {}
+        stale: List[str] = []
+        total = 0
+        stats = {'extracted': 0, 'skipped': 0, 'deleted': 0}
+        
+        for member in _iter_members(archive_path):
+            name = member['name'].rstrip('/')
+            if wanted is not None and name not in wanted and not any(
+                    name.startswith(prefix + '/') for prefix in wanted):
+                continue
+            target = safe_member_path(output_path, name)
+            if target is None:
+                continue
+            
+            targets[name] = target
+            if self._output_up_to_date(target, member, size_known, verify_crc):
+                stats['skipped'] += 1
+            else:
+                stale.append(name)
+                total += member['size'] or 0
+        
+        tracker = ProgressTracker(progress_callback, total, len(stale), measure='read',
+                                  checkpoint=checkpoint)
+        if stale:
+            from . import transcode
+            for member, stream in transcode.iter_source(archive_path, tracker, stale):
+                target = targets.get(member['name'])
+                if target is None:
+                    continue
+                if stream is None:
+                    os.makedirs(target, exist_ok=True)
+                else:
+                    self._write_atomically(target, stream, member)
+                stats['extracted'] += 1
+        
+        if delete_extraneous:
+            stats['deleted'] = self._delete_extraneous(output_path, targets.values())
+        tracker.finish()
+        
+        self.last_extract_stats = stats
+        self.logger.info(
+            f"同步解压完成 {archive_path}: 写出 {stats['extracted']}，"
+            f"跳过 {stats['skipped']}，删除 {stats['deleted']}"
+        )
+    
+    @staticmethod
+    def _output_up_to_date(target: str, member: Dict, size_known: bool, verify_crc: bool) -> bool:
+        """输出目录中的文件是否与成员相同"""
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return False
+        if os.path.isdir(target):
+            # 目录成员大小为 0，已存在即可
+            return not member['size']
+        if size_known and stat.st_size != member['size']:
+            return False
+        
+        mtime = _member_mtime(member)
+        if mtime is None:
+            # 没有修改时间时只能比较大小与 CRC，两者都无从比较时视为已变化
+            if member['crc'] is not None:
+                return _file_crc(target) == member['crc']
+            return size_known
+        
+        check_crc = verify_crc and member['crc'] is not None
+        if abs(stat.st_mtime - mtime) < SYNC_MTIME_TOLERANCE:
+            return not check_crc or _file_crc(target) == member['crc']
+        if check_crc and _file_crc(target) == member['crc']:
+            # 内容相同只是时间不同，修正时间使下次比对不必再计算 CRC
+            os.utime(target, (stat.st_atime, mtime))
+            return True
+        return False
+    
+    def _write_atomically(self, target: str, stream: BinaryIO, member: Dict):
+        """把成员写入同目录的临时文件，设置权限与修改时间后原子替换目标"""
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(target)}.{os.urandom(4).hex()}.part")
+        try:
+            with open(temp_path, 'xb') as dst:
+                shutil.copyfileobj(stream, dst, CHUNK_SIZE)
+            if member['mode']:
+                os.chmod(temp_path, member['mode'] & 0o777)
+            mtime = _member_mtime(member)
+            if mtime is not None:
+                os.utime(temp_path, (mtime, mtime))
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @staticmethod
+    def _delete_extraneous(output_path: str, keep: Iterable[str]) -> int:
+        """删除输出目录中不在 keep 中的文件与空目录，返回删除的数量"""
+        keep = {os.path.normcase(path) for path in keep}
+        deleted = 0
+        for root, dirnames, filenames in os.walk(output_path, topdown=False):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if os.path.normcase(path) not in keep:
+                    os.remove(path)
+                    deleted += 1
+            for dirname in dirnames:
+                path = os.path.join(root, dirname)
+                if os.path.normcase(path) in keep:
+                    continue
+                if os.path.islink(path):
+                    os.remove(path)
+                    deleted += 1
+                elif not os.listdir(path):
+                    os.rmdir(path)
+                    deleted += 1
+        return deleted
+    
+    def verify_archive(self, archive_path: str, progress_callback: Optional[Callable] = None,
+                       checkpoint: Optional[Callable] = None) -> bool:
+        """完整解码压缩包的每个成员以检查其完整性，不写出任何文件
+        
+        ZIP、RAR 与 7z 在成员读完时校验 CRC；TAR 只能检查结构与外层压缩
+        (gzip/xz 自带校验)。progress_callback 按解码出的字节数报告进度。
+        """
+        from . import transcode
+        
+        try:
+            total = 0
+            if progress_callback and not tarformat.is_tarball(archive_path):
+                total = sum(m['size'] for m in _iter_members(archive_path))
+            tracker = ProgressTracker(progress_callback, total, measure='read',
+                                      checkpoint=checkpoint)
+            for _, stream in transcode.iter_source(archive_path, tracker):
+                if stream is not None:
+                    while stream.read(CHUNK_SIZE):
+                        pass
+            tracker.finish()
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"压缩包校验失败 {archive_path}: {e}")
+            return False
+    
+    def extract_archives(self, archive_paths: List[str], output_path: str,
+                         max_workers: Optional[int] = None,
+                         max_bytes_per_sec: Optional[float] = None,
+                         result_callback: Optional[Callable] = None,
+                         progress_callback: Optional[Callable] = None,
+                         checkpoint: Optional[Callable] = None) -> List[Dict]:
+        """批量解压多个压缩包
+        
+        由 max_workers 个线程并发处理 (同时也是解压线程总数的上限：单个 ZIP
+        内部的并行线程数按 max_workers 平均分配)，按文件大小从大到小调度，
+        让最大的压缩包最先开始、小文件填补空闲线程。
+        max_bytes_per_sec 为所有线程共享的读取速率上限，按解压时实际读取的
+        字节数计，限速等待中仍可暂停或取消。
+        每个压缩包完成后以结果字典调用 result_callback，返回全部结果。
+        progress_callback 报告整批的读取进度，总量为全部压缩包的大小。
+        """
+        jobs = [(_file_size(path), path) for path in archive_paths]
+        limiter = RateLimiter(max_bytes_per_sec)
+        batch = ProgressTracker(progress_callback, sum(size for size, _ in jobs),
+                                len(jobs), measure='read')
+        
+        def extract_one(job: Tuple[int, str]) -> Dict:
+            size, path = job
+            if checkpoint:
+                checkpoint()
+            started = time.monotonic()
+            error = None
+            reported = [0]
+            charged = [0]
+            lock = threading.Lock()
+            
+            def forward(done, total, stats):
+                # 把单个压缩包的读取增量汇总到整批进度 (可能来自 py7zr 的报告线程)
+                with lock:
+                    delta = stats['bytes_read'] - reported[0]
+                    reported[0] = stats['bytes_read']
+                batch.update(read=delta)
+            
+            def paced():
+                # 在读取线程中按实际读取的字节数申请额度，等待期间仍响应暂停与取消
+                if checkpoint:
+                    checkpoint()
+                with lock:
+                    delta = reported[0] - charged[0]
+                    charged[0] = reported[0]
+                if delta > 0:
+                    limiter.acquire(delta, checkpoint)
+            
+            batch.next_member(path)
+            try:
+                # 始终传入检查点：7z 因此在本线程中顺序解压，读取经过限速
+                success = self.extract_archive(
+                    path, output_path,
+                    progress_callback=forward if progress_callback or limiter.rate else None,
+                    checkpoint=paced, workers=per_archive
+                )
+                if not success:
+                    error = "解压失败"
+            except Exception as e:
+                success = False
+                error = str(e)
+            # 进度回调限频，最后一次回调报告的字节数尚未申请额度
+            paced()
+            batch.update(read=max(size - reported[0], 0))
+            
+            result = {
+                'path': path,
+                'size': size,
+                'success': success,
+                'error': error,
+                'elapsed': time.monotonic() - started
+            }
+            return result
+        
+        total_workers = max_workers or os.cpu_count() or 1
+        workers = max(1, min(len(jobs), total_workers))
+        per_archive = max(1, total_workers // workers)
+        results = self._run_largest_first(jobs, extract_one, workers, result_callback)
+        batch.finish()
+        
+        succeeded = sum(1 for r in results if r['success'])
+        self.logger.info(f"批量解压完成: {succeeded}/{len(results)}")
+        return results
+    
+    @staticmethod
+    def _run_largest_first(jobs: List[Tuple], fn: Callable[[Tuple], Dict],
+                           max_workers: Optional[int] = None,
+                           result_callback: Optional[Callable] = None) -> List[Dict]:
+        """按文件大小从大到小并发执行 fn(job)，job 的第一项为大小
+        
+        最大的文件最先开始，小文件填补空闲线程；线程数不超过任务数。
+        每个任务完成后以其结果调用 result_callback，按调度顺序返回全部结果。
+        """
+        def run(job: Tuple) -> Dict:
+            result = fn(job)
+            if result_callback:
+                result_callback(result)
+            return result
+        
+        ordered = sorted(jobs, key=lambda job: job[0], reverse=True)
+        workers = max(1, min(len(ordered), max_workers or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, ordered))
+    
+    def open_member(self, archive_path: str, member: str) -> BinaryIO:
+        """不落盘地打开压缩包中的单个成员，返回只读流 (调用方负责关闭)
+        
+        7z 只解码该成员所在的固实块。成员不存在时抛出 KeyError。
+        """
+        from . import memberio
+        
+        try:
+            return memberio.open_member(archive_path, member)
+        except Exception as e:
+            self.logger.error(f"打开成员失败 {archive_path}:{member}: {e}")
+            raise
+    
+    def read_members(self, archive_path: str, members: List[str]) -> Dict[str, bytes]:
+        """批量读取压缩包中的多个成员，返回 {成员名: 内容}
+        
+        7z 的每个固实块最多解码一次；不存在的成员不出现在结果中。
+        """
+        from . import memberio
+        
+        try:
+            return memberio.read_members(archive_path, members)
+        except Exception as e:
+            self.logger.error(f"读取成员失败 {archive_path}: {e}")
+            raise
+    
     def create_archive(self, files: List[str], archive_path: str, 
                       format_type: str = '7z',
-                      progress_callback: Optional[Callable] = None) -> bool:
-        """创建压缩包"""
+                      progress_callback: Optional[Callable] = None,
+                      profile=None, checkpoint: Optional[Callable] = None) -> bool:
+        """创建压缩包
+        
+        format_type 为 '7z'、'zip'、'tar'、'tar.gz' ('tgz')、'tar.bz2' 或 'tar.xz'。
+        profile 可以是预设名 ('fastest'/'balanced'/'smallest')、CompressionProfile
+        或包含 method/level/solid_block_size/filters 的字典，默认为 'balanced'。
+        progress_callback(done, total, stats) 按读取的源文件字节数报告进度。
+        被 checkpoint 取消时删除未完成的压缩包并重新抛出 JobCancelled。
+        """
         try:
+            profile = resolve_profile(profile)
             if format_type == '7z':
-                return self._create_7z(files, archive_path, progress_callback)
+                return self._create_7z(files, archive_path, progress_callback, profile, checkpoint)
             elif format_type == 'zip':
-                return self._create_zip(files, archive_path, progress_callback)
+                return self._create_zip(files, archive_path, progress_callback, profile, checkpoint)
+            elif format_type in ('tar', 'tar.gz', 'tgz', 'tar.bz2', 'tar.xz'):
+                return self._create_tar(files, archive_path, format_type, profile,
+                                        progress_callback, checkpoint)
             else:
                 raise ValueError(f"不支持创建格式: {format_type}")
                 
+        except JobCancelled:
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+            raise
         except Exception as e:
             self.logger.error(f"创建压缩包失败: {e}")
             return False
     
+    def convert_archive(self, source_path: str, target_path: str, profile=None,
+                        progress_callback: Optional[Callable] = None,
+                        checkpoint: Optional[Callable] = None) -> bool:
+        """把压缩包转换为另一种格式，目标格式由 target_path 的扩展名决定
+        
+        成员从源压缩包按顺序流式读出并直接写入目标 (.zip/.7z/.tar/.tar.gz 等)，
+        不解压到临时目录，保留成员名称、修改时间与权限位；每个成员占用的
+        内存有界 (写入 7z 时单个成员可能溢出到临时文件)。profile 同 create_archive。
+        progress_callback(done, total, stats) 按读取的成员数据字节数报告进度，
+        TAR 源事先无法得知总量 (total 为 0)。失败或被取消时删除未完成的目标文件。
+        """
+        from . import transcode
+        
+        try:
+            profile = resolve_profile(profile)
+            total = 0
+            if progress_callback and not tarformat.is_tarball(source_path):
+                total = sum(m['size'] for m in _iter_members(source_path))
+            tracker = ProgressTracker(progress_callback, total, measure='read',
+                                      checkpoint=checkpoint)
+            transcode.convert(source_path, target_path, profile, tracker)
+            self.logger.info(f"转换完成: {source_path} -> {target_path}")
+            return True
+            
+        except JobCancelled:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            raise
+        except Exception as e:
+            self.logger.error(f"转换失败 {source_path}: {e}")
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            return False
+    
+    def convert_archives(self, conversions: List[Tuple[str, str]], profile=None,
+                         max_workers: Optional[int] = None,
+                         result_callback: Optional[Callable] = None,
+                         checkpoint: Optional[Callable] = None) -> List[Dict]:
+        """并行转换多个压缩包
+        
+        conversions 为 (源路径, 目标路径) 列表，由 max_workers 个线程并发处理
+        (zlib/bz2/lzma 压缩与解压时释放 GIL)，按源文件大小从大到小调度。
+        每个转换完成后以结果字典调用 result_callback，返回全部结果。
+        """
+        jobs = [(_file_size(source), source, target) for source, target in conversions]
+        
+        def convert_one(job: Tuple[int, str, str]) -> Dict:
+            size, source, target = job
+            if checkpoint:
+                checkpoint()
+            started = time.monotonic()
+            success = self.convert_archive(source, target, profile, checkpoint=checkpoint)
+            result = {
+                'source': source,
+                'target': target,
+                'size': size,
+                'success': success,
+                'error': None if success else "转换失败",
+                'elapsed': time.monotonic() - started
+            }
+            return result
+        
+        results = self._run_largest_first(jobs, convert_one, max_workers, result_callback)
+        
+        succeeded = sum(1 for r in results if r['success'])
+        self.logger.info(f"批量转换完成: {succeeded}/{len(results)}")
+        return results
+    
+    def update_archive(self, archive_path: str, files: List[str], mode: str = 'append',
+                       profile=None, progress_callback: Optional[Callable] = None,
+                       checkpoint: Optional[Callable] = None, verify_crc: bool = False) -> bool:
+        """增量更新已有的 ZIP 或 7z 压缩包
+        
+        files 的展开方式与 create_archive 相同。源文件与压缩包中的成员按
+        (大小, 修改时间, CRC) 比对 (规则见 _plan_update)：新文件被追加，
+        变化的文件被替换，未变化的成员保持不变；mode 为 'sync' 时还会删除
+        files 中已不存在的成员。压缩包不存在时等同于 create_archive。
+        
+        ZIP 只有新增时直接在末尾追加 (失败时恢复原文件，但不是崩溃安全的，
+        见 _append_zip)；需要替换或删除时写入同目录下的临时文件，
+        未变化的成员按原始压缩数据复制 (不重新压缩)，完成后原子替换原文件。
+        7z 只有新增时以追加模式写入新的固实块；py7zr 无法原样复制已有的固实块，
+        需要替换或删除时只能流式解码并重新压缩整个压缩包。
+        本次更新的统计信息保存在 last_update_stats 中。
+        """
+        try:
+            if mode not in ('append', 'sync'):
+                raise ValueError(f"未知的更新模式: {mode}")
+            suffix = Path(archive_path).suffix.lower()
+            if suffix not in ('.zip', '.7z'):
+                raise ValueError(f"不支持增量更新的格式: {suffix}")
+            
+            profile = resolve_profile(profile)
+            sources = {arcname: source for source, arcname in self._iter_source_files(files)}
+            if not os.path.exists(archive_path):
+                self.last_update_stats = {'added': len(sources), 'replaced': 0,
+                                          'removed': 0, 'unchanged': 0}
+                return self.create_archive(files, archive_path, suffix[1:],
+                                           progress_callback, profile, checkpoint)
+            
+            if suffix == '.zip':
+                self._update_zip(archive_path, sources, mode, profile, progress_callback,
+                                 checkpoint, verify_crc)
+            else:
+                self._update_7z(archive_path, sources, mode, profile, progress_callback,
+                                checkpoint, verify_crc)
+            
+            # 已在索引中的压缩包同步刷新其记录
+            if self._get_indexed_archive(str(Path(archive_path).absolute())) is not None:
+                self.refresh_paths([archive_path])
+            
+            stats = self.last_update_stats
+            self.logger.info(
+                f"更新完成 {archive_path}: 新增 {stats['added']}，替换 {stats['replaced']}，"
+                f"删除 {stats['removed']}，未变化 {stats['unchanged']}"
+            )
+            return True
+            
+        except JobCancelled:
+            raise
+        except Exception as e:
+            self.logger.error(f"更新压缩包失败: {e}")
+            return False
+    
+    def _plan_update(self, entries: Dict[str, Optional[Tuple[int, float, Optional[int]]]],
+                     sources: Dict[str, str], mode: str, mtime_tolerance: float,
+                     verify_crc: bool = False) -> Tuple[List[Tuple[str, str, int]], set]:
+        """比对压缩包成员与源文件
+        
+        entries 为 {成员名: (大小, 修改时间戳, CRC)}，目录成员的值为 None。
+        大小不同即视为变化；成员带有 CRC 且 verify_crc 或源文件不超过
+        UPDATE_CRC_MAX_SIZE 时以 CRC 判断，否则修改时间之差小于 mtime_tolerance
+        (取决于格式的时间精度) 即视为相同。
+        返回 (需要写入的 (源文件, 名称, 大小) 列表, 保留的成员名集合)，
+        统计信息写入 last_update_stats。
+        """
+        additions = []
+        replaced = set()
+        stats = {'added': 0, 'replaced': 0, 'removed': 0, 'unchanged': 0}
+        
+        for arcname, source in sources.items():
+            stat = os.stat(source)
+            entry = entries.get(arcname)
+            if entry is None:
+                additions.append((source, arcname, stat.st_size))
+                stats['added'] += 1
+                continue
+            
+            size, mtime, crc = entry
+            if size != stat.st_size:
+                unchanged = False
+            elif crc is not None and (verify_crc or stat.st_size <= UPDATE_CRC_MAX_SIZE
+                                      or abs(mtime - stat.st_mtime) >= mtime_tolerance):
+                # 时间精度内的同大小修改只有 CRC 能发现
+                unchanged = crc == _file_crc(source)
+            else:
+                unchanged = abs(mtime - stat.st_mtime) < mtime_tolerance
+            
+            if unchanged:
+                stats['unchanged'] += 1
+            else:
+                additions.append((source, arcname, stat.st_size))
+                replaced.add(arcname)
+                stats['replaced'] += 1
+        
+        keep = set(entries) - replaced
+        if mode == 'sync':
+            # 目录成员在其下仍有文件时保留
+            parents = {parent.as_posix() for arcname in sources
+                       for parent in Path(arcname).parents}
+            stale = {name for name in keep
+                     if name not in sources and name.rstrip('/') not in parents}
+            keep -= stale
+            stats['removed'] = len(stale)
+        
+        self.last_update_stats = stats
+        return additions, keep
+    
+    def _update_zip(self, archive_path: str, sources: Dict[str, str], mode: str,
+                    profile: CompressionProfile, progress_callback: Optional[Callable],
+                    checkpoint: Optional[Callable], verify_crc: bool):
+        """增量更新 ZIP"""
+        with zipfile.ZipFile(archive_path, 'r') as zf:
+            infos = zf.infolist()
+        entries = {
+            info.filename: None if info.is_dir() else
+            (info.file_size, time.mktime(info.date_time + (0, 0, -1)), info.CRC)
+            for info in infos
+        }
+        # ZIP 的修改时间精度为 2 秒
+        additions, keep = self._plan_update(entries, sources, mode, 2, verify_crc)
+        kept = [info for info in infos if info.filename in keep]
+        
+        if len(kept) == len(infos):
+            if additions:
+                tracker = ProgressTracker(progress_callback, sum(size for _, _, size in additions),
+                                          len(additions), measure='read', checkpoint=checkpoint)
+                self._append_zip(archive_path, additions, profile, tracker)
+                tracker.finish()
+            return
+        
+        total = sum(size for _, _, size in additions) + sum(info.compress_size for info in kept)
+        tracker = ProgressTracker(progress_callback, total, len(kept) + len(additions),
+                                  measure='read', checkpoint=checkpoint)
+        self._rewrite_atomically(archive_path, '.zip', lambda temp_path: self._copy_zip(
+            archive_path, temp_path, kept, additions, profile, tracker))
+        tracker.finish()
+    
+    def _append_zip(self, archive_path: str, additions: List[Tuple[str, str, int]],
+                    profile: CompressionProfile, tracker: ProgressTracker):
+        """在 ZIP 末尾追加新成员，已有成员一个字节都不动
+        
+        追加从原中央目录处开始覆盖写入，因此先保存原中央目录及其后的内容，
+        写入失败或被取消时截断并写回，恢复原文件。这一恢复不是崩溃安全的：
+        进程在写入途中被终止或断电时压缩包可能损坏。
+        """
+        offset = zipindex.central_directory_offset(archive_path)
+        with open(archive_path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        
+        try:
+            self._write_zip(archive_path, additions, profile, tracker, mode='a')
+        except BaseException:
+            with open(archive_path, 'r+b') as f:
+                f.truncate(offset)
+                f.seek(offset)
+                f.write(tail)
+            raise
+    
+    def _copy_zip(self,
+ archive_path: str, temp_path: str, kept: List[zipfile.ZipInfo],
+                  additions: List[Tuple[str, str, int]], profile: CompressionProfile,
+                  tracker: ProgressTracker):
+        """把保留的成员原样复制到新 ZIP，再写入新增与替换的文件"""
+        with zipfile.ZipFile(archive_path, 'r') as source:
+            self._write_zip(temp_path, additions, profile, tracker, copy_from=source, kept=kept)
+    
+    def _update_7z(self, archive_path: str, sources: Dict[str, str], mode: str,
+                   profile: CompressionProfile, progress_callback: Optional[Callable],
+                   checkpoint: Optional[Callable], verify_crc: bool):
+        """增量更新 7z"""
+        import py7zr
+        from . import transcode
+        
+        with py7zr.SevenZipFile(archive_path, mode='r') as szf:
+            infos = szf.list()
+            archive_info = szf.archiveinfo()
+        entries = {
+            info.filename: None if info.is_directory else
+            (info.uncompressed, info.creationtime.timestamp() if info.creationtime else 0, info.crc32)
+            for info in infos
+        }
+        additions, keep = self._plan_update(entries, sources, mode, 1e-3, verify_crc)
+        tracker = ProgressTracker(progress_callback, sum(size for _, _, size in additions),
+                                  len(additions), measure='read', checkpoint=checkpoint)
+        
+        if len(keep) == len(infos):
+            # 只有新增：以追加模式写入新的固实块，何时拆成单文件块见 _write_7z_sessions
+            split = not archive_info.solid and archive_info.blocks >= 2
+            self._write_7z_sessions(archive_path, [(additions, profile.seven_zip_filters())],
+                                    tracker, 'a', split)
+            tracker.finish()
+            return
+        
+        def rewrite(temp_path: str):
+            sink = transcode.open_sink(temp_path, profile)
+            try:
+                # 解码进度不计入总量，只在读取时触发检查点
+                for member, stream in transcode.iter_source(
+                        archive_path, ProgressTracker(None, checkpoint=checkpoint)):
+                    if member['name'] in keep:
+                        sink.add(member, stream)
+                for source, arcname, size in additions:
+                    tracker.next_member(arcname)
+                    sink.add_file(source, arcname)
+                    tracker.update(read=size)
+            finally:
+                sink.close()
+        
+        self._rewrite_atomically(archive_path, '.7z', rewrite)
+        tracker.finish()
+    
+    @staticmethod
+    def _rewrite_atomically(archive_path: str, suffix: str, write: Callable[[str], None]):
+        """在同目录的临时文件中写出新内容，成功后原子替换原文件，失败时删除临时文件"""
+        directory = os.path.dirname(os.path.abspath(archive_path))
+        fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(archive_path) + '.',
+                                         suffix=suffix, dir=directory)
+        os.close(fd)
+        try:
+            write(temp_path)
+            shutil.copymode(archive_path, temp_path)
+            os.replace(temp_path, archive_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
     def _handle_7z(self, operation: str, archive_path: str, 
                    output_path: str, files: Optional[List[str]] = None,
-                   progress_callback: Optional[Callable] = None) -> bool:
-        """处理 7z 格式"""
+                   progress_callback: Optional[Callable] = None,
+                   checkpoint: Optional[Callable] = None) -> bool:
+        """处理 7z 格式
+        
+        传入 checkpoint 时经 TrackedReader 读取压缩包，使暂停与取消在解压的
+        读取循环中生效 (此时 py7zr 不再按块并行解压)。
+        """
+        import py7zr
+        from .progress import SevenZipProgress
+        
         try:
             if operation == 'extract':
-                with py7zr.SevenZipFile(archive_path, mode='r') as archive:
-                    if files:
-                        archive.extract(output_path, targets=files)
-                    else:
-                        archive.extractall(output_path)
+                raw = open(archive_path, 'rb') if checkpoint else None
+                try:
+                    tracker = ProgressTracker(progress_callback, checkpoint=checkpoint)
+                    source = TrackedReader(raw, tracker) if raw else archive_path
+                    with py7zr.SevenZipFile(source, mode='r') as archive:
+                        members = [info for info in archive.list()
+                                   if not files or info.filename in files]
+                        tracker.total = sum(info.uncompressed or 0 for info in members)
+                        tracker.total_members = len(members)
+                        callback = (SevenZipProgress(tracker, count_read=raw is None)
+                                    if progress_callback else None)
+                        if files:
+                            archive.extract(output_path, targets=files, callback=callback)
+                        else:
+                            archive.extractall(output_path, callback=callback)
+                finally:
+                    if raw is not None:
+                        raw.close()
+                tracker.finish()
                 return True
         except Exception as e:
             self.logger.error(f"7z 操作失败: {e}")
@@ -296,33 +1629,121 @@ class ArchiveManager:
     
     def _handle_zip(self, operation: str, archive_path: str, 
                     output_path: str, files: Optional[List[str]] = None,
-                    progress_callback: Optional[Callable] = None) -> bool:
+                    progress_callback: Optional[Callable] = None,
+                    checkpoint: Optional[Callable] = None,
+                    workers: Optional[int] = None) -> bool:
         """处理 ZIP 格式"""
         try:
             if operation == 'extract':
+                workers = workers or self.extract_workers
                 with zipfile.ZipFile(archive_path, 'r') as archive:
-                    if files:
-                        for file in files:
-                            archive.extract(file, output_path)
+                    members = [archive.getinfo(file) for file in files] if files else archive.infolist()
+                    compressed = sum(info.compress_size for info in members)
+                    tracker = ProgressTracker(progress_callback,
+                                              sum(info.file_size for info in members),
+                                              len(members), checkpoint=checkpoint)
+                    
+                    if (workers > 1 and len(members) > 1
+                            and compressed >= self.PARALLEL_EXTRACT_MIN_BYTES):
+                        self._extract_zip_parallel(archive_path, output_path, members,
+                                                   tracker, workers)
                     else:
-                        archive.extractall(output_path)
+                        for info in members:
+                            self._extract_member(archive, info, output_path, tracker)
+                tracker.finish()
                 return True
         except Exception as e:
             self.logger.error(f"ZIP 操作失败: {e}")
             return False
     
+    def _extract_zip_parallel(self, archive_path: str, output_path: str,
+                              members: List[zipfile.ZipInfo], tracker: ProgressTracker,
+                              workers: int):
+        """多线程解压 ZIP
+        
+        每个线程打开自己的 ZipFile 句柄，负责一组互不相交的成员；成员按压缩
+        大小从大到小分配给当前负载最小的线程，使各线程工作量大致均衡。
+        """
+        # 预先一次性创建目录，避免各线程重复检查
+        directories = {os.path.dirname(info.filename) for info in members}
+        directories.update(info.filename for info in members if info.is_dir())
+        for directory in directories:
+            target = safe_member_path(output_path, directory)
+            if target:
+                os.makedirs(target, exist_ok=True)
+        
+        workers = min(workers, len(members))
+        loads = [(0, i) for i in range(workers)]
+        groups: List[List[zipfile.ZipInfo]] = [[] for _ in range(workers)]
+        for info in sorted(members, key=lambda m: m.compress_size, reverse=True):
+            if info.is_dir():
+                continue
+            load, i = heapq.heappop(loads)
+            groups[i].append(info)
+            heapq.heappush(loads, (load + info.compress_size, i))
+        
+        def extract_group(group: List[zipfile.ZipInfo]):
+            with zipfile.ZipFile(archive_path, 'r') as zf:
+                for info in group:
+                    self._extract_member(zf, info, output_path, tracker)
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() 使任一线程中的异常在这里重新抛出
+            list(pool.map(extract_group, [g for g in groups if g]))
+    
+    def _extract_member(self, archive, info, output_path: str, tracker: ProgressTracker):
+        """分块解压单个成员 (ZipFile 与 RarFile 通用)，边写边报告进度"""
+        target = safe_member_path(output_path, info.filename)
+        if target is None:
+            return
+        
+        tracker.next_member(info.filename)
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+            return
+        
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        written = reported = 0
+        with archive.open(info) as src, open(target, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+                written += len(chunk)
+                # 按写出的比例估算已读取的压缩字节数，使进度与限速随读取推进
+                read = info.compress_size * written // info.file_size if info.file_size else 0
+                tracker.update(read=read - reported, written=len(chunk))
+                reported = read
+        tracker.update(read=info.compress_size - reported)
+    
     def _handle_rar(self, operation: str, archive_path: str, 
                     output_path: str, files: Optional[List[str]] = None,
-                    progress_callback: Optional[Callable] = None) -> bool:
-        """处理 RAR 格式"""
+                    progress_callback: Optional[Callable] = None,
+                    checkpoint: Optional[Callable] = None) -> bool:
+        """处理 RAR 格式
+        
+        固实 RAR 逐个打开成员需要反复从头解压，因此整体解压只在结束时报告
+        进度；非固实 RAR 按成员分块解压并报告字节进度。
+        """
+        import rarfile
+        
         try:
             if operation == 'extract':
                 with rarfile.RarFile(archive_path) as archive:
-                    if files:
-                        for file in files:
-                            archive.extract(file, output_path)
+                    members = [archive.getinfo(file) for file in files] if files else archive.infolist()
+                    tracker = ProgressTracker(progress_callback,
+                                              sum(info.file_size for info in members),
+                                              len(members), checkpoint=checkpoint)
+                    if archive.is_solid():
+                        # 整体解压由 unrar 一次完成，只能在开始前检查
+                        if checkpoint:
+                            checkpoint()
+                        if files:
+                            archive.extractall(output_path, members=members)
+                        else:
+                            archive.extractall(output_path)
                     else:
-                        archive.extractall(output_path)
+                        for info in members:
+                            self._extract_member(archive, info, output_path, tracker)
+                tracker.finish()
                 return True
         except Exception as e:
             self.logger.error(f"RAR 操作失败: {e}")
@@ -330,11 +1751,14 @@ class ArchiveManager:
     
     def _handle_tar(self, operation: str, archive_path: str, 
                     output_path: str, files: Optional[List[str]] = None,
-                    progress_callback: Optional[Callable] = None) -> bool:
-        """处理 TAR 格式"""
+                    progress_callback: Optional[Callable] = None,
+                    checkpoint: Optional[Callable] = None) -> bool:
+        """处理 TAR 格式 (含 .tar.gz/.tar.bz2/.tar.xz 与单文件 .gz/.bz2/.xz)"""
         try:
             if operation == 'extract':
-                patoolib.extract_archive(archive_path, outdir=output_path)
+                tracker = ProgressTracker(progress_callback, os.path.getsize(archive_path),
+                                          measure='read', checkpoint=checkpoint)
+                tarformat.extract(archive_path, output_path, files, tracker)
                 return True
         except Exception as e:
             self.logger.error(f"TAR 操作失败: {e}")
@@ -342,109 +1766,325 @@ class ArchiveManager:
     
     def _handle_gz(self, operation: str, archive_path: str, 
                    output_path: str, files: Optional[List[str]] = None,
-                   progress_callback: Optional[Callable] = None) -> bool:
+                   progress_callback: Optional[Callable] = None,
+                   checkpoint: Optional[Callable] = None) -> bool:
         """处理 GZ 格式"""
-        return self._handle_tar(operation, archive_path, output_path, files, progress_callback)
+        return self._handle_tar(operation, archive_path, output_path, files, progress_callback, checkpoint)
     
     def _handle_bz2(self, operation: str, archive_path: str, 
                     output_path: str, files: Optional[List[str]] = None,
-                    progress_callback: Optional[Callable] = None) -> bool:
+                    progress_callback: Optional[Callable] = None,
+                    checkpoint: Optional[Callable] = None) -> bool:
         """处理 BZ2 格式"""
-        return self._handle_tar(operation, archive_path, output_path, files, progress_callback)
+        return self._handle_tar(operation, archive_path, output_path, files, progress_callback, checkpoint)
     
     def _handle_xz(self, operation: str, archive_path: str, 
                    output_path: str, files: Optional[List[str]] = None,
-                   progress_callback: Optional[Callable] = None) -> bool:
+                   progress_callback: Optional[Callable] = None,
+                   checkpoint: Optional[Callable] = None) -> bool:
         """处理 XZ 格式"""
-        return self._handle_tar(operation, archive_path, output_path, files, progress_callback)
+        return self._handle_tar(operation, archive_path, output_path, files, progress_callback, checkpoint)
     
     def _create_7z(self, files: List[str], archive_path: str,
-                   progress_callback: Optional[Callable] = None) -> bool:
-        """创建 7z 压缩包"""
-        try:
-            with py7zr.SevenZipFile(archive_path, 'w') as archive:
-                for file_path in files:
-                    path = Path(file_path)
-                    if path.is_file():
-                        archive.write(path, path.name)
-                    elif path.is_dir():
-                        for sub_file in path.rglob('*'):
-                            if sub_file.is_file():
-                                rel_path = sub_file.relative_to(path.parent)
-                                archive.write(sub_file, str(rel_path))
+                   progress_callback: Optional[Callable] = None,
+                   profile: Optional[CompressionProfile] = None,
+                   checkpoint: Optional[Callable] = None) -> bool:
+        """创建 7z 压缩包
+        
+        设置了 solid_block_size 时，按累计大小把文件分组，每组在一次追加
+        会话中写入，py7zr 会为每次会话生成一个独立的固实块。7z 的过滤器
+        只能按块设置，已压缩的文件因此集中放在最后一个使用 COPY 的块中。
+        """
+        import py7zr
+        
+        try:
+            profile = profile or resolve_profile(None)
+            filters = profile.seven_zip_filters()
+            block_size = profile.solid_block_size
+            sources, tracker = self._prepare_sources(files, progress_callback, checkpoint)
+            
+            groups = [[]]
+            stored = []
+            group_bytes = 0
+            for source, arcname, size in sources:
+                if profile.store_incompressible and is_incompressible(source):
+                    stored.append((source, arcname, size))
+                    continue
+                
+                if block_size and groups[-1] and group_bytes + size > block_size:
+                    groups.append([])
+                    group_bytes = 0
+                groups[-1].append((source, arcname, size))
+                group_bytes += size
+            
+            sessions = [(group, filters) for group in groups if group]
+            if stored:
+                sessions.append((stored, [{'id': py7zr.FILTER_COPY}]))
+            if not sessions:
+                sessions.append(([], filters))
+            self._write_7z_sessions(archive_path, sessions, tracker, 'w')
+            tracker.finish()
             return True
         except Exception as e:
             self.logger.error(f"创建 7z 失败: {e}")
             return False
     
+    @staticmethod
+    def _write_7z_sessions(archive_path: str, sessions: List[Tuple[List[Tuple[str, str, int]], List]],
+                           tracker: ProgressTracker, mode: str, split: bool = False):
+        """按会话写入 7z，py7zr 为每次会话生成一个独立的固实块
+        
+        py7zr 在已有两个以上单文件块时追加多文件块会写出错误的头部，因此
+        默认先写多文件块 (排序稳定，同类块保持原顺序)；split 为真时压缩包中
+        已有这样的块，每个文件单独成块。mode 只用于第一次会话，之后都是追加。
+        """
+        import py7zr
+        
+        if split:
+            sessions = [([item], filters) for group, filters in sessions for item in group]
+        else:
+            sessions = sorted(sessions, key=lambda session: len(session[0]) == 1)
+        
+        for index, (group, filters) in enumerate(sessions):
+            session_mode = mode if index == 0 else 'a'
+            if not group and session_mode == 'a':
+                continue
+            with py7zr.SevenZipFile(archive_path, session_mode, filters=filters) as archive:
+                for source, arcname, size in group:
+                    tracker.next_member(arcname)
+                    archive.write(source, arcname)
+                    tracker.update(read=size)
+    
     def _create_zip(self, files: List[str], archive_path: str,
-                    progress_callback: Optional[Callable] = None) -> bool:
-        """创建 ZIP 压缩包"""
-        try:
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
-                for file_path in files:
-                    path = Path(file_path)
-                    if path.is_file():
-                        archive.write(path, path.name)
-                    elif path.is_dir():
-                        for sub_file in path.rglob('*'):
-                            if sub_file.is_file():
-                                rel_path = sub_file.relative_to(path.parent)
-                                archive.write(sub_file, str(rel_path))
+                    progress_callback: Optional[Callable] = None,
+                    profile: Optional[CompressionProfile] = None,
+                    checkpoint: Optional[Callable] = None) -> bool:
+        """创建 ZIP 压缩包，写入方式见 _write_zip"""
+        try:
+            profile = profile or resolve_profile(None)
+            sources, tracker = self._prepare_sources(files, progress_callback, checkpoint)
+            self._write_zip(archive_path, sources, profile, tracker)
+            tracker.finish()
             return True
         except Exception as e:
             self.logger.error(f"创建 ZIP 失败: {e}")
             return False
     
+    def _write_zip(self, archive_path: str, sources: List[Tuple[str, str, int]],
+                   profile: CompressionProfile, tracker: ProgressTracker, mode: str = 'w',
+                   copy_from: Optional[zipfile.ZipFile] = None,
+                   kept: Iterable[zipfile.ZipInfo] = ()):
+        """写入 ZIP：先原样复制 copy_from 中的 kept 成员，再压缩 sources
+        
+        mode 为 'a' 时在已有 ZIP 的末尾追加。DEFLATE 与 STORED 多线程并行压缩，
+        其余方法使用 zipfile 逐个写入；两种方式下已压缩的文件都按成员改为 STORED。
+        """
+        compress_type = profile.zip_method()
+        level = profile.zip_level()
+        
+        if compress_type in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            with ParallelZipWriter(archive_path, compress_type, level,
+                                   store_incompressible=profile.store_incompressible,
+                                   progress=tracker, mode=mode) as writer:
+                for info in kept:
+                    writer.copy_entry(copy_from, info)
+                writer.write_all((source, arcname) for source, arcname, _ in sources)
+        else:
+            with zipfile.ZipFile(archive_path, mode, compress_type,
+                                 allowZip64=True, compresslevel=level) as archive:
+                for info in kept:
+                    tracker.next_member(info.filename)
+                    copy_entry(archive, copy_from, info)
+                    tracker.update(read=info.compress_size, written=info.compress_size)
+                for source, arcname, size in sources:
+                    tracker.next_member(arcname)
+                    if profile.store_incompressible and is_incompressible(source):
+                        archive.write(source, arcname, zipfile.ZIP_STORED)
+                    else:
+                        archive.write(source, arcname)
+                    tracker.update(read=size, written=archive.getinfo(arcname).compress_size)
+    
+    def _create_tar(self, files: List[str], archive_path: str, format_type: str,
+                    profile: Optional[CompressionProfile] = None,
+                    progress_callback: Optional[Callable] = None,
+                    checkpoint: Optional[Callable] = None) -> bool:
+        """创建 TAR 压缩包"""
+        try:
+            profile = profile or resolve_profile(None)
+            compression = 'gz' if format_type == 'tgz' else format_type.partition('.')[2]
+            sources, tracker = self._prepare_sources(files, progress_callback, checkpoint)
+            tarformat.create_tar(((source, arcname) for source, arcname, _ in sources),
+                                 archive_path, compression, profile.level, tracker)
+            return True
+        except Exception as e:
+            self.logger.error(f"创建 TAR 失败: {e}")
+            return False
+    
+    def _prepare_sources(self, files: List[str], progress_callback: Optional[Callable],
+                         checkpoint: Optional[Callable] = None
+                         ) -> Tuple[List[Tuple[str, str, int]], ProgressTracker]:
+        """展开待压缩文件并统计总大小，返回 (源文件, 名称, 大小) 列表与进度跟踪器"""
+        sources = [(source, arcname, os.path.getsize(source))
+                   for source, arcname in self._iter_source_files(files)]
+        tracker = ProgressTracker(progress_callback, sum(size for _, _, size in sources),
+                                  len(sources), measure='read', checkpoint=checkpoint)
+        return sources, tracker
+    
+    @staticmethod
+    def _iter_source_files(files: List[str]) -> Iterator[Tuple[str, str]]:
+        """展开待压缩的文件与目录，产出 (源文件路径, 压缩包内名称)"""
+        for file_path in files:
+            path = Path(file_path)
+            if path.is_file():
+                yield str(path), path.name
+            elif path.is_dir():
+                for sub_file in path.rglob('*'):
+                    if sub_file.is_file():
+                        rel_path = sub_file.relative_to(path.parent)
+                        yield str(sub_file), rel_path.as_posix()
+    
     def get_archive_details(self, archive_path: str) -> Dict:
-        """获取压缩包详细信息"""
+        """获取压缩包详细信息
+        
+        依次查找内存缓存和数据库成员索引 (以 size/mtime 校验是否过期)，
+        都未命中时才打开压缩包读取，结果放入缓存；压缩包已在索引中 (记录
+        已过期) 时同时刷新其索引，从未扫描过的压缩包不会因此加入索引。
+        """
         try:
-            path = Path(archive_path)
+            path = Path(archive_path).absolute()
             if not path.exists():
                 raise FileNotFoundError(f"文件不存在: {archive_path}")
             
-            suffix = path.suffix.lower()
-            files = []
+            stat = path.stat()
+            key = (str(path), stat.st_size, stat.st_mtime_ns)
             
-            if suffix == '.zip':
-                with zipfile.ZipFile(archive_path, 'r') as zf:
-                    for info in zf.infolist():
-                        files.append({
-                            'name': info.filename,
-                            'size': info.file_size,
-                            'compressed_size': info.compress_size,
-                            'modified': datetime(*info.date_time)
-                        })
-            elif suffix == '.7z':
-                with py7zr.SevenZipFile(archive_path, mode='r') as szf:
-                    for info in szf.list():
-                        files.append({
-                            'name': info.filename,
-                            'size': info.uncompressed if hasattr(info, 'uncompressed') else 0,
-                            'compressed_size': info.compressed if hasattr(info, 'compressed') else 0,
-                            'modified': info.creationtime if hasattr(info, 'creationtime') else datetime.now()
-                        })
-            elif suffix == '.rar':
-                with rarfile.RarFile(archive_path) as rf:
-                    for info in rf.infolist():
-                        files.append({
-                            'name': info.filename,
-                            'size': info.file_size,
-                            'compressed_size': info.compress_size,
-                            'modified': datetime(*info.date_time)
-                        })
+            details = self._details_cache.get(key)
+            if details is not None:
+                return details
             
-            return {
+            files = self._load_indexed_members(str(path), stat)
+            if files is None:
+                files = _list_members(str(path))
+                if self._get_indexed_archive(str(path)) is not None:
+                    archive_info = self._get_archive_info(path, stat, len(files))
+                    archive_info['members'] = files
+                    self._save_archive(archive_info)
+            
+            details = {
                 'files': files,
                 'file_count': len(files),
                 'total_size': sum(f['size'] for f in files),
                 'compressed_size': sum(f.get('compressed_size', 0) for f in files)
             }
+            self._details_cache.put(key, details)
+            return details
             
         except Exception as e:
             self.logger.error(f"获取压缩包详情失败: {e}")
             return {'files': [], 'file_count': 0, 'total_size': 0, 'compressed_size': 0}
     
+    def iter_archive_members(self, archive_path: str, page_size: int = 1000) -> Iterator[Dict]:
+        """流式产出压缩包成员，不在内存中构建完整列表
+        
+        优先使用详情缓存或未过期的成员索引 (按页读取)，否则直接遍历
+        ZIP 中央目录 / 7z 头 / RAR 列表。
+        """
+        path = Path(archive_path).absolute()
+        if not path.exists():
+            raise FileNotFoundError(f"文件不存在: {archive_path}")
+        
+        stat = path.stat()
+        details = self._details_cache.get((str(path), stat.st_size, stat.st_mtime_ns))
+        if details is not None:
+            yield from details['files']
+            return
+        
+        with self._pool.reader() as conn:
+            row = conn.execute('''
+                SELECT id, file_count, 
+                       (SELECT COUNT(*) FROM archive_files WHERE archive_id = archives.id) AS indexed
+                FROM archives WHERE path = ? AND size = ? AND mtime_ns = ?
+            ''', (str(path), stat.st_size, stat.st_mtime_ns)).fetchone()
+        
+        if row is None or row['indexed'] != (row['file_count'] or 0):
+            yield from _iter_members(str(path))
+            return
+        
+        last_id = 0
+        while True:
+            with self._pool.reader() as conn:
+                rows = [_member_from_row(r) for r in conn.execute('''
+                    SELECT id, path AS name, size, compressed_size, modified, crc 
+                    FROM archive_files WHERE archive_id = ? AND id > ?
+                    ORDER BY id LIMIT ?
+                ''', (row['id'], last_id, page_size))]
+            
+            for member in rows:
+                last_id = member.pop('id')
+                yield member
+            
+            if len(rows) < page_size:
+                return
+    
+    def get_member_totals(self, archive_path: str) -> Optional[Dict]:
+        """压缩包成员的汇总 (count/size/compressed_size)，取自详情缓存或未过期的成员索引
+        
+        两者都没有时返回 None (调用方只能在遍历成员时自行累计)。
+        """
+        try:
+            path = Path(archive_path).absolute()
+            stat = path.stat()
+            details = self._details_cache.get((str(path), stat.st_size, stat.st_mtime_ns))
+            if details is not None:
+                files = details['files']
+                return {
+                    'count': len(files),
+                    'size': sum(f['size'] or 0 for f in files),
+                    'compressed_size': sum(f.get('compressed_size') or 0 for f in files)
+                }
+            
+            with self._pool.reader() as conn:
+                row = conn.execute('''
+                    SELECT a.file_count, COUNT(f.id) AS indexed,
+                           COALESCE(SUM(f.size), 0) AS size,
+                           COALESCE(SUM(f.compressed_size), 0) AS compressed_size
+                    FROM archives a LEFT JOIN archive_files f ON f.archive_id = a.id
+                    WHERE a.path = ? AND a.size = ? AND a.mtime_ns = ?
+                    GROUP BY a.id
+                ''', (str(path), stat.st_size, stat.st_mtime_ns)).fetchone()
+            
+            # 旧版本扫描的记录没有成员索引
+            if row is None or row['indexed'] != (row['file_count'] or 0):
+                return None
+            return {'count': row['indexed'], 'size': row['size'],
+                    'compressed_size': row['compressed_size']}
+            
+        except Exception as e:
+            self.logger.error(f"读取成员汇总失败 {archive_path}: {e}")
+            return None
+    
+    def _load_indexed_members(self, archive_path: str, stat: os.stat_result) -> Optional[List[Dict]]:
+        """从成员索引读取压缩包内容，索引缺失或已过期时返回 None"""
+        with self._pool.reader() as conn:
+            row = conn.execute('''
+                SELECT id, file_count FROM archives 
+                WHERE path = ? AND size = ? AND mtime_ns = ?
+            ''', (archive_path, stat.st_size, stat.st_mtime_ns)).fetchone()
+            if row is None:
+                return None
+            
+            cursor = conn.execute('''
+                SELECT path AS name, size, compressed_size, modified, crc 
+                FROM archive_files WHERE archive_id = ? ORDER BY id
+            ''', (row['id'],))
+            files = [_member_from_row(r) for r in cursor]
+        
+        # 旧版本扫描的记录没有成员索引
+        if len(files) != (row['file_count'] or 0):
+            return None
+        return files
+    
     def close(self):
         """关闭管理器"""
+        self._pool.close()
         self.logger.info("压缩包管理器已关闭")
\ No newline at end of file
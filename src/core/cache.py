@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩包详情缓存 - 按条目总数限制容量的 LRU
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class DetailsCache:
+    """压缩包详情的内存 LRU 缓存
+    
+    键为 (path, size, mtime_ns)，压缩包被修改后旧键自然失效；容量按缓存中
+    成员条目的总数计算，而不是按压缩包个数，避免少数巨型压缩包占满内存。
+    """
+    
+    def __init__(self, max_entries: int = 200000):
+        self.max_entries = max_entries
+        self._items: 'OrderedDict[Tuple, Dict]' = OrderedDict()
+        self._keys_by_path: Dict[str, Tuple] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _weight(details: Dict) -> int:
+        """缓存项的权重：成员条目数 + 1"""
+        return len(details.get('files', ())) + 1
+    
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """查找缓存，命中时移到最近使用的位置"""
+        with self._lock:
+            details = self._items.get(key)
+            if details is not None:
+                self._items.move_to_end(key)
+            return details
+    
+    def put(self, key: Tuple, details: Dict):
+        """写入缓存，同一路径的旧版本会被替换"""
+        weight = self._weight(details)
+        if weight > self.max_entries:
+            return
+        
+        with self._lock:
+            old_key = self._keys_by_path.get(key[0])
+            if old_key is not None:
+                self._remove(old_key)
+            
+            self._items[key] = details
+            self._keys_by_path[key[0]] = key
+            self._total += weight
+            
+            while self._total > self.max_entries:
+                self._remove(next(iter(self._items)))
+    
+    def invalidate(self, path: str):
+        """删除某个压缩包的缓存"""
+        with self._lock:
+            key = self._keys_by_path.get(path)
+            if key is not None:
+                self._remove(key)
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._items.clear()
+            self._keys_by_path.clear()
+            self._total = 0
+    
+    def _remove(self, key: Tuple):
+        """移除一项 (调用方需持有锁)"""
+        details = self._items.pop(key)
+        self._keys_by_path.pop(key[0], None)
+        self._total -= self._weight(details)
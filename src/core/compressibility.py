@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可压缩性判断 - 按扩展名与采样熵识别已压缩的内容
+"""
+
+import math
+from collections import Counter
+from pathlib import Path
+
+# 本身已经压缩过的常见格式，再次压缩几乎没有收益
+INCOMPRESSIBLE_EXTENSIONS = frozenset({
+    # 图片
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif', '.avif', '.jxl',
+    # 音视频
+    '.mp3', '.aac', '.m4a', '.ogg', '.opus', '.flac', '.wma',
+    '.mp4', '.m4v', '.mkv', '.mov', '.avi', '.webm', '.wmv', '.flv',
+    # 压缩包与安装包
+    '.zip', '.7z', '.rar', '.gz', '.tgz', '.bz2', '.xz', '.txz', '.zst', '.lz4',
+    '.cab', '.jar', '.apk', '.ipa', '.deb', '.rpm', '.dmg', '.whl',
+    # 文档 (内部为 ZIP 或已压缩流)
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub',
+    # 字体
+    '.woff', '.woff2',
+})
+
+# 采样大小与判定阈值 (位/字节，随机数据约为 8)
+SAMPLE_SIZE = 64 * 1024
+ENTROPY_THRESHOLD = 7.5
+
+# 小于该大小的文件不做采样，压缩它们的开销可以忽略
+MIN_SAMPLE_FILE_SIZE = 4096
+
+
+def sample_entropy(data: bytes) -> float:
+    """计算字节序列的香农熵 (位/字节)"""
+    if not data:
+        return 0.0
+    
+    total = len(data)
+    entropy = 0.0
+    for count in Counter(data).values():
+        p = count / total
+        entropy -= p * math.log2(p)
+    return entropy
+
+
+def is_incompressible(file_path: str, sample_size: int = SAMPLE_SIZE,
+                      threshold: float = ENTROPY_THRESHOLD) -> bool:
+    """判断文件是否不值得压缩
+    
+    先按扩展名判断，再读取文件开头的一段样本计算熵，熵接近 8 的数据
+    (已压缩或加密) 直接存储即可。
+    """
+    path = Path(file_path)
+    if path.suffix.lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return True
+    
+    try:
+        if path.stat().st_size < MIN_SAMPLE_FILE_SIZE:
+            return False
+        with open(path, 'rb') as f:
+            sample = f.read(sample_size)
+    except OSError:
+        return False
+    
+    return sample_entropy(sample) >= threshold
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享常量 - 各模块读写数据时共用的缓冲区大小
+"""
+
+# 读写文件与成员数据时的块大小
+CHUNK_SIZE = 1024 * 1024
+
+# 需要先缓存再写入的数据在内存中的上限，超过后溢出到临时文件
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库连接管理 - SQLite 连接池与批量写入
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class ConnectionPool:
+    """SQLite 连接池
+    
+    所有写操作共用一个写连接并串行执行；读操作从池中取得各自的连接，
+    在 WAL 模式下可以与写操作并发进行。
+    """
+    
+    def __init__(self, db_path: str, size: int = 4):
+        self.db_path = db_path
+        self.size = size
+        self._readers: queue.Queue = queue.Queue(maxsize=size)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建并配置一个新连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL 模式下 NORMAL 只在检查点时 fsync，崩溃时不会损坏数据库
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-16000')  # 约 16MB
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """借出一个读连接，结果行为 sqlite3.Row"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        
+        try:
+            yield conn
+        finally:
+            # 结束可能残留的读事务，避免阻止 WAL 检查点
+            conn.rollback()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """独占写连接，退出时提交事务，出错时回滚"""
+        with self._write_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+    
+    def close(self):
+        """关闭所有连接"""
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class BatchWriter:
+    """批量写入器
+    
+    累积待写入的记录，累计权重 (默认每条记录为 1，可按实际写入行数计) 达到
+    batch_size 或距上次提交超过 flush_interval 秒时，在一个事务中调用
+    flush_func(conn, items) 统一写入。记录停止到达时，定时器在第一条未提交
+    记录加入 flush_interval 秒后提交，读取方最多延迟这么久就能看到数据；
+    定时器线程中的写入错误在下一次 add/flush 时重新抛出。
+    """
+    
+    def __init__(self, pool: ConnectionPool, flush_func: Callable[[sqlite3.Connection, List[Any]], None],
+                 batch_size: int = 500, flush_interval: float = 0.2):
+        self.pool = pool
+        self.flush_func = flush_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._items: List[Any] = []
+        self._weight = 0
+        self._last_flush = time.monotonic()
+        # 保护缓冲区并串行化提交，保证批次按加入顺序写入
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._error: Optional[Exception] = None
+    
+    def add(self, item: Any, weight: int = 1):
+        """加入一条记录，必要时触发提交"""
+        with self._lock:
+            self._raise_timer_error()
+            self._items.append(item)
+            self._weight += weight
+            if (self._weight >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        """立即提交已累积的记录"""
+        with self._lock:
+            self._raise_timer_error()
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        """在持有锁时提交缓冲区"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._last_flush = time.monotonic()
+        if not self._items:
+            return
+        
+        items, self._items = self._items, []
+        self._weight = 0
+        with self.pool.writer() as conn:
+            self.flush_func(conn, items)
+    
+    def _flush_on_timer(self):
+        """定时器线程：提交空闲时残留的记录"""
+        with self._lock:
+            try:
+                self._flush_locked()
+            except Exception as e:
+                self._error = e
+    
+    def _raise_timer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def __enter__(self) -> 'BatchWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务 - 可取消、可暂停的任务与按资源类型限流的任务管理器
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class JobCancelled(BaseException):
+    """任务被取消
+    
+    继承自 BaseException，使各处理器中的 except Exception 不会吞掉取消请求，
+    取消可以一直传播到任务的入口。
+    """
+
+
+class Job:
+    """后台任务句柄
+    
+    任务函数以 Job 为唯一参数被调用，应把 job.checkpoint 与 job.report_progress
+    传给 ArchiveManager 的 checkpoint 与 progress_callback 参数。checkpoint 在
+    暂停时阻塞，在取消后抛出 JobCancelled。
+    """
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, name: str, func: Callable[['Job'], Any], kind: str = 'io',
+                 listener: Optional[Callable[['Job'], None]] = None):
+        self.id = next(self._ids)
+        self.name = name
+        self.kind = kind
+        self.status = self.PENDING
+        self.result = None
+        self.error: Optional[BaseException] = None
+        # 最近一次进度 (done, total, stats)
+        self.progress = (0, 0, {})
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._func = func
+        self._listener = listener
+        self._cancelled = threading.Event()
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+    
+    @property
+    def is_done(self) -> bool:
+        """任务是否已结束 (完成、失败或取消)"""
+        return self._done.is_set()
+    
+    def checkpoint(self):
+        """协作检查点：暂停时阻塞，取消后抛出 JobCancelled"""
+        if not self._unpaused.is_set():
+            self._unpaused.wait()
+        if self._cancelled.is_set():
+            raise JobCancelled(self.name)
+    
+    def report_progress(self, done: int, total: int, stats: Optional[Dict] = None):
+        """记录进度并通知监听者"""
+        self.progress = (done, total, stats or {})
+        self._notify()
+    
+    def cancel(self):
+        """请求取消，正在暂停的任务会被唤醒以便退出"""
+        with self._lock:
+            if self.is_done:
+                return
+            self._cancelled.set()
+            self._unpaused.set()
+        self._notify()
+    
+    def pause(self):
+        """请求暂停，任务在下一个检查点处停下"""
+        with self._lock:
+            if self.status not in (self.PENDING, self.RUNNING):
+                return
+            self._unpaused.clear()
+            self.status = self.PAUSED
+        self._notify()
+    
+    def resume(self):
+        """继续已暂停的任务"""
+        with self._lock:
+            if self.status != self.PAUSED:
+                return
+            self.status = self.RUNNING if self.started else self.PENDING
+            self._unpaused.set()
+        self._notify()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务结束，返回是否已结束"""
+        return self._done.wait(timeout)
+    
+    def _run(self):
+        """在任务线程中执行任务函数"""
+        try:
+            self.checkpoint()
+            with self._lock:
+                self.started = time.time()
+                if self.status == self.PENDING:
+                    self.status = self.RUNNING
+            self._notify()
+            self.result = self._func(self)
+            # 任务函数可能吞掉了取消 (例如在子线程中)，以取消标记为准
+            status = self.CANCELLED if self._cancelled.is_set() else self.COMPLETED
+        except JobCancelled:
+            status = self.CANCELLED
+        except Exception as e:
+            logging.getLogger(__name__).error(f"任务失败 {self.name}: {e}")
+            self.error = e
+            status = self.FAILED
+        
+        with self._lock:
+            self.status = status
+            self.finished = time.time()
+            self._done.set()
+        self._notify()
+    
+    def _notify(self):
+        """通知监听者任务状态或进度发生变化"""
+        if self._listener:
+            self._listener(self)
+
+
+class JobManager:
+    """任务管理器
+    
+    任务按资源类型排队执行：'cpu' (压缩等计算密集任务) 与 'io' (扫描、解压等
+    磁盘密集任务) 各有独立的并发上限，超出上限的任务保持 pending 直到有空位。
+    listener(job) 在任务状态或进度变化时被调用 (来自任务线程)。
+    """
+    
+    def __init__(self, max_cpu_jobs: Optional[int] = None, max_io_jobs: int = 2,
+                 listener: Optional[Callable[[Job], None]] = None):
+        self.listener = listener
+        self._executors = {
+            'cpu': ThreadPoolExecutor(max_workers=max_cpu_jobs or max(1, (os.cpu_count() or 2) // 2),
+                                      thread_name_prefix='job-cpu'),
+            'io': ThreadPoolExecutor(max_workers=max_io_jobs, thread_name_prefix='job-io'),
+        }
+        self._jobs: Dict[int, Job] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, name: str, func: Callable[[Job], Any], kind: str = 'io') -> Job:
+        """提交任务，返回任务句柄"""
+        if kind not in self._executors:
+            raise ValueError(f"未知的任务类型: {kind}")
+        
+        job = Job(name, func, kind, self._on_job_changed)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._on_job_changed(job)
+        self._executors[kind].submit(job._run)
+        return job
+    
+    def get(self, job_id: int) -> Optional[Job]:
+        """按 ID 查找任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self) -> List[Job]:
+        """按提交顺序列出全部任务"""
+        with self._lock:
+            return list(self._jobs.values())
+    
+    def clear_finished(self):
+        """移除已结束的任务"""
+        with self._lock:
+            for job_id in [i for i, job in self._jobs.items() if job.is_done]:
+                del self._jobs[job_id]
+    
+    def cancel_all(self):
+        """取消全部未结束的任务"""
+        for job in self.list_jobs():
+            job.cancel()
+    
+    def shutdown(self, wait: bool = True):
+        """取消全部任务并关闭线程池"""
+        self.cancel_all()
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+    
+    def _on_job_changed(self, job: Job):
+        if self.listener:
+            self.listener(job)
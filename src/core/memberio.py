@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成员读取 - 不落盘地按名称读取压缩包中的单个或多个成员
+"""
+
+import functools
+import io
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable
+
+from . import tarformat
+from .constants import SPOOL_MAX_SIZE
+
+
+class MemberStream(io.BufferedIOBase):
+    """压缩包成员的只读流，关闭时一并关闭其所属的压缩包"""
+    
+    def __init__(self, stream: BinaryIO, *owners):
+        super().__init__()
+        self._stream = stream
+        self._owners = owners
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+    
+    def read1(self, size: int = -1) -> bytes:
+        read1 = getattr(self._stream, 'read1', self._stream.read)
+        return read1(size)
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._stream.close()
+            for owner in self._owners:
+                owner.close()
+        finally:
+            super().close()
+
+
+@functools.lru_cache(maxsize=None)
+def _spooled_factory_class() -> type:
+    """定义 _SpooledFactory (py7zr 要求解压目标继承 Py7zIO)，第一次调用时才导入 py7zr"""
+    from py7zr.io import Py7zIO, WriterFactory
+    
+    class _SpooledMember(Py7zIO):
+        """py7zr 的解压目标：小成员留在内存，大成员溢出到临时文件"""
+        
+        def __init__(self):
+            self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        
+        def write(self, s) -> int:
+            return self.file.write(s)
+        
+        def read(self, size=None) -> bytes:
+            return self.file.read(-1 if size is None else size)
+        
+        def seek(self, offset: int, whence: int = 0) -> int:
+            return self.file.seek(offset, whence)
+        
+        def flush(self):
+            self.file.flush()
+        
+        def size(self) -> int:
+            position = self.file.tell()
+            self.file.seek(0, io.SEEK_END)
+            size = self.file.tell()
+            self.file.seek(position)
+            return size
+        
+        def close(self):
+            # py7zr 在成员解压完成时调用，数据需要保留到调用方读取
+            pass
+    
+    class _SpooledFactory(WriterFactory):
+        """按成员名收集 _SpooledMember"""
+        
+        def __init__(self):
+            self.products: Dict[str, _SpooledMember] = {}
+        
+        def create(self, filename: str) -> Py7zIO:
+            product = _SpooledMember()
+            self.products[filename] = product
+            return product
+        
+        def discard(self):
+            """释放所有尚未取走的解压结果"""
+            for product in self.products.values():
+                product.file.close()
+            self.products.clear()
+    
+    return _SpooledFactory
+
+
+def _decode_7z(archive_path: str, names: Iterable[str]) -> Dict:
+    """一次性解压 7z 中的指定成员
+    
+    py7zr 只解码包含目标成员的固实块，同一固实块内的多个目标共享一次解码。
+    返回 {成员名: 解压结果}，解压结果的 file 为可定位的文件对象。
+    """
+    import py7zr
+    factory = _spooled_factory_class()()
+    try:
+        with py7zr.SevenZipFile(archive_path, mode='r') as szf:
+            szf.extract(targets=list(names), factory=factory)
+    except BaseException:
+        factory.discard()
+        raise
+    return factory.products
+
+
+def open_member(archive_path: str, name: str) -> BinaryIO:
+    """打开压缩包中的单个成员，返回只读流
+    
+    ZIP、RAR 与 TAR 直接流式解压；7z 只解码该成员所在的固实块，结果
+    超过 SPOOL_MAX_SIZE 时溢出到临时文件。成员不存在时抛出 KeyError。
+    """
+    suffix = Path(archive_path).suffix.lower()
+    
+    if suffix == '.zip':
+        zf = zipfile.ZipFile(archive_path, 'r')
+        try:
+            return MemberStream(zf.open(name), zf)
+        except BaseException:
+            zf.close()
+            raise
+    
+    if suffix == '.rar':
+        import rarfile
+        rf = rarfile.RarFile(archive_path)
+        try:
+            return MemberStream(rf.open(name), rf)
+        except rarfile.NoRarEntry:
+            rf.close()
+            raise KeyError(f"压缩包中没有成员: {name}")
+        except BaseException:
+            rf.close()
+            raise
+    
+    if suffix == '.7z':
+        products = _decode_7z(archive_path, [name])
+        if name not in products:
+            raise KeyError(f"压缩包中没有成员: {name}")
+        spooled = products[name].file
+        spooled.seek(0)
+        return MemberStream(spooled)
+    
+    if tarformat.is_tarball(archive_path):
+        tf = tarfile.open(archive_path, 'r:*')
+        try:
+            for info in tf:
+                if info.name == name and info.isfile():
+                    return MemberStream(tf.extractfile(info), tf)
+            raise KeyError(f"压缩包中没有成员: {name}")
+        except BaseException:
+            tf.close()
+            raise
+    
+    if suffix in tarformat.COMPRESSED_OPENERS:
+        if name != Path(archive_path).stem:
+            raise KeyError(f"压缩包中没有成员: {name}")
+        return MemberStream(tarformat.COMPRESSED_OPENERS[suffix](archive_path, 'rb'))
+    
+    raise ValueError(f"不支持的压缩格式: {suffix}")
+
+
+def read_members(archive_path: str, names: Iterable[str]) -> Dict[str, bytes]:
+    """读取压缩包中的多个成员，返回 {成员名: 内容}
+    
+    压缩包只打开一次：7z 的每个固实块最多解码一次，TAR 只顺序读取一遍。
+    不存在的成员不出现在结果中。
+    """
+    wanted = set(names)
+    suffix = Path(archive_path).suffix.lower()
+    result: Dict[str, bytes] = {}
+    if not wanted:
+        return result
+    
+    if suffix == '.zip':
+        with zipfile.ZipFile(archive_path, 'r') as zf:
+            for name in wanted:
+                try:
+                    result[name] = zf.read(name)
+                except KeyError:
+                    pass
+    
+    elif suffix == '.rar':
+        import rarfile
+        with rarfile.RarFile(archive_path) as rf:
+            for name in wanted:
+                try:
+                    result[name] = rf.read(name)
+                except rarfile.NoRarEntry:
+                    pass
+    
+    elif suffix == '.7z':
+        products = _decode_7z(archive_path, wanted)
+        for name, product in products.items():
+            product.file.seek(0)
+            result[name] = product.file.read()
+            product.file.close()
+    
+    elif tarformat.is_tarball(archive_path):
+        with tarfile.open(archive_path, 'r:*') as tf:
+            for info in tf:
+                if info.name in wanted and info.isfile():
+                    result[info.name] = tf.extractfile(info).read()
+                    if len(result) == len(wanted):
+                        break
+    
+    elif suffix in tarformat.COMPRESSED_OPENERS:
+        name = Path(archive_path).stem
+        if name in wanted:
+            with tarformat.COMPRESSED_OPENERS[suffix](archive_path, 'rb') as f:
+                result[name] = f.read()
+    
+    else:
+        raise ValueError(f"不支持的压缩格式: {suffix}")
+    
+    return result
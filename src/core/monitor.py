@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时监控 - 基于 watchdog 监视扫描根目录，去抖后增量更新索引
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+# 事件平息多久后才刷新索引 (秒)
+DEBOUNCE = 1.0
+
+# 持续有事件时最长的等待时间 (秒)，避免正在写入的大文件拖住其他变化
+MAX_DELAY = 10.0
+
+
+class _EventHandler(FileSystemEventHandler):
+    """把 watchdog 事件转换为待刷新的路径"""
+    
+    def __init__(self, monitor: 'ArchiveMonitor'):
+        super().__init__()
+        self.monitor = monitor
+    
+    def on_created(self, event):
+        self.monitor.touch(event.src_path, event.is_directory)
+    
+    def on_modified(self, event):
+        # 目录的修改事件只表示其中有条目变化，条目本身会有各自的事件
+        if not event.is_directory:
+            self.monitor.touch(event.src_path, False)
+    
+    def on_deleted(self, event):
+        self.monitor.touch(event.src_path, event.is_directory)
+    
+    def on_moved(self, event):
+        self.monitor.touch(event.src_path, event.is_directory)
+        self.monitor.touch(event.dest_path, event.is_directory)
+    
+    def on_closed(self, event):
+        self.monitor.touch(event.src_path, event.is_directory)
+
+
+class ArchiveMonitor:
+    """压缩包实时监控
+    
+    监视在 ArchiveManager 中登记的扫描根目录。文件系统事件先累积在待刷新
+    集合中，事件平息 debounce 秒后 (或最早的事件已等待 max_delay 秒) 统一
+    交给 ArchiveManager.refresh_paths：只重新探测新增、修改或移入的压缩包，
+    删除已移除压缩包的记录。listener(changes) 在刷新产生变化时被调用
+    (来自监控线程)，changes 为 refresh_paths 的返回值。
+    """
+    
+    def __init__(self, manager, listener: Optional[Callable[[Dict], None]] = None,
+                 debounce: float = DEBOUNCE, max_delay: float = MAX_DELAY):
+        self.manager = manager
+        self.listener = listener
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+        
+        self._handler = _EventHandler(self)
+        self._observer: Optional[Observer] = None
+        self._watches: Dict[str, object] = {}
+        self._pending: Dict[str, float] = {}
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+    
+    @property
+    def roots(self) -> List[str]:
+        """正在监视的根目录"""
+        return sorted(self._watches)
+    
+    def start(self):
+        """开始监视全部已登记的扫描根目录"""
+        if self._observer is not None:
+            return
+        
+        self._stopping = False
+        self._observer = Observer()
+        self._observer.daemon = True
+        for root in self.manager.get_scan_roots():
+            self._schedule(root)
+        self._observer.start()
+        
+        self._worker = threading.Thread(target=self._run, name='archive-monitor', daemon=True)
+        self._worker.start()
+        self.logger.info(f"实时监控已启动，监视 {len(self._watches)} 个目录")
+    
+    def stop(self):
+        """停止监视并丢弃尚未刷新的事件"""
+        if self._observer is None:
+            return
+        
+        with self._condition:
+            self._stopping = True
+            self._pending.clear()
+            self._condition.notify()
+        self._observer.stop()
+        self._observer.join()
+        self._worker.join()
+        self._observer = None
+        self._worker = None
+        self._watches.clear()
+        self.logger.info("实时监控已停止")
+    
+    def add_root(self, directory: str):
+        """登记并开始监视扫描根目录"""
+        self.manager.add_scan_root(directory)
+        if self._observer is not None:
+            self._schedule(os.path.abspath(directory))
+    
+    def remove_root(self, directory: str):
+        """取消登记并停止监视扫描根目录"""
+        root = os.path.abspath(directory)
+        self.manager.remove_scan_root(root)
+        watch = self._watches.pop(root, None)
+        if watch is not None and self._observer is not None:
+            self._observer.unschedule(watch)
+    
+    def touch(self, path: str, is_directory: bool = False):
+        """记录一个发生变化的路径 (由事件处理器调用)"""
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        if not is_directory and os.path.splitext(path)[1].lower() not in self.manager.supported_formats:
+            return
+        
+        now = time.monotonic()
+        with self._condition:
+            if not self._pending:
+                self._first_event = now
+            self._pending[path] = now
+            self._last_event = now
+            self._condition.notify()
+    
+    def _schedule(self, root: str):
+        """开始监视单个根目录"""
+        if root in self._watches:
+            return
+        if not os.path.isdir(root):
+            self.logger.warning(f"监视目录不存在: {root}")
+            return
+        try:
+            self._watches[root] = self._observer.schedule(self._handler, root, recursive=True)
+        except OSError as e:
+            self.logger.warning(f"无法监视目录 {root}: {e}")
+    
+    def _run(self):
+        """监控线程：等待事件平息后批量刷新索引"""
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if self._pending:
+                        now = time.monotonic()
+                        deadline = min(self._last_event + self.debounce,
+                                       self._first_event + self.max_delay)
+                        if now >= deadline:
+                            break
+                        self._condition.wait(deadline - now)
+                    else:
+                        self._condition.wait()
+                if self._stopping:
+                    return
+                paths = list(self._pending)
+                self._pending.clear()
+            
+            self._flush(paths)
+    
+    def _flush(self, paths: List[str]):
+        """刷新一批路径并通知监听者"""
+        try:
+            changes = self.manager.refresh_paths(paths)
+        except Exception as e:
+            self.logger.error(f"更新索引失败: {e}")
+            return
+        
+        if self.listener and (changes['updated'] or changes['removed']):
+            self.listener(changes)
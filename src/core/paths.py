@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+路径处理 - 把压缩包成员名安全地映射到输出目录
+"""
+
+import os
+from typing import Optional
+
+
+def safe_member_path(output_path: str, name: str) -> Optional[str]:
+    """把成员名映射到输出目录下的路径，去掉绝对路径、盘符和 .. 等成分"""
+    parts = [p for p in name.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    if parts and os.path.splitdrive(parts[0])[0]:
+        parts[0] = os.path.splitdrive(parts[0])[1]
+    parts = [p for p in parts if p]
+    if not parts:
+        return None
+    return os.path.join(output_path, *parts)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩配置 - 压缩方法、级别与 7z 固实块设置
+"""
+
+import zipfile
+from typing import Dict, List, Optional, Union
+
+# 支持的压缩方法
+METHODS = ('stored', 'deflate', 'bzip2', 'lzma', 'zstd')
+
+# 方法名到 ZIP 压缩类型的映射 (zstd 需要 Python 3.14+ 的 zipfile)
+ZIP_METHODS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+if hasattr(zipfile, 'ZIP_ZSTANDARD'):
+    ZIP_METHODS['zstd'] = zipfile.ZIP_ZSTANDARD
+
+
+class CompressionProfile:
+    """压缩配置
+    
+    method 为 None 时使用格式默认方法 (ZIP 为 deflate，7z 为 LZMA2)；
+    level 为 None 时使用该方法的默认级别。solid_block_size 仅用于 7z，
+    表示每个固实块的最大未压缩字节数，None 表示整个压缩包为一个固实块。
+    filters 为显式的 py7zr 过滤器链，设置后优先于 method 与 level。
+    store_incompressible 为 True 时，已压缩的文件不再压缩而是直接存储。
+    """
+    
+    def __init__(self, method: Optional[str] = None, level: Optional[int] = None,
+                 solid_block_size: Optional[int] = None,
+                 filters: Optional[List[Dict]] = None,
+                 store_incompressible: bool = True):
+        if method is not None and method not in METHODS:
+            raise ValueError(f"不支持的压缩方法: {method}")
+        
+        self.method = method
+        self.level = level
+        self.solid_block_size = solid_block_size
+        self.filters = filters
+        self.store_incompressible = store_incompressible and method != 'stored'
+    
+    def zip_method(self) -> int:
+        """ZIP 使用的压缩类型"""
+        method = self.method or 'deflate'
+        if method not in ZIP_METHODS:
+            raise ValueError(f"当前 Python 的 zipfile 不支持 {method} 压缩")
+        return ZIP_METHODS[method]
+    
+    def zip_level(self) -> Optional[int]:
+        """ZIP 使用的压缩级别 (stored 与 lzma 不使用级别)"""
+        if self.method in ('stored', 'lzma'):
+            return None
+        return self.level
+    
+    def seven_zip_filters(self) -> Optional[List[Dict]]:
+        """7z 使用的过滤器链，None 表示 py7zr 默认配置"""
+        if self.filters is not None:
+            return self.filters
+        
+        import py7zr
+        
+        method = self.method or 'lzma'
+        if method == 'stored':
+            return [{'id': py7zr.FILTER_COPY}]
+        if method == 'deflate':
+            return [{'id': py7zr.FILTER_DEFLATE}]
+        if method == 'bzip2':
+            return [{'id': py7zr.FILTER_BZIP2}]
+        if method == 'zstd':
+            level = self.level if self.level is not None else 3
+            return [{'id': py7zr.FILTER_ZSTD, 'level': level}]
+        
+        if self.level is None:
+            return None
+        preset = min(self.level, 9)
+        if self.level >= 9:
+            preset |= py7zr.PRESET_EXTREME
+        return [{'id': py7zr.FILTER_LZMA2, 'preset': preset}]
+    
+    def __repr__(self) -> str:
+        return (f"CompressionProfile(method={self.method!r}, level={self.level!r}, "
+                f"solid_block_size={self.solid_block_size!r}, filters={self.filters!r}, "
+                f"store_incompressible={self.store_incompressible!r})")
+
+
+# 预设配置
+PRESETS = {
+    'fastest': CompressionProfile(level=1, solid_block_size=64 * 1024 * 1024),
+    'balanced': CompressionProfile(),
+    'smallest': CompressionProfile(level=9),
+}
+
+
+def resolve_profile(profile: Union[None, str, Dict, CompressionProfile]) -> CompressionProfile:
+    """把预设名、字典或 CompressionProfile 统一转换为 CompressionProfile"""
+    if profile is None:
+        return PRESETS['balanced']
+    if isinstance(profile, CompressionProfile):
+        return profile
+    if isinstance(profile, str):
+        if profile not in PRESETS:
+            raise ValueError(f"未知的压缩预设: {profile}")
+        return PRESETS[profile]
+    if isinstance(profile, dict):
+        preset = profile.get('preset')
+        base = resolve_profile(preset) if preset else PRESETS['balanced']
+        return CompressionProfile(
+            method=profile.get('method', base.method),
+            level=profile.get('level', base.level),
+            solid_block_size=profile.get('solid_block_size', base.solid_block_size),
+            filters=profile.get('filters', base.filters),
+            store_incompressible=profile.get('store_incompressible', base.store_incompressible)
+        )
+    raise TypeError(f"无效的压缩配置: {profile!r}")
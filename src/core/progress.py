@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度报告 - 按字节统计、限频回调的进度跟踪器
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# 两次进度回调之间的最小间隔 (秒)，即最多 20 Hz
+MIN_INTERVAL = 0.05
+
+
+class ProgressTracker:
+    """进度跟踪器
+    
+    处理器在读取压缩数据、写出解压数据时调用 update，开始处理新成员时调用
+    next_member。回调形式为 callback(done, total, stats)，done/total 按
+    measure 指定的字节数计算 ('read' 为读取的字节，'written' 为写出的字节)，
+    stats 中包含读写字节数、当前成员序号与名称、耗时和吞吐量。
+    回调频率不超过 1 / min_interval，finish 时总会回调一次；可被多个线程共享。
+    checkpoint 在每次 update 与 next_member 时调用 (不限频)，用于任务的暂停与取消；
+    在不属于任务本身的线程中更新时应传入 check=False。
+    """
+    
+    def __init__(self, callback: Optional[Callable], total: int = 0,
+                 total_members: int = 0, measure: str = 'written',
+                 min_interval: float = MIN_INTERVAL,
+                 checkpoint: Optional[Callable] = None):
+        self.callback = callback
+        self.checkpoint = checkpoint
+        self.total = total
+        self.total_members = total_members
+        self.measure = measure
+        self.min_interval = min_interval
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.member_index = 0
+        self.member = None
+        self._started = time.monotonic()
+        self._last_emit = 0.0
+        self._finished = False
+        self._lock = threading.Lock()
+    
+    def update(self, read: int = 0, written: int = 0, check: bool = True):
+        """累加读取与写出的字节数"""
+        if check and self.checkpoint:
+            self.checkpoint()
+        if self.callback is None:
+            return
+        
+        with self._lock:
+            if self._finished:
+                return
+            self.bytes_read += read
+            self.bytes_written += written
+            report = self._snapshot(force=False)
+        
+        if report:
+            self.callback(*report)
+    
+    def next_member(self, name: str, check: bool = True):
+        """开始处理下一个成员"""
+        if check and self.checkpoint:
+            self.checkpoint()
+        if self.callback is None:
+            return
+        
+        with self._lock:
+            if self._finished:
+                return
+            self.member_index += 1
+            self.member = name
+            report = self._snapshot(force=False)
+        
+        if report:
+            self.callback(*report)
+    
+    def finish(self):
+        """处理结束，报告最终进度"""
+        if self.callback is None:
+            return
+        
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            report = self._snapshot(force=True)
+        
+        self.callback(*report)
+    
+    def _snapshot(self, force: bool):
+        """到达回调间隔时生成 (done, total, stats)，调用方需持有锁"""
+        now = time.monotonic()
+        if not force and now - self._last_emit < self.min_interval:
+            return None
+        self._last_emit = now
+        
+        done = self.bytes_read if self.measure == 'read' else self.bytes_written
+        total = self.total
+        if self._finished:
+            done = max(done, total)
+            total = max(done, total)
+        
+        elapsed = now - self._started
+        stats: Dict = {
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'member_index': self.member_index,
+            'member_count': self.total_members,
+            'member': self.member,
+            'elapsed': elapsed,
+            'throughput': done / elapsed if elapsed > 0 else 0.0
+        }
+        return done, total, stats
+
+
+class TrackedReader(io.RawIOBase):
+    """包装可定位的二进制文件，把实际读取的字节数报告给 ProgressTracker
+    
+    按每次读到的字节数计，而不是按读取位置的最大值：py7zr 先定位到文件
+    末尾读取头部，再回到开头读取数据，按位置计算会漏掉全部数据。
+    """
+    
+    def __init__(self, fileobj, tracker: ProgressTracker):
+        super().__init__()
+        self._fileobj = fileobj
+        self._tracker = tracker
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        if data:
+            self._tracker.update(read=len(data))
+        return data
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._fileobj.seek(offset, whence)
+    
+    def tell(self) -> int:
+        return self._fileobj.tell()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return self._fileobj.seekable()
+
+
+def _define_seven_zip_progress():
+    """定义 SevenZipProgress (py7zr 要求回调继承 ExtractCallback)"""
+    from py7zr.callbacks import ExtractCallback
+    
+    class SevenZipProgress(ExtractCallback):
+        """把 py7zr 解压回调转发给 ProgressTracker
+        
+        py7zr 在独立的报告线程中调用这些方法，因此这里不触发检查点 (报告线程
+        阻塞会导致 py7zr 关闭失败)；压缩包由 TrackedReader 读取时 (count_read
+        为 False)，读取字节数与检查点都由它负责。
+        """
+        
+        def __init__(self, tracker: ProgressTracker, count_read: bool = True):
+            self.tracker = tracker
+            self.count_read = count_read
+        
+        def report_start_preparation(self):
+            pass
+        
+        def report_start(self, processing_file_path, processing_bytes):
+            self.tracker.next_member(processing_file_path, check=False)
+            if self.count_read:
+                self.tracker.update(read=int(processing_bytes or 0), check=False)
+        
+        def report_update(self, decompressed_bytes):
+            self.tracker.update(written=int(decompressed_bytes or 0), check=False)
+        
+        def report_end(self, processing_file_path, wrote_bytes):
+            pass
+        
+        def report_warning(self, message):
+            pass
+        
+        def report_postprocess(self):
+            pass
+    
+    return SevenZipProgress
+
+
+def __getattr__(name: str):
+    # SevenZipProgress 在第一次访问时才定义，导入本模块不会加载 py7zr
+    if name == 'SevenZipProgress':
+        globals()[name] = _define_seven_zip_progress()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TAR 与单文件压缩格式 - 基于标准库 tarfile/gzip/bz2/lzma 的进程内实现
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import struct
+import tarfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .constants import CHUNK_SIZE
+from .paths import safe_member_path
+from .progress import ProgressTracker, TrackedReader
+
+# TAR 压缩包的完整后缀
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# 单文件压缩格式及其打开函数
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# 所有由本模块处理的扩展名 (Path.suffix 形式)
+SUFFIXES = ('.tar', '.tgz', '.tbz2', '.txz', '.gz', '.bz2', '.xz')
+
+# create_tar 支持的压缩方式到 tarfile 写模式的映射
+WRITE_MODES = {
+    '': 'w',
+    'gz': 'w:gz',
+    'bz2': 'w:bz2',
+    'xz': 'w:xz',
+}
+
+
+def is_tarball(file_path: str) -> bool:
+    """按文件名判断是否为 TAR (含压缩的 TAR)"""
+    return Path(file_path).name.lower().endswith(TAR_SUFFIXES)
+
+
+def tar_compression(file_path: str) -> str:
+    """按文件名判断 TAR 的压缩方式 ('' 表示不压缩)"""
+    name = Path(file_path).name.lower()
+    for compression, suffixes in (('gz', ('.tar.gz', '.tgz')),
+                                  ('bz2', ('.tar.bz2', '.tbz2')),
+                                  ('xz', ('.tar.xz', '.txz'))):
+        if name.endswith(suffixes):
+            return compression
+    return ''
+
+
+def _member_dict(info: tarfile.TarInfo) -> Dict:
+    """TarInfo 转换为成员字典"""
+    name = info.name + '/' if info.isdir() else info.name
+    return {
+        'name': name,
+        'size': info.size,
+        # TAR 中的成员没有独立的压缩大小
+        'compressed_size': 0,
+        'modified': datetime.fromtimestamp(info.mtime),
+        'crc': None
+    }
+
+
+def _gzip_original_size(file_path: str) -> int:
+    """读取 gzip 尾部记录的原始大小 (模 2^32)"""
+    with open(file_path, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        return struct.unpack('<I', f.read(4))[0]
+
+
+def iter_members(file_path: str) -> Iterator[Dict]:
+    """逐个产出 TAR 或单文件压缩包中的条目"""
+    if is_tarball(file_path):
+        with tarfile.open(file_path, 'r:*') as tf:
+            for info in tf:
+                yield _member_dict(info)
+        return
+    
+    path = Path(file_path)
+    stat = path.stat()
+    # bz2/xz 不解压无法得知原始大小
+    size = _gzip_original_size(file_path) if path.suffix.lower() == '.gz' else 0
+    yield {
+        'name': path.stem,
+        'size': size,
+        'compressed_size': stat.st_size,
+        'modified': datetime.fromtimestamp(stat.st_mtime),
+        'crc': None
+    }
+
+
+def _selected(name: str, wanted: Optional[set]) -> bool:
+    """成员是否在选择范围内 (选中目录时包含其下所有成员)"""
+    if wanted is None:
+        return True
+    name = name.rstrip('/')
+    if name in wanted:
+        return True
+    return any(name.startswith(prefix + '/') for prefix in wanted)
+
+
+def extract(file_path: str, output_path: str, files: Optional[List[str]] = None,
+            tracker: Optional[ProgressTracker] = None):
+    """解压 TAR 或单文件压缩包
+    
+    files 为需要解压的成员名 (目录包含其下所有成员)，None 表示全部。
+    进度按读取的压缩字节数报告给 tracker (总量为压缩包大小)。
+    """
+    wanted = {name.rstrip('/') for name in files} if files else None
+    tracker = tracker or ProgressTracker(None)
+    
+    with open(file_path, 'rb') as raw:
+        reader = TrackedReader(raw, tracker)
+        if is_tarball(file_path):
+            _extract_tar(reader, output_path, wanted, tracker)
+        else:
+            _extract_single(file_path, reader, output_path, wanted, tracker)
+    tracker.finish()
+
+
+def _extract_tar(reader: TrackedReader, output_path: str, wanted: Optional[set],
+                 tracker: ProgressTracker):
+    """按顺序流式解压 TAR 成员"""
+    with tarfile.open(fileobj=reader, mode='r:*') as tf:
+        for info in tf:
+            if not _selected(info.name, wanted):
+                continue
+            tracker.next_member(info.name)
+            if hasattr(tarfile, 'data_filter'):
+                tf.extract(info, output_path, filter='data')
+            elif info.isfile() or info.isdir():
+                # 旧版本 Python 没有过滤器，只解压普通文件与目录并清理路径
+                target = safe_member_path(output_path, info.name)
+                if target is None:
+                    continue
+                info.name = os.path.relpath(target, output_path)
+                tf.extract(info, output_path, set_attrs=False)
+            tracker.update(written=info.size)
+
+
+def _extract_single(file_path: str, reader: TrackedReader, output_path: str,
+                    wanted: Optional[set], tracker: ProgressTracker):
+    """解压单文件压缩包 (.gz/.bz2/.xz)"""
+    path = Path(file_path)
+    name = path.stem
+    if not _selected(name, wanted):
+        return
+    
+    tracker.next_member(name)
+    opener = COMPRESSED_OPENERS[path.suffix.lower()]
+    with opener(reader, 'rb') as src, open(os.path.join(output_path, name), 'wb') as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            dst.write(chunk)
+            tracker.update(written=len(chunk))
+
+
+def open_for_write(archive_path: str, compression: str = '',
+                   level: Optional[int] = None) -> tarfile.TarFile:
+    """以指定的压缩方式与级别创建 TAR 文件"""
+    mode = WRITE_MODES.get(compression)
+    if mode is None:
+        raise ValueError(f"不支持的 TAR 压缩方式: {compression}")
+    
+    kwargs = {}
+    if compression in ('gz', 'bz2'):
+        kwargs['compresslevel'] = level if level is not None else 6
+    elif compression == 'xz' and level is not None:
+        kwargs['preset'] = level
+    return tarfile.open(archive_path, mode, **kwargs)
+
+
+def create_tar(entries: Iterable[Tuple[str, str]], archive_path: str,
+               compression: str = '', level: Optional[int] = None,
+               tracker: Optional[ProgressTracker] = None):
+    """把 (源文件路径, 压缩包内名称) 序列写入 TAR
+    
+    compression 为 ''、'gz'、'bz2' 或 'xz'；level 为压缩级别 (xz 为预设)。
+    进度按读取的源文件字节数报告给 tracker。
+    """
+    tracker = tracker or ProgressTracker(None)
+    with open_for_write(archive_path, compression, level) as tf:
+        for source, arcname in entries:
+            tracker.next_member(arcname)
+            tarinfo = tf.gettarinfo(source, arcname)
+            if tarinfo.isreg():
+                with open(source, 'rb') as f:
+                    tf.addfile(tarinfo, TrackedReader(f, tracker))
+            else:
+                tf.addfile(tarinfo)
+    tracker.finish()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+速率限制 - 多线程共享的令牌桶
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+# 等待额度时每段睡眠的最长时间 (秒)，两段之间检查暂停与取消
+SLEEP_SLICE = 0.1
+
+
+class RateLimiter:
+    """令牌桶速率限制器
+    
+    rate 为每秒允许的字节数，None 表示不限速。申请按不超过桶容量 (burst)
+    的份额逐份扣除，余额不足时等待恢复，长期平均速率为 rate。等待按
+    SLEEP_SLICE 分段进行，每段之间调用 checkpoint，使限速中的任务仍可暂停或取消。
+    """
+    
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else (rate or 0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, amount: int, checkpoint: Optional[Callable] = None):
+        """申请 amount 字节的额度，必要时阻塞等待"""
+        if not self.rate:
+            return
+        
+        chunk_size = max(self.burst, 1)
+        while amount > 0:
+            chunk = min(amount, chunk_size)
+            amount -= chunk
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= chunk
+                wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            
+            deadline = time.monotonic() + wait
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if checkpoint:
+                    checkpoint()
+                time.sleep(min(remaining, SLEEP_SLICE))
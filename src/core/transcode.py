@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+格式转换 - 在压缩包之间流式搬运成员，不经过临时目录
+"""
+
+import functools
+import io
+import os
+import queue
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from . import tarformat
+from .compressibility import INCOMPRESSIBLE_EXTENSIONS
+from .constants import CHUNK_SIZE, SPOOL_MAX_SIZE
+from .profiles import CompressionProfile
+from .progress import ProgressTracker
+
+# 7z 解码线程与写入方之间最多缓冲的数据块数
+PIPE_DEPTH = 4
+
+# ZIP 能表示的最早时间
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+# 7z 属性的 unix 扩展标志，置位时高 16 位为 st_mode (文件类型与权限位)
+_7Z_UNIX_EXTENSION = 0x8000
+
+
+class _PipeAborted(BaseException):
+    """读取方已放弃，解码线程应尽快退出 (不会被 py7zr 内部的 except Exception 吞掉)"""
+
+
+@functools.lru_cache(maxsize=None)
+def _seven_zip_pipe_class() -> type:
+    """定义 _SevenZipPipe (py7zr 要求解压目标继承 WriterFactory/Py7zIO)，第一次调用时才导入 py7zr"""
+    from py7zr.io import Py7zIO, WriterFactory
+    
+    class _SevenZipPipe(WriterFactory):
+        """在后台线程中顺序解码 7z，把每个成员的数据块经有界队列交给读取方"""
+        
+        def __init__(self, archive_path: str, targets: Optional[Iterable[str]] = None):
+            self.archive_path = archive_path
+            self.targets = list(targets) if targets is not None else None
+            self.queue: queue.Queue = queue.Queue(maxsize=PIPE_DEPTH)
+            self.aborted = threading.Event()
+            self.thread = threading.Thread(target=self._run, name='7z-pipe', daemon=True)
+        
+        def create(self, filename: str) -> Py7zIO:
+            self.put(('start', filename))
+            return _PipeMember(self)
+        
+        def put(self, item: Tuple):
+            """投递事件，队列满时等待读取方，读取方放弃后抛出 _PipeAborted"""
+            while True:
+                if self.aborted.is_set():
+                    raise _PipeAborted()
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+        
+        def get(self) -> Tuple:
+            return self.queue.get()
+        
+        def abort(self):
+            """放弃剩余数据并等待解码线程退出"""
+            self.aborted.set()
+            while self.thread.is_alive():
+                try:
+                    self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self.thread.join()
+        
+        def _run(self):
+            try:
+                # 传入文件对象使 py7zr 在本线程中按顺序解码，成员不会交错
+                import py7zr
+                with open(self.archive_path, 'rb') as f, py7zr.SevenZipFile(f, mode='r') as szf:
+                    szf.extract(targets=self.targets, factory=self)
+                self.put(('done', None))
+            except _PipeAborted:
+                pass
+            except BaseException as e:
+                try:
+                    self.put(('error', e))
+                except _PipeAborted:
+                    pass
+    
+    class _PipeMember(Py7zIO):
+        """py7zr 的解压目标：把解码出的数据转交给管道"""
+        
+        def __init__(self, pipe: _SevenZipPipe):
+            self.pipe = pipe
+            self.written = 0
+        
+        def write(self, s) -> int:
+            self.pipe.put(('data', bytes(s)))
+            self.written += len(s)
+            return len(s)
+        
+        def read(self, size=None) -> bytes:
+            return b''
+        
+        def seek(self, offset: int, whence: int = 0) -> int:
+            return 0
+        
+        def seekable(self) -> bool:
+            return False
+        
+        def flush(self):
+            pass
+        
+        def size(self) -> int:
+            return self.written
+        
+        def close(self):
+            # 只在成员解码完成且 CRC 校验通过后调用
+            self.pipe.put(('end', None))
+    
+    return _SevenZipPipe
+
+
+class _PipeReader(io.RawIOBase):
+    """从管道读取当前成员的数据，直到成员结束"""
+    
+    def __init__(self, pipe):
+        super().__init__()
+        self._pipe = pipe
+        self._buffer = memoryview(b'')
+        self._eof = False
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._buffer and not self._eof:
+            kind, value = self._pipe.get()
+            if kind == 'data':
+                self._buffer = memoryview(value)
+            elif kind == 'end':
+                self._eof = True
+            elif kind == 'error':
+                raise value
+            else:
+                raise RuntimeError(f"7z 数据流异常: {kind}")
+        
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+    
+    def drain(self):
+        """丢弃当前成员未读取的数据"""
+        while self.readinto(bytearray(CHUNK_SIZE)):
+            pass
+
+
+class _CountingReader(io.RawIOBase):
+    """把读取的字节数报告给 ProgressTracker (同时触发检查点)"""
+    
+    def __init__(self, stream: BinaryIO, tracker: ProgressTracker):
+        super().__init__()
+        self._stream = stream
+        self._tracker = tracker
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        self._tracker.update(read=len(data))
+        return len(data)
+
+
+def _member(name: str, size: Optional[int], modified: Optional[datetime],
+            is_dir: bool = False, mode: Optional[int] = None) -> Dict:
+    """源成员信息 (修改时间统一为本地时间的 naive datetime)"""
+    if modified is not None and modified.tzinfo is not None:
+        modified = modified.astimezone().replace(tzinfo=None)
+    return {
+        'name': name.rstrip('/'),
+        'size': size,
+        'modified': modified or datetime.now(),
+        'is_dir': is_dir,
+        'mode': mode
+    }
+
+
+def _wanted(name: str, names: Optional[Set[str]]) -> bool:
+    """成员是否在 names 中 (None 表示全部)"""
+    return names is None or name.rstrip('/') in names
+
+
+def _iter_zip(archive_path: str, names: Optional[Set[str]]
+              ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    with zipfile.ZipFile(archive_path, 'r') as zf:
+        for info in zf.infolist():
+            if not _wanted(info.filename, names):
+                continue
+            mode = (info.external_attr >> 16) & 0o7777 or None
+            member = _member(info.filename, info.file_size, datetime(*info.date_time),
+                             info.is_dir(), mode)
+            if member['is_dir']:
+                yield member, None
+            else:
+                with zf.open(info) as stream:
+                    yield member, stream
+
+
+def _iter_rar(archive_path: str, names: Optional[Set[str]]
+              ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    import rarfile
+    with rarfile.RarFile(archive_path) as rf:
+        for info in rf.infolist():
+            if not _wanted(info.filename, names):
+                continue
+            mode = info.mode & 0o7777 if info.mode else None
+            member = _member(info.filename, info.file_size, datetime(*info.date_time),
+                             info.is_dir(), mode)
+            if member['is_dir']:
+                yield member, None
+            elif info.is_file():
+                with rf.open(info) as stream:
+                    yield member, stream
+
+
+def _iter_tar(archive_path: str, names: Optional[Set[str]]
+              ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    # 流模式只顺序读取一遍，压缩的 TAR 不需要回退
+    with tarfile.open(archive_path, 'r|*') as tf:
+        for info in tf:
+            if not _wanted(info.name, names):
+                continue
+            member = _member(info.name, info.size, datetime.fromtimestamp(info.mtime),
+                             info.isdir(), info.mode)
+            if info.isdir():
+                yield member, None
+            elif info.isfile():
+                yield member, tf.extractfile(info)
+
+
+def _iter_single(archive_path: str, names: Optional[Set[str]]
+                 ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    path = Path(archive_path)
+    if not _wanted(path.stem, names):
+        return
+    modified = datetime.fromtimestamp(path.stat().st_mtime)
+    # 单文件压缩格式不解压无法可靠得知原始大小
+    with tarformat.COMPRESSED_OPENERS[path.suffix.lower()](archive_path, 'rb') as stream:
+        yield _member(path.stem, None, modified), stream
+
+
+def _iter_7z(archive_path: str, names: Optional[Set[str]]
+             ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    import py7zr
+    with py7zr.SevenZipFile(archive_path, mode='r') as szf:
+        infos = {info.filename: info for info in szf.list()
+                 if _wanted(info.filename, names)}
+        # list() 不含属性，权限位取自 unix 扩展属性 (没有时为 None)
+        modes = {entry.filename: entry.posix_mode for entry in szf.files}
+    
+    for info in infos.values():
+        if info.is_directory:
+            yield _member(info.filename, 0, info.creationtime, True,
+                          modes.get(info.filename)), None
+    
+    targets = None
+    if names is not None:
+        # py7zr 只解码包含目标成员的固实块
+        targets = [name for name, info in infos.items() if not info.is_directory]
+        if not targets:
+            return
+    pipe = _seven_zip_pipe_class()(archive_path, targets)
+    pipe.thread.start()
+    try:
+        while True:
+            kind, value = pipe.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            
+            info = infos.get(value)
+            reader = _PipeReader(pipe)
+            if info is not None:
+                yield _member(value, info.uncompressed, info.creationtime, False,
+                              modes.get(value)), reader
+            else:
+                yield _member(value, None, None), reader
+            reader.drain()
+    finally:
+        pipe.abort()
+
+
+def iter_source(archive_path: str, tracker: Optional[ProgressTracker] = None,
+                names: Optional[Iterable[str]] = None
+                ) -> Iterator[Tuple[Dict, Optional[BinaryIO]]]:
+    """按顺序产出压缩包成员 (成员信息, 数据流)
+    
+    成员信息包含 name、size (None 表示事先未知)、modified、is_dir 与 mode；
+    目录的数据流为 None。数据流只在产出下一个成员之前有效，读取的字节数
+    报告给 tracker。7z 在后台线程中解码，经有界队列交给读取方。
+    names 不为 None 时只产出其中的成员 (名称不含末尾的 /)，其余成员不解压。
+    """
+    wanted = {name.rstrip('/') for name in names} if names is not None else None
+    suffix = Path(archive_path).suffix.lower()
+    if suffix == '.zip':
+        members = _iter_zip(archive_path, wanted)
+    elif suffix == '.rar':
+        members = _iter_rar(archive_path, wanted)
+    elif suffix == '.7z':
+        members = _iter_7z(archive_path, wanted)
+    elif tarformat.is_tarball(archive_path):
+        members = _iter_tar(archive_path, wanted)
+    elif suffix in tarformat.COMPRESSED_OPENERS:
+        members = _iter_single(archive_path, wanted)
+    else:
+        raise ValueError(f"不支持的压缩格式: {suffix}")
+    
+    tracker = tracker or ProgressTracker(None)
+    try:
+        for member, stream in members:
+            tracker.next_member(member['name'])
+            if stream is not None:
+                # 缓冲读取保证 read(n) 在数据结束前总是返回 n 个字节 (tarfile 依赖这一点)
+                stream = io.BufferedReader(_CountingReader(stream, tracker), CHUNK_SIZE)
+            yield member, stream
+    finally:
+        # 提前结束时关闭源压缩包 (7z 同时停止解码线程)
+        members.close()
+
+
+def _spool(stream: BinaryIO) -> BinaryIO:
+    """把数据流缓存为可定位的文件对象，小成员留在内存，大成员溢出到临时文件"""
+    head = stream.read(SPOOL_MAX_SIZE + 1)
+    if len(head) <= SPOOL_MAX_SIZE:
+        return io.BytesIO(head)
+    
+    spooled = tempfile.TemporaryFile()
+    try:
+        spooled.write(head)
+        shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+        spooled.seek(0)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
+
+
+class _ZipSink:
+    """逐个成员流式写入 ZIP"""
+    
+    def __init__(self, archive_path: str, profile: CompressionProfile):
+        self.profile = profile
+        self.compress_type = profile.zip_method()
+        self.level = profile.zip_level()
+        self._zf = zipfile.ZipFile(archive_path, 'w', self.compress_type,
+                                   allowZip64=True, compresslevel=self.level)
+    
+    def add(self, member: Dict, stream: Optional[BinaryIO]):
+        name = member['name'] + '/' if member['is_dir'] else member['name']
+        modified = max(member['modified'], ZIP_EPOCH)
+        zinfo = zipfile.ZipInfo(name, modified.timetuple()[:6])
+        if member['mode'] is not None:
+            file_type = stat.S_IFDIR if member['is_dir'] else stat.S_IFREG
+            zinfo.external_attr = (file_type | (member['mode'] & 0o7777)) << 16
+        
+        if member['is_dir']:
+            # MS-DOS 目录属性
+            zinfo.external_attr |= 0x10
+            self._zf.writestr(zinfo, b'')
+            return
+        
+        incompressible = Path(name).suffix.lower() in INCOMPRESSIBLE_EXTENSIONS
+        if self.profile.store_incompressible and incompressible:
+            compress_type, level = zipfile.ZIP_STORED, None
+        else:
+            compress_type, level = self.compress_type, self.level
+        
+        size = member['size']
+        if size is not None and size <= SPOOL_MAX_SIZE:
+            self._zf.writestr(zinfo, stream.read(), compress_type, level)
+            return
+        
+        # ZipFile.open 不能指定压缩级别：大成员或大小未知的成员先写入临时文件，
+        # 设置修改时间后用 ZipFile.write 压缩 (ZIP64 也由它按实际大小决定)
+        fd, temp_path = tempfile.mkstemp(prefix='zipmaster-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                shutil.copyfileobj(stream, temp, CHUNK_SIZE)
+            mtime = time.mktime(zinfo.date_time + (0, 0, -1))
+            os.utime(temp_path, (mtime, mtime))
+            self._zf.write(temp_path, name, compress_type, level)
+        finally:
+            os.remove(temp_path)
+        # 外部属性只记录在中央目录中，关闭前改回源成员的权限
+        self._zf.getinfo(name).external_attr = zinfo.external_attr
+    
+    def add_file(self, source: str, arcname: str):
+        self._zf.write(source, arcname)
+    
+    def close(self):
+        self._zf.close()
+
+
+class _SevenZipSink:
+    """逐个成员写入 7z
+    
+    py7zr 需要事先知道成员大小，每个成员先缓存 (超过 SPOOL_MAX_SIZE 溢出到
+    临时文件) 再写入，临时空间只与最大的单个成员有关。整个压缩包写为一个
+    固实块，solid_block_size 与按成员存储的设置不适用。
+    """
+    
+    def __init__(self, archive_path: str, profile: CompressionProfile):
+        import py7zr
+        self._szf = py7zr.SevenZipFile(archive_path, 'w', filters=profile.seven_zip_filters())
+        self._empty_dir: Optional[tempfile.TemporaryDirectory] = None
+    
+    def add(self, member: Dict, stream: Optional[BinaryIO]):
+        from py7zr.helpers import ArchiveTimestamp
+        if member['is_dir']:
+            # py7zr 只能从真实目录创建目录条目，借用一个空的临时目录
+            if self._empty_dir is None:
+                self._empty_dir = tempfile.TemporaryDirectory()
+            self._szf.write(self._empty_dir.name, member['name'])
+        else:
+            with _spool(stream) as data:
+                self._szf.writef(data, member['name'])
+        
+        # writef 把修改时间记为当前时间、权限位记为默认值 (目录取自临时目录)，改回源成员的。
+        # py7zr 没有设置这两项的公开接口，requirements.txt 按已验证的版本限定了范围
+        entry = self._szf.header.files_info.files[-1]
+        entry['lastwritetime'] = ArchiveTimestamp.from_datetime(member['modified'].timestamp())
+        file_type = stat.S_IFDIR if member['is_dir'] else stat.S_IFREG
+        mode = member['mode'] or (0o755 if member['is_dir'] else 0o644)
+        entry['attributes'] = ((entry.get('attributes', 0) & 0xFFFF) | _7Z_UNIX_EXTENSION
+                               | (file_type | (mode & 0o7777)) << 16)
+    
+    def add_file(self, source: str, arcname: str):
+        self._szf.write(source, arcname)
+    
+    def close(self):
+        try:
+            self._szf.close()
+        finally:
+            if self._empty_dir is not None:
+                self._empty_dir.cleanup()
+
+
+class _TarSink:
+    """逐个成员流式写入 TAR"""
+    
+    def __init__(self, archive_path: str, profile: CompressionProfile):
+        self._tf = tarformat.open_for_write(archive_path, tarformat.tar_compression(archive_path),
+                                            profile.level)
+    
+    def add(self, member: Dict, stream: Optional[BinaryIO]):
+        tarinfo = tarfile.TarInfo(member['name'])
+        tarinfo.mtime = member['modified'].timestamp()
+        if member['is_dir']:
+            tarinfo.type = tarfile.DIRTYPE
+            tarinfo.mode = member['mode'] or 0o755
+            self._tf.addfile(tarinfo)
+            return
+        
+        tarinfo.mode = member['mode'] or 0o644
+        if member['size'] is None:
+            # TAR 头部需要事先写出大小
+            with _spool(stream) as data:
+                tarinfo.size = data.seek(0, os.SEEK_END)
+                data.seek(0)
+                self._tf.addfile(tarinfo, data)
+        else:
+            tarinfo.size = member['size']
+            self._tf.addfile(tarinfo, stream)
+    
+    def add_file(self, source: str, arcname: str):
+        self._tf.add(source, arcname, recursive=False)
+    
+    def close(self):
+        self._tf.close()
+
+
+def open_sink(archive_path: str, profile: CompressionProfile):
+    """按扩展名创建目标压缩包的写入方
+    
+    写入方提供 add(成员信息, 数据流)、add_file(源文件, 名称) 与 close。
+    """
+    name = Path(archive_path).name.lower()
+    if name.endswith('.zip'):
+        return _ZipSink(archive_path, profile)
+    if name.endswith('.7z'):
+        return _SevenZipSink(archive_path, profile)
+    if tarformat.is_tarball(archive_path):
+        return _TarSink(archive_path, profile)
+    raise ValueError(f"不支持转换为该格式: {Path(archive_path).name}")
+
+
+def convert(source_path: str, target_path: str, profile: CompressionProfile,
+            tracker: Optional[ProgressTracker] = None):
+    """把源压缩包的全部成员按顺序写入目标压缩包"""
+    tracker = tracker or ProgressTracker(None)
+    sink = open_sink(target_path, profile)
+    try:
+        for member, stream in iter_source(source_path, tracker):
+            sink.add(member, stream)
+    finally:
+        sink.close()
+    tracker.finish()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ZIP 中央目录读取 - 基于 mmap 直接解析 EOCD/ZIP64 记录，不构造 ZipInfo
+"""
+
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import BinaryIO, Iterator, Tuple
+from zipfile import BadZipFile
+
+# 中央目录结束记录 (EOCD)
+_EOCD = struct.Struct('<4s4H2LH')
+_EOCD_SIGNATURE = b'PK\x05\x06'
+
+# ZIP64 中央目录结束记录定位器与 ZIP64 EOCD
+_ZIP64_LOCATOR = struct.Struct('<4sLQL')
+_ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+_ZIP64_EOCD = struct.Struct('<4sQ2H2L4Q')
+_ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+
+# 中央目录文件头
+_CENTRAL_DIR = struct.Struct('<4s4B4HL2L5H2L')
+_CENTRAL_DIR_SIGNATURE = b'PK\x01\x02'
+
+# EOCD 之后最多跟随 65535 字节的注释
+_MAX_TAIL = _EOCD.size + 0xFFFF
+
+# 文件名使用 UTF-8 编码的标志位
+_FLAG_UTF8 = 0x800
+
+# ZIP64 扩展字段 ID
+_ZIP64_EXTRA = 0x0001
+
+
+def _map_range(f: BinaryIO, start: int, end: int) -> Tuple[mmap.mmap, int]:
+    """只读映射文件的 [start, end) 范围，返回 (映射, 映射起点在文件中的位置)
+    
+    mmap 的偏移必须按分配粒度对齐，因此映射起点可能略早于 start。
+    """
+    base = start - start % mmap.ALLOCATIONGRANULARITY
+    return mmap.mmap(f.fileno(), end - base, access=mmap.ACCESS_READ, offset=base), base
+
+
+def _read_at(f: BinaryIO, position: int, length: int) -> bytes:
+    """读取文件中指定位置的一段字节"""
+    f.seek(position)
+    return f.read(length)
+
+
+def _locate_zip64_eocd(f: BinaryIO, locator: int) -> Tuple[int, int, int, int, int]:
+    """按 ZIP64 定位器找到 ZIP64 EOCD，返回 (记录位置, 分卷号, 条目数, 中央目录大小, 中央目录偏移)
+    
+    记录长度取自其 "记录大小" 字段 (可能带有可扩展数据区)，记录必须恰好结束于定位器处。
+    先试定位器给出的偏移，再按无可扩展数据区的长度试一次 (兼容前面附加了数据的 ZIP)。
+    """
+    (_, _, offset, _) = _ZIP64_LOCATOR.unpack(_read_at(f, locator, _ZIP64_LOCATOR.size))
+    for zip64 in (offset, locator - _ZIP64_EOCD.size):
+        if zip64 < 0:
+            continue
+        record = _read_at(f, zip64, _ZIP64_EOCD.size)
+        if len(record) != _ZIP64_EOCD.size or record[:4] != _ZIP64_EOCD_SIGNATURE:
+            continue
+        (_, record_size, _, _, disk, _, _, count, cd_size, cd_offset) = _ZIP64_EOCD.unpack(record)
+        # "记录大小" 不含开头的签名与该字段本身 (共 12 字节)
+        if zip64 + 12 + record_size == locator:
+            return zip64, disk, count, cd_size, cd_offset
+    raise BadZipFile("ZIP64 中央目录结束记录损坏")
+
+
+def _find_eocd(tail: mmap.mmap, start: int) -> int:
+    """从末尾向前查找 EOCD，返回其在 tail 中的位置 (找不到时为 -1)
+    
+    注释中也可能出现 EOCD 签名：注释长度恰好延伸到文件末尾的记录优先，
+    都不满足时取最后一个完整的记录 (兼容末尾附加了数据的文件)。
+    """
+    fallback = -1
+    end = len(tail)
+    while True:
+        eocd = tail.rfind(_EOCD_SIGNATURE, start, end)
+        if eocd < 0:
+            return fallback
+        if eocd + _EOCD.size <= len(tail):
+            comment_len, = struct.unpack_from('<H', tail, eocd + _EOCD.size - 2)
+            if eocd + _EOCD.size + comment_len == len(tail):
+                return eocd
+            if fallback < 0:
+                fallback = eocd
+        # 下一次只在此签名之前查找
+        end = eocd + len(_EOCD_SIGNATURE) - 1
+
+
+def _locate_central_directory(
+f: BinaryIO) -> Tuple[int, int, int]:
+    """解析 EOCD (必要时解析 ZIP64 EOCD)，返回 (条目数, 中央目录位置, 中央目录大小)
+    
+    只映射文件末尾可能包含 EOCD 的范围；中央目录位置已按 EOCD 的实际位置修正，
+    兼容前面附加了数据的 ZIP (如自解压程序)。
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        raise BadZipFile("文件为空")
+    
+    tail_start = max(0, size - _MAX_TAIL)
+    tail, base = _map_range(f, tail_start, size)
+    try:
+        eocd = _find_eocd(tail, tail_start - base)
+        if eocd < 0:
+            raise BadZipFile("找不到中央目录结束记录")
+        (_, disk, _, _, count, cd_size, cd_offset, _) = _EOCD.unpack_from(tail, eocd)
+    finally:
+        tail.close()
+    end = base + eocd
+    
+    locator = end - _ZIP64_LOCATOR.size
+    if locator >= 0 and _read_at(f, locator, 4) == _ZIP64_LOCATOR_SIGNATURE:
+        end, disk, count, cd_size, cd_offset = _locate_zip64_eocd(f, locator)
+    
+    if disk != 0:
+        raise BadZipFile("不支持分卷 ZIP")
+    
+    # 前置数据的长度 = 中央目录实际位置 - 记录中的偏移
+    start = end - cd_size
+    if start < 0 or start < cd_offset:
+        raise BadZipFile("中央目录位置无效")
+    return count, start, cd_size
+
+
+def count_entries(file_path: str) -> int:
+    """直接从 EOCD (或 ZIP64 EOCD) 记录读取条目数"""
+    with open(file_path, 'rb') as f:
+        return _locate_central_directory(f)[0]
+
+
+def central_directory_offset(file_path: str) -> int:
+    """中央目录在文件中的实际位置 (向 ZIP 追加成员时从这里开始覆盖)"""
+    with open(file_path, 'rb') as f:
+        return _locate_central_directory(f)[1]
+
+
+def iter_entries(file_path: str) -> Iterator[Tuple[str, int, int, int, int, int]]:
+    """逐个产出中央目录条目
+    
+    每个条目为元组 (名称, 原始大小, 压缩大小, CRC, DOS 日期, DOS 时间)，
+    不为条目构造 ZipInfo；日期时间可用 dos_datetime 转换。只映射中央目录所在的范围。
+    """
+    with open(file_path, 'rb') as f:
+        count, start, cd_size = _locate_central_directory(f)
+        if count == 0 or cd_size == 0:
+            return
+        mm, base = _map_range(f, start, start + cd_size)
+    
+    try:
+        position = start - base
+        end = position + cd_size
+        unpack = _CENTRAL_DIR.unpack_from
+        header_size = _CENTRAL_DIR.size
+        
+        for _ in range(count):
+            if position + header_size > end:
+                raise BadZipFile("中央目录被截断")
+            (signature, _, _, _, _, flags, _, dos_time, dos_date, crc, compress_size, file_size,
+             name_len, extra_len, comment_len, _, _, _, _) = unpack(mm, position)
+            if signature != _CENTRAL_DIR_SIGNATURE:
+                raise BadZipFile("中央目录文件头签名错误")
+            
+            position += header_size
+            raw_name = mm[position:position + name_len]
+            name = raw_name.decode('utf-8' if flags & _FLAG_UTF8 else 'cp437')
+            position += name_len
+            
+            if file_size == 0xFFFFFFFF or compress_size == 0xFFFFFFFF:
+                file_size, compress_size = _zip64_sizes(mm, position, extra_len,
+                                                        file_size, compress_size)
+            position += extra_len + comment_len
+            
+            yield name, file_size, compress_size, crc, dos_date, dos_time
+    finally:
+        mm.close()
+
+
+def _zip64_sizes(mm: mmap.mmap, position: int, length: int,
+                 file_size: int, compress_size: int) -> Tuple[int, int]:
+    """从 ZIP64 扩展字段中读取被标记为 0xFFFFFFFF 的大小"""
+    end = position + length
+    while position + 4 <= end:
+        tag, size = struct.unpack_from('<2H', mm, position)
+        position += 4
+        if tag == _ZIP64_EXTRA:
+            # 扩展字段只包含被标记的值，顺序固定为原始大小、压缩大小
+            if file_size == 0xFFFFFFFF:
+                file_size, = struct.unpack_from('<Q', mm, position)
+                position += 8
+            if compress_size == 0xFFFFFFFF:
+                compress_size, = struct.unpack_from('<Q', mm, position)
+            return file_size, compress_size
+        position += size
+    raise BadZipFile("缺少 ZIP64 扩展字段")
+
+
+def dos_datetime(dos_date: int, dos_time: int) -> datetime:
+    """DOS 日期与时间转换为 datetime (无效值时取 1980-01-01)"""
+    try:
+        return datetime(
+            (dos_date >> 9) + 1980, (dos_date >> 5) & 0xF, dos_date & 0x1F,
+            dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2
+        )
+    except ValueError:
+        return datetime(1980, 1, 1)
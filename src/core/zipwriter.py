@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行 ZIP 写入器 - 多线程压缩，顺序写出标准 ZIP
+"""
+
+import copy
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+from .compressibility import is_incompressible
+from .constants import CHUNK_SIZE, SPOOL_MAX_SIZE
+from .progress import ProgressTracker
+
+# 本地文件头 (末尾两项为文件名与扩展字段的长度)
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+# 本地文件头之后带数据描述符的标志位
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+# ZIP64 扩展字段 ID
+_ZIP64_EXTRA = 0x0001
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """去掉扩展字段中的 ZIP64 记录 (写入时由 zipfile 按需重新生成)"""
+    result = []
+    position = 0
+    while position + 4 <= len(extra):
+        tag, size = struct.unpack_from('<HH', extra, position)
+        end = position + 4 + size
+        if tag != _ZIP64_EXTRA:
+            result.append(extra[position:end])
+        position = end
+    return b''.join(result)
+
+
+class _ZipInternals:
+    """对 zipfile 未公开接口的全部访问，集中在这里
+    
+    zipfile 没有写入原始 (已压缩) 成员数据的公开接口：这里直接向 ZipFile.fp
+    写入 ZipInfo.FileHeader() 生成的本地文件头与数据，再登记到 filelist、
+    NameToInfo，更新 start_dir 并置 _didModify。已在 CPython 3.7 至 3.13 上
+    验证 (tests/test_zipwriter.py)，升级 Python 后应先运行这些测试。
+    """
+    
+    def __init__(self, zf: zipfile.ZipFile):
+        self._zf = zf
+    
+    def begin_entry(self, zinfo: zipfile.ZipInfo) -> BinaryIO:
+        """在当前位置写入本地文件头，返回用于写入成员数据的文件对象"""
+        fp = self._zf.fp
+        zinfo.header_offset = fp.tell()
+        fp.write(zinfo.FileHeader(None))
+        return fp
+    
+    def end_entry(self, zinfo: zipfile.ZipInfo):
+        """登记已写完的成员，关闭时写入中央目录"""
+        zf = self._zf
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+        # 追加模式下只有标记为已修改，关闭时才会重写中央目录
+        zf._didModify = True
+
+
+def write_raw_entry(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: BinaryIO,
+                    size: Optional[int] = None):
+    """向以 'w' 或 'a' 模式打开的 ZipFile 写入一个 CRC 与大小均已确定的成员
+    
+    data 为成员的原始 (已压缩) 数据，size 为 None 时复制到数据流结束。
+    """
+    internals = _ZipInternals(zf)
+    fp = internals.begin_entry(zinfo)
+    
+    if size is None:
+        shutil.copyfileobj(data, fp, CHUNK_SIZE)
+    else:
+        remaining = size
+        while remaining > 0:
+            chunk = data.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"成员数据被截断: {zinfo.filename}")
+            fp.write(chunk)
+            remaining -= len(chunk)
+    
+    internals.end_entry(zinfo)
+
+
+def copy_entry(target: zipfile.ZipFile, source: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """不解压、不重新压缩地把 source 中的成员原样复制到 target
+    
+    info.header_offset 已由 zipfile 按前置数据修正，是本地文件头在文件中的实际位置。
+    """
+    with open(source.filename, 'rb') as fp:
+        fp.seek(info.header_offset)
+        header = fp.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"本地文件头签名错误: {info.filename}")
+        name_len, extra_len = _LOCAL_HEADER.unpack(header)[-2:]
+        # 跳过本地文件头中的文件名与扩展字段
+        fp.seek(name_len + extra_len, os.SEEK_CUR)
+        
+        zinfo = copy.copy(info)
+        # CRC 与大小写在新的本地文件头中，不再需要数据描述符
+        zinfo.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+        zinfo.extra = _strip_zip64_extra(info.extra)
+        write_raw_entry(target, zinfo, fp, info.compress_size)
+
+
+class CompressedEntry:
+    """一个已完成压缩、等待写入的成员"""
+    
+    def __init__(self, zinfo: zipfile.ZipInfo, data: Optional[BinaryIO], source: str):
+        self.zinfo = zinfo
+        # data 为 None 时表示不压缩 (STORED)，写入时直接复制源文件
+        self.data = data
+        self.source = source
+    
+    def close(self):
+        """释放压缩结果占用的内存或临时文件"""
+        if self.data is not None:
+            self.data.close()
+
+
+class ParallelZipWriter:
+    """并行 ZIP 写入器
+    
+    各成员在线程池中独立压缩 (zlib 压缩和 CRC 计算时会释放 GIL)，压缩结果
+    与 CRC 按提交顺序由单一写入方以原始数据写入，本地文件头和中央目录
+    (含 ZIP64) 由 zipfile 生成，产物是任何解压工具都能读取的标准 ZIP。
+    store_incompressible 为 True 时，已压缩的内容 (JPEG、视频、嵌套压缩包等)
+    按成员改用 STORED 写入。进度按读取的源文件字节数报告给 progress。
+    """
+    
+    def __init__(self, archive_path: str, compress_type: int = zipfile.ZIP_DEFLATED,
+                 compresslevel: Optional[int] = None, max_workers: Optional[int] = None,
+                 store_incompressible: bool = False,
+                 progress: Optional[ProgressTracker] = None, mode: str = 'w'):
+        if compress_type not in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            raise ValueError(f"并行写入只支持 DEFLATE 与 STORED: {compress_type}")
+        
+        self.compress_type = compress_type
+        self.compresslevel = compresslevel
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.store_incompressible = store_incompressible
+        self.progress = progress or ProgressTracker(None)
+        # mode 为 'a' 时在已有 ZIP 的末尾追加成员
+        self._zf = zipfile.ZipFile(archive_path, mode, allowZip64=True)
+    
+    def write_all(self, entries: Iterable[Tuple[str, str]]):
+        """压缩并写入 (源文件路径, 压缩包内名称) 序列
+        
+        最多同时有 2 * max_workers 个成员处于压缩中或等待写入，内存占用有界。
+        """
+        window = self.max_workers * 2
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            try:
+                for source, arcname in entries:
+                    pending.append(pool.submit(self._compress, source, arcname))
+                    if len(pending) >= window:
+                        self._write_entry(pending.popleft().result())
+                
+                while pending:
+                    self._write_entry(pending.popleft().result())
+            finally:
+                # 出错时取消或等待其余任务，并释放尚未写入的临时数据
+                for future in pending:
+                    if not future.cancel() and future.exception() is None:
+                        future.result().close()
+    
+    def _compress(self, source: str, arcname: str) -> CompressedEntry:
+        """在工作线程中压缩单个文件并计算 CRC"""
+        zinfo = zipfile.ZipInfo.from_file(source, arcname)
+        compress_type = self.compress_type
+        if compress_type != zipfile.ZIP_STORED and self.store_incompressible and is_incompressible(source):
+            compress_type = zipfile.ZIP_STORED
+        zinfo.compress_type = compress_type
+        
+        crc = 0
+        size = 0
+        if compress_type == zipfile.ZIP_STORED:
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    self.progress.update(read=len(chunk))
+            zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, size, size
+            return CompressedEntry(zinfo, None, source)
+        
+        level = self.compresslevel if self.compresslevel is not None else zlib.Z_DEFAULT_COMPRESSION
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    data.write(compressor.compress(chunk))
+                    self.progress.update(read=len(chunk))
+            data.write(compressor.flush())
+        except Exception:
+            data.close()
+            raise
+        
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, size, data.tell()
+        data.seek(0)
+        return CompressedEntry(zinfo, data, source)
+    
+    def _write_entry(self, entry: CompressedEntry):
+        """把已压缩的成员以原始数据写入 ZIP"""
+        try:
+            self.progress.next_member(entry.zinfo.filename)
+            self.write_raw(entry.zinfo, entry.data, entry.source)
+            self.progress.update(written=entry.zinfo.compress_size)
+        finally:
+            entry.close()
+    
+    def write_raw(self, zinfo: zipfile.ZipInfo, data: Optional[BinaryIO], source: Optional[str] = None):
+        """写入一个 CRC 与大小均已确定的成员
+        
+        data 为压缩后的原始数据流；为 None 时从 source 复制未压缩的数据。
+        """
+        if data is not None:
+            write_raw_entry(self._zf, zinfo, data)
+        else:
+            with open(source, 'rb') as f:
+                write_raw_entry(self._zf, zinfo, f)
+    
+    def copy_entry(self, source: zipfile.ZipFile, info: zipfile.ZipInfo):
+        """把另一个 ZIP 中的成员原样复制过来 (不重新压缩)"""
+        self.progress.next_member(info.filename)
+        copy_entry(self._zf, source, info)
+        self.progress.update(read=info.compress_size, written=info.compress_size)
+    
+    def close(self):
+        """写出中央目录并关闭文件"""
+        self._zf.close()
+    
+    def __enter__(self) -> 'ParallelZipWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
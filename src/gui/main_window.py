@@ -7,15 +7,82 @@ GUI 主窗口 - 使用 Tkinter
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import queue
 import logging
+from collections import deque
 from pathlib import Path
 
 from core.archive_manager import ArchiveManager
+from core.jobs import Job, JobCancelled, JobManager
+from core.monitor import ArchiveMonitor
 from utils.helpers import format_size, format_datetime
 
+class UIDispatcher:
+    """工作线程到 Tk 主线程的事件分发器
+    
+    工作线程只把事件放入队列，不直接操作 Tk；主线程每隔 interval 毫秒统一
+    执行一次。post_latest 投递的同 key 事件在执行前会被合并，只保留最新的
+    参数 (用于进度这类高频更新)，并保持它第一次投递时在队列中的顺序。
+    """
+    
+    def __init__(self, root: tk.Tk, interval: int = 50):
+        self.root = root
+        self.interval = interval
+        self._events = deque()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self.root.after(self.interval, self._tick)
+    
+    def post(self, func, *args):
+        """投递一个必须执行的事件 (完成、出错等)"""
+        with self._lock:
+            self._events.append((None, func, args))
+    
+    def post_latest(self, key: str, func, *args):
+        """投递可合并的事件，同一 key 未执行前只保留最新一次"""
+        with self._lock:
+            if key not in self._latest:
+                self._events.append((key, None, None))
+            self._latest[key] = (func, args)
+    
+    def _tick(self):
+        """在主线程中执行积压的事件"""
+        with self._lock:
+            events, self._events = self._events, deque()
+            latest, self._latest = self._latest, {}
+        
+        for key, func, args in events:
+            if key is not None:
+                func, args = latest[key]
+            try:
+                func(*args)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"界面更新失败: {e}")
+        
+        self.root.after(self.interval, self._tick)
+
+
 class MainWindow:
     """主窗口类"""
     
+    # 列表每次从数据库读取的行数
+    PAGE_SIZE = 200
+    
+    # 详情窗口每次插入的成员条数
+    DETAILS_CHUNK_SIZE = 500
+    
+    # 任务状态的显示名称
+    JOB_STATUS_NAMES = {
+        Job.PENDING: '等待中', Job.RUNNING: '运行中', Job.PAUSED: '已暂停',
+        Job.COMPLETED: '已完成', Job.FAILED: '失败', Job.CANCELLED: '已取消'
+    }
+    
+    # 列标题与数据库排序列的对应关系
+    COLUMN_FIELDS = {
+        '名称': 'name', '路径': 'path', '大小': 'size',
+        '类型': 'type', '文件数': 'file_count', '修改时间': 'modified'
+    }
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("ZipMaster - 压缩包管理工具 v1.0")
@@ -34,11 +101,32 @@ class MainWindow:
         self.archive_manager = ArchiveManager()
         self.logger = logging.getLogger(__name__)
         
+        # 分页列表状态：排序方式、已加载的最后一行、是否还有下一页
+        self._paged = False
+        self._order_by = 'modified'
+        self._descending = True
+        self._last_row = None
+        self._has_more = False
+        self._page_pending = False
+        self._loaded_count = 0
+        
         # 创建界面
         self._create_widgets()
         self._setup_layout()
         self._setup_events()
         
+        # 后台线程的界面更新统一经由分发器在主线程执行
+        self.dispatcher = UIDispatcher(self.root)
+        
+        # 扫描、解压、创建都作为可取消、可暂停的后台任务运行
+        self.jobs = JobManager(listener=self._on_job_changed)
+        self.jobs_window = None
+        self.jobs_tree = None
+        
+        # 实时监控已扫描过的目录，变化时增量更新列表
+        self.monitor = ArchiveMonitor(self.archive_manager, listener=self._on_index_changed)
+        self.monitor.start()
+        
         # 加载现有数据
         self._load_archives()
     
@@ -55,6 +143,7 @@ class MainWindow:
         ttk.Button(self.toolbar, text="🗜️ 创建压缩包", command=self.create_archive).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.toolbar, text="🔍 查看详情", command=self.view_details).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.toolbar, text="🔄 刷新", command=self.refresh_list).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.toolbar, text="📋 任务", command=self.show_jobs).pack(side=tk.LEFT, padx=5)
         
         # 分隔符
         ttk.Separator(self.toolbar, orient='vertical').pack(side=tk.LEFT, fill=tk.Y, padx=10)
@@ -82,7 +171,7 @@ class MainWindow:
         # 滚动条
         v_scrollbar = ttk.Scrollbar(self.main_frame, orient=tk.VERTICAL, command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(self.main_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll, xscrollcommand=h_scrollbar.set)
         
         # 状态栏
         self.status_frame = ttk.Frame(self.root)
@@ -115,6 +204,8 @@ class MainWindow:
         action_menu.add_command(label="解压选中", command=self.extract_selected, accelerator="Ctrl+E")
         action_menu.add_command(label="创建压缩包", command=self.create_archive, accelerator="Ctrl+N")
         action_menu.add_command(label="查看详情", command=self.view_details, accelerator="Ctrl+I")
+        action_menu.add_separator()
+        action_menu.add_command(label="任务列表", command=self.show_jobs, accelerator="Ctrl+J")
         
         # 帮助菜单
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -150,6 +241,7 @@ class MainWindow:
         self.root.bind('<Control-e>', lambda e: self.extract_selected())
         self.root.bind('<Control-n>', lambda e: self.create_archive())
         self.root.bind('<Control-i>', lambda e: self.view_details())
+        self.root.bind('<Control-j>', lambda e: self.show_jobs())
         self.root.bind('<Control-q>', lambda e: self.root.quit())
         self.root.bind('<F5>', lambda e: self.refresh_list())
         
@@ -163,31 +255,72 @@ class MainWindow:
         self.tree.bind('<Button-3>', self._show_context_menu)
     
     def _load_archives(self):
-        """加载现有压缩包数据"""
+        """加载现有压缩包数据 (只读取第一页，其余在滚动时按需加载)"""
         try:
-            archives = self.archive_manager.get_all_archives()
-            self._populate_tree(archives)
-            self.status_var.set(f"加载了 {len(archives)} 个压缩包")
+            self.tree.delete(*self.tree.get_children())
+            self._paged = True
+            self._last_row = None
+            self._has_more = True
+            self._loaded_count = 0
+            self._load_next_page()
         except Exception as e:
             self.logger.error(f"加载数据失败: {e}")
             messagebox.showerror("错误", f"加载数据失败: {e}")
     
+    def _load_next_page(self):
+        """从数据库读取下一页并追加到列表"""
+        self._page_pending = False
+        if not self._has_more:
+            return
+        
+        archives = list(self.archive_manager.iter_archives(
+            after=self._last_row, limit=self.PAGE_SIZE,
+            order_by=self._order_by, descending=self._descending
+        ))
+        for archive in archives:
+            self._insert_archive(archive)
+        
+        self._loaded_count += len(archives)
+        self._has_more = len(archives) == self.PAGE_SIZE
+        if archives:
+            self._last_row = archives[-1]
+        
+        more = "，滚动加载更多" if self._has_more else ""
+        self.status_var.set(f"已加载 {self._loaded_count} 个压缩包{more}")
+    
+    def _on_tree_yscroll(self, first, last):
+        """列表滚动回调：接近底部时加载下一页"""
+        self.v_scrollbar.set(first, last)
+        if self._has_more and not self._page_pending and float(last) > 0.9:
+            self._page_pending = True
+            self.root.after_idle(self._load_next_page)
+    
+    def _insert_archive(self, archive, index=tk.END):
+        """向列表插入一行 (已存在时就地更新)"""
+        iid = str(archive['id']) if 'id' in archive else ''
+        values = (
+            archive['name'],
+            archive['path'],
+            format_size(archive['size']),
+            archive['type'].upper(),
+            archive.get('file_count', 0),
+            format_datetime(archive['modified'])
+        )
+        if iid and self.tree.exists(iid):
+            self.tree.item(iid, values=values)
+        else:
+            self.tree.insert('', index, iid=iid, values=values)
+    
     def _populate_tree(self, archives):
-        """填充文件列表"""
+        """填充文件列表 (用于搜索结果等一次性展示的数据，不分页)"""
         # 清空现有项目
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self._paged = False
+        self._has_more = False
         
         # 添加新项目
         for archive in archives:
-            self.tree.insert('', tk.END, values=(
-                archive['name'],
-                archive['path'],
-                format_size(archive['size']),
-                archive['type'].upper(),
-                archive.get('file_count', 0),
-                format_datetime(archive['modified'])
-            ))
+            self._insert_archive(archive)
     
     def scan_directory(self):
         """扫描目录"""
@@ -195,33 +328,74 @@ class MainWindow:
         if not directory:
             return
         
-        # 在后台线程中执行扫描
-        def scan_worker():
+        self.status_var.set("正在扫描...")
+        self.progress_var.set(0)
+        
+        # 作为后台任务执行扫描
+        def scan_worker(job):
+            def progress_callback(current, total):
+                # 每发现一个压缩包调用一次，只投递事件，由分发器合并后刷新界面
+                job.report_progress(current, total)
+                self.dispatcher.post_latest('scan', self._on_scan_progress, current, total)
+            
             try:
-                self.status_var.set("正在扫描...")
-                self.progress_var.set(0)
-                
-                def progress_callback(current, total):
-                    progress = (current / total) * 100 if total > 0 else 0
-                    self.progress_var.set(progress)
-                    self.root.update_idletasks()
-                
-                archives = self.archive_manager.scan_directory(directory, progress_callback)
-                
-                # 在主线程中更新UI
-                self.root.after(0, lambda: self._on_scan_complete(archives))
-                
+                archives = self.archive_manager.scan_directory(directory, progress_callback,
+                                                               checkpoint=job.checkpoint)
+                self.dispatcher.post(self._on_scan_complete, directory, archives)
+            except JobCancelled:
+                self.dispatcher.post(self._on_job_cancelled, "扫描")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: self._on_scan_error(e))
+                self.dispatcher.post(self._on_scan_error, e)
+                raise
         
-        threading.Thread(target=scan_worker, daemon=True).start()
+        self.jobs.submit(f"扫描 {directory}", scan_worker, kind='io')
     
-    def _on_scan_complete(self, archives):
+    def _on_scan_progress(self, current, total):
+        """扫描进度回调"""
+        if total > 0:
+            self.progress_var.set((current / total) * 100)
+        else:
+            # 总数未知时显示已发现的压缩包数量
+            self.status_var.set(f"正在扫描... 已发现 {current} 个压缩包")
+    
+    def _on_scan_complete(self, directory, archives):
         """扫描完成回调"""
-        self._populate_tree(archives)
-        self.status_var.set(f"扫描完成，找到 {len(archives)} 个压缩包")
+        self.monitor.add_root(directory)
+        self._load_archives()
+        stats = self.archive_manager.last_scan_stats
+        self.status_var.set(
+            f"扫描完成，找到 {len(archives)} 个压缩包 "
+            f"(新增 {stats.get('added', 0)}，更新 {stats.get('updated', 0)}，"
+            f"移除 {len(stats.get('removed', []))})"
+        )
         self.progress_var.set(0)
     
+    def _on_index_changed(self, changes):
+        """实时监控回调 (来自监控线程)"""
+        self.dispatcher.post(self._apply_index_changes, changes)
+    
+    def _apply_index_changes(self, changes):
+        """把索引变化以增量方式应用到列表，不重新加载整个列表"""
+        for archive in changes['removed']:
+            iid = str(archive['id'])
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+        
+        for archive in changes['updated']:
+            iid = str(archive['id'])
+            if self.tree.exists(iid):
+                self._insert_archive(archive)
+            elif self._paged:
+                # 新出现的压缩包放在列表顶部；搜索结果中不插入，避免混入不匹配的项
+                self._insert_archive(archive, 0)
+                self._loaded_count += 1
+        
+        self.status_var.set(
+            f"检测到文件变化：更新 {len(changes['updated'])} 个，"
+            f"移除 {len(changes['removed'])} 个压缩包"
+        )
+    
     def _on_scan_error(self, error):
         """扫描错误回调"""
         messagebox.showerror("错误", f"扫描失败: {error}")
@@ -240,32 +414,51 @@ class MainWindow:
             return
         
         # 在后台线程中执行解压
-        def extract_worker():
-            success_count = 0
-            total_count = len(selection)
+        archive_paths = [self.tree.item(item)['values'][1] for item in selection]
+        
+        def extract_worker(job):
+            total_count = len(archive_paths)
+            finished = [0]
+            lock = threading.Lock()
             
-            for i, item in enumerate(selection):
-                try:
-                    values = self.tree.item(item)['values']
-                    archive_path = values[1]
-                    archive_name = values[0]
-                    
-                    self.root.after(0, lambda name=archive_name: 
-                                  self.status_var.set(f"正在解压 {name}..."))
-                    
-                    success = self.archive_manager.extract_archive(archive_path, output_dir)
-                    if success:
-                        success_count += 1
-                    
-                    progress = ((i + 1) / total_count) * 100
-                    self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                    
-                except Exception as e:
-                    self.logger.error(f"解压失败: {e}")
+            def result_callback(result):
+                # 由批量解压的多个工作线程调用
+                with lock:
+                    finished[0] += 1
+                    count = finished[0]
+                state = "完成" if result['success'] else "失败"
+                text = f"[{count}/{total_count}] {Path(result['path']).name} 解压{state}"
+                self.dispatcher.post_latest('extract_status', self.status_var.set, text)
+            
+            def progress_callback(done, total, stats):
+                # 按已读取的字节数更新进度条
+                job.report_progress(done, total, stats)
+                percent = done / total * 100 if total else 0
+                text = f"正在解压... {format_size(done)} / {format_size(total)} ({format_size(int(stats['throughput']))}/s)"
+                self.dispatcher.post_latest('extract', self._on_progress, percent, text)
+            
+            try:
+                self.dispatcher.post(self.status_var.set, f"正在解压 {total_count} 个压缩包...")
+                results = self.archive_manager.extract_archives(
+                    archive_paths, output_dir, result_callback=result_callback,
+                    progress_callback=progress_callback, checkpoint=job.checkpoint
+                )
+                success_count = sum(1 for r in results if r['success'])
+            except JobCancelled:
+                self.dispatcher.post(self._on_job_cancelled, "解压")
+                raise
+            except Exception as e:
+                self.logger.error(f"解压失败: {e}")
+                success_count = 0
             
-            self.root.after(0, lambda: self._on_extract_complete(success_count, total_count))
+            self.dispatcher.post(self._on_extract_complete, success_count, total_count)
         
-        threading.Thread(target=extract_worker, daemon=True).start()
+        self.jobs.submit(f"解压 {len(archive_paths)} 个压缩包", extract_worker, kind='io')
+    
+    def _on_progress(self, progress, text):
+        """进度回调 (解压与创建共用)"""
+        self.progress_var.set(progress)
+        self.status_var.set(text)
     
     def _on_extract_complete(self, success_count, total_count):
         """解压完成回调"""
@@ -288,25 +481,46 @@ class MainWindow:
         archive_path = filedialog.asksaveasfilename(
             title="保存压缩包",
             defaultextension=".7z",
-            filetypes=[("7z 文件", "*.7z"), ("ZIP 文件", "*.zip")]
+            filetypes=[("7z 文件", "*.7z"), ("ZIP 文件", "*.zip"),
+                       ("TAR.GZ 文件", "*.tar.gz"), ("TAR 文件", "*.tar")]
         )
         
         if not archive_path:
             return
         
         # 确定格式
-        format_type = '7z' if archive_path.endswith('.7z') else 'zip'
-        
-        # 在后台线程中创建压缩包
-        def create_worker():
+        lower_path = archive_path.lower()
+        if lower_path.endswith('.7z'):
+            format_type = '7z'
+        elif lower_path.endswith(('.tar.gz', '.tgz')):
+            format_type = 'tar.gz'
+        elif lower_path.endswith('.tar'):
+            format_type = 'tar'
+        else:
+            format_type = 'zip'
+        
+        # 作为后台任务创建压缩包 (压缩属于 CPU 密集任务)
+        def create_worker(job):
+            def progress_callback(done, total, stats):
+                job.report_progress(done, total, stats)
+                percent = done / total * 100 if total else 0
+                text = f"正在创建压缩包... [{stats['member_index']}/{stats['member_count']}] {format_size(done)} / {format_size(total)}"
+                self.dispatcher.post_latest('create', self._on_progress, percent, text)
+            
             try:
-                self.root.after(0, lambda: self.status_var.set("正在创建压缩包..."))
-                success = self.archive_manager.create_archive(list(files), archive_path, format_type)
-                self.root.after(0, lambda: self._on_create_complete(success, archive_path))
+                self.dispatcher.post(self.status_var.set, "正在创建压缩包...")
+                success = self.archive_manager.create_archive(list(files), archive_path, format_type,
+                                                              progress_callback,
+                                                              checkpoint=job.checkpoint)
+                self.dispatcher.post(self._on_create_complete, success, archive_path)
+            except JobCancelled:
+                self.dispatcher.post(self._on_job_cancelled, "创建压缩包")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: self._on_create_error(e))
+                self.dispatcher.post(self._on_create_error, e)
+                raise
         
-        threading.Thread(target=create_worker, daemon=True).start()
+        self.jobs.submit(f"创建 {Path(archive_path).name}", create_worker, kind='cpu')
     
     def _on_create_complete(self, success, archive_path):
         """创建完成回调"""
@@ -317,12 +531,97 @@ class MainWindow:
             messagebox.showerror("错误", "创建压缩包失败")
         
         self.status_var.set("就绪")
+        self.progress_var.set(0)
     
     def _on_create_error(self, error):
         """创建错误回调"""
         messagebox.showerror("错误", f"创建压缩包失败: {error}")
         self.status_var.set("就绪")
     
+    def _on_job_cancelled(self, action):
+        """任务被取消回调"""
+        self.status_var.set(f"{action}已取消")
+        self.progress_var.set(0)
+    
+    def _on_job_changed(self, job):
+        """任务状态或进度变化 (来自任务线程)，合并后在主线程刷新任务列表"""
+        self.dispatcher.post_latest(f'job-{job.id}', self._refresh_job_row, job)
+    
+    def show_jobs(self):
+        """显示任务列表窗口"""
+        if self.jobs_window is not None:
+            self.jobs_window.deiconify()
+            self.jobs_window.lift()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("任务列表")
+        window.geometry("640x300")
+        
+        columns = ('任务', '类型', '状态', '进度')
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=10)
+        for col, width in zip(columns, (300, 60, 80, 160)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, minwidth=50)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        buttons = ttk.Frame(window)
+        buttons.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="暂停", command=lambda: self._apply_to_selected_jobs(Job.pause)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="继续", command=lambda: self._apply_to_selected_jobs(Job.resume)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="取消", command=lambda: self._apply_to_selected_jobs(Job.cancel)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="清除已结束", command=self._clear_finished_jobs).pack(side=tk.RIGHT, padx=5)
+        
+        def on_close():
+            self.jobs_window = None
+            self.jobs_tree = None
+            window.destroy()
+        
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        self.jobs_window = window
+        self.jobs_tree = tree
+        
+        for job in self.jobs.list_jobs():
+            self._refresh_job_row(job)
+    
+    def _refresh_job_row(self, job):
+        """在任务列表中插入或更新一行"""
+        if self.jobs_tree is None:
+            return
+        
+        done, total, _ = job.progress
+        if job.status == Job.COMPLETED:
+            progress = "100%"
+        elif total:
+            progress = f"{done / total:.0%}"
+        else:
+            progress = str(done) if done else ""
+        values = (job.name, job.kind, self.JOB_STATUS_NAMES.get(job.status, job.status), progress)
+        
+        iid = str(job.id)
+        if self.jobs_tree.exists(iid):
+            self.jobs_tree.item(iid, values=values)
+        else:
+            self.jobs_tree.insert('', 'end', iid=iid, values=values)
+    
+    def _apply_to_selected_jobs(self, action):
+        """对任务列表中选中的任务执行暂停、继续或取消"""
+        if self.jobs_tree is None:
+            return
+        for iid in self.jobs_tree.selection():
+            job = self.jobs.get(int(iid))
+            if job is not None:
+                action(job)
+    
+    def _clear_finished_jobs(self):
+        """从任务列表中移除已结束的任务"""
+        self.jobs.clear_finished()
+        if self.jobs_tree is None:
+            return
+        for iid in self.jobs_tree.get_children():
+            if self.jobs.get(int(iid)) is None:
+                self.jobs_tree.delete(iid)
+    
     def view_details(self):
         """查看压缩包详情"""
         selection = self.tree.selection()
@@ -338,56 +637,143 @@ class MainWindow:
         self._show_details_window(archive_path)
     
     def _show_details_window(self, archive_path):
-        """显示详情窗口"""
+        """显示详情窗口
+        
+        成员列表由后台线程流式读取，按块交给界面；只有在列表滚动到接近底部时
+        才插入下一块，因此内存占用与已浏览的条目数成正比，而不是与压缩包大小。
+        """
         details_window = tk.Toplevel(self.root)
         details_window.title(f"压缩包详情 - {Path(archive_path).name}")
         details_window.geometry("600x400")
         details_window.transient(self.root)
         
-        # 获取详情数据
-        try:
-            details = self.archive_manager.get_archive_details(archive_path)
-            
-            # 创建详情界面
-            info_frame = ttk.LabelFrame(details_window, text="基本信息", padding=10)
-            info_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            ttk.Label(info_frame, text=f"文件数量: {details['file_count']}").pack(anchor=tk.W)
-            ttk.Label(info_frame, text=f"原始大小: {format_size(details['total_size'])}").pack(anchor=tk.W)
-            ttk.Label(info_frame, text=f"压缩大小: {format_size(details['compressed_size'])}").pack(anchor=tk.W)
-            
-            if details['total_size'] > 0:
-                ratio = (1 - details['compressed_size'] / details['total_size']) * 100
-                ttk.Label(info_frame, text=f"压缩率: {ratio:.1f}%").pack(anchor=tk.W)
-            
-            # 文件列表
-            files_frame = ttk.LabelFrame(details_window, text="文件列表", padding=10)
-            files_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-            
-            # 创建文件列表
-            file_columns = ('文件名', '大小', '压缩大小', '修改时间')
-            file_tree = ttk.Treeview(files_frame, columns=file_columns, show='headings')
-            
-            for col in file_columns:
-                file_tree.heading(col, text=col)
-                file_tree.column(col, width=120)
-            
-            # 添加文件数据
-            for file_info in details['files'][:100]:  # 限制显示前100个文件
-                file_tree.insert('', tk.END, values=(
-                    file_info['name'],
-                    format_size(file_info['size']),
-                    format_size(file_info.get('compressed_size', 0)),
-                    format_datetime(file_info.get('modified', ''))
-                ))
-            
-            file_tree.pack(fill=tk.BOTH, expand=True)
+        # 创建详情界面
+        info_frame = ttk.LabelFrame(details_window, text="基本信息", padding=10)
+        info_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        count_var = tk.StringVar(value="文件数量: 读取中...")
+        size_var = tk.StringVar()
+        compressed_var = tk.StringVar()
+        ratio_var = tk.StringVar()
+        for var in (count_var, size_var, compressed_var, ratio_var):
+            ttk.Label(info_frame, textvariable=var).pack(anchor=tk.W)
+        
+        # 文件列表
+        files_frame = ttk.LabelFrame(details_window, text="文件列表", padding=10)
+        files_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # 创建文件列表
+        file_columns = ('文件名', '大小', '压缩大小', '修改时间')
+        file_tree = ttk.Treeview(files_frame, columns=file_columns, show='headings')
+        file_scrollbar = ttk.Scrollbar(files_frame, orient=tk.VERTICAL, command=file_tree.yview)
+        
+        for col in file_columns:
+            file_tree.heading(col, text=col)
+            file_tree.column(col, width=120)
+        
+        file_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        file_tree.pack(fill=tk.BOTH, expand=True)
+        
+        chunks = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        # pending 为已取出、等待插入的一项 (块需要等滚动回调，结束标记与错误立即处理)
+        state = {'count': 0, 'size': 0, 'compressed': 0, 'wanted': True, 'done': False,
+                 'pending': None}
+        
+        def put(item):
+            # 窗口关闭后不再阻塞，让后台线程尽快退出
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.2)
+                    return
+                except queue.Full:
+                    continue
+        
+        def reader_worker():
+            try:
+                chunk = []
+                for file_info in self.archive_manager.iter_archive_members(archive_path):
+                    if stop.is_set():
+                        return
+                    chunk.append(file_info)
+                    if len(chunk) >= self.DETAILS_CHUNK_SIZE:
+                        put(chunk)
+                        chunk = []
+                if chunk:
+                    put(chunk)
+                put(None)
+            except Exception as e:
+                put(e)
+        
+        def on_yscroll(first, last):
+            file_scrollbar.set(first, last)
+            if float(last) > 0.9:
+                state['wanted'] = True
+        
+        # 成员索引或详情缓存中有汇总时直接显示总数，否则按已读取的条目累计
+        totals = self.archive_manager.get_member_totals(archive_path)
+        
+        def update_summary():
+            if totals is not None:
+                count, size, compressed = totals['count'], totals['size'], totals['compressed_size']
+                suffix = "" if state['done'] else f" (已显示 {state['count']}，滚动查看更多)"
+            else:
+                count, size, compressed = state['count'], state['size'], state['compressed']
+                suffix = "" if state['done'] else " (读取中，滚动查看更多)"
+            count_var.set(f"文件数量: {count}{suffix}")
+            size_var.set(f"原始大小: {format_size(size)}")
+            compressed_var.set(f"压缩大小: {format_size(compressed)}")
+            if (totals is not None or state['done']) and size > 0:
+                ratio = (1 - compressed / size) * 100
+                ratio_var.set(f"压缩率: {ratio:.1f}%")
+        
+        def poll():
+            if stop.is_set():
+                return
             
-            if len(details['files']) > 100:
-                ttk.Label(files_frame, text=f"... 还有 {len(details['files']) - 100} 个文件未显示").pack()
+            while not state['done']:
+                if state['pending'] is None:
+                    try:
+                        state['pending'] = (chunks.get_nowait(),)
+                    except queue.Empty:
+                        break
+                
+                item, = state['pending']
+                if isinstance(item, list) and not state['wanted']:
+                    break
+                state['pending'] = None
+                
+                if item is None:
+                    state['done'] = True
+                elif isinstance(item, Exception):
+                    state['done'] = True
+                    count_var.set(f"获取详情失败: {item}")
+                    return
+                else:
+                    # 每次只插入一块，等滚动回调判断是否需要更多
+                    state['wanted'] = False
+                    for file_info in item:
+                        file_tree.insert('', tk.END, values=(
+                            file_info['name'],
+                            format_size(file_info['size']),
+                            format_size(file_info.get('compressed_size', 0)),
+                            format_datetime(file_info.get('modified', ''))
+                        ))
+                        state['count'] += 1
+                        state['size'] += file_info['size'] or 0
+                        state['compressed'] += file_info.get('compressed_size', 0) or 0
+                update_summary()
             
-        except Exception as e:
-            ttk.Label(details_window, text=f"获取详情失败: {e}").pack(padx=10, pady=10)
+            if not state['done']:
+                details_window.after(50, poll)
+        
+        file_tree.configure(yscrollcommand=on_yscroll)
+        details_window.bind('<Destroy>', lambda e: stop.set() if e.widget is details_window else None)
+        
+        threading.Thread(target=reader_worker, daemon=True).start()
+        if totals is not None:
+            update_summary()
+        poll()
     
     def search_archives(self):
         """搜索压缩包"""
@@ -409,6 +795,14 @@ class MainWindow:
     
     def _sort_column(self, col):
         """排序列"""
+        if self._paged:
+            # 分页列表交给数据库排序，重复点击同一列切换升降序
+            field = self.COLUMN_FIELDS[col]
+            self._descending = not self._descending if field == self._order_by else True
+            self._order_by = field
+            self._load_archives()
+            return
+        
         # 简单的排序实现
         items = [(self.tree.set(item, col), item) for item in self.tree.get_children('')]
         items.sort()
@@ -475,4 +869,7 @@ ZipMaster v1.0
         except Exception as e:
             messagebox.showerror("错误", f"应用运行失败: {e}")
         finally:
+            # 停止监控、取消未完成的任务并等待其退出后再关闭数据库
+            self.monitor.stop()
+            self.jobs.shutdown()
             self.archive_manager.close()
\ No newline at end of file
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行参数测试 - 全局选项写在子命令前后都有效
+"""
+
+import pytest
+
+from cli import DEFAULT_DB, build_parser
+
+
+@pytest.mark.parametrize('argv', [
+    ['--db', 'x.db', 'search', 'foo'],
+    ['search', 'foo', '--db', 'x.db'],
+    ['search', '--db', 'x.db', 'foo'],
+])
+def test_db_before_or_after_command(argv):
+    args = build_parser().parse_args(argv)
+    assert args.db == 'x.db'
+    assert args.keyword == 'foo'
+
+
+def test_defaults_are_kept():
+    args = build_parser().parse_args(['stats'])
+    assert args.db == DEFAULT_DB
+    assert args.verbose is False
+
+
+def test_verbose_after_command():
+    args = build_parser().parse_args(['--db', 'x.db', 'list', 'a.zip', '-v'])
+    assert args.db == 'x.db'
+    assert args.verbose is True
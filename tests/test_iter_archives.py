@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩包列表分页测试 - 逐页读取的结果必须与一次性排序一致
+"""
+
+import sqlite3
+
+import pytest
+
+from core.archive_manager import ArchiveManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_path = str(tmp_path / 'archives.db')
+    manager = ArchiveManager(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    for i in range(23):
+        # 每隔几条留空排序列，且有重复值
+        size = None if i % 4 == 0 else i % 5
+        conn.execute('INSERT INTO archives (name, path, size, file_count) VALUES (?, ?, ?, ?)',
+                     (f'a{i}.zip', f'/data/a{i}.zip', size, None))
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def _expected(manager, column, descending):
+    direction = 'DESC' if descending else 'ASC'
+    conn = sqlite3.connect(manager.db_path)
+    ids = [row[0] for row in conn.execute(
+        f'SELECT id FROM archives ORDER BY {column} {direction}, id {direction}')]
+    conn.close()
+    return ids
+
+
+@pytest.mark.parametrize('column', ['size', 'file_count', 'name'])
+@pytest.mark.parametrize('descending', [True, False])
+@pytest.mark.parametrize('page_size', [1, 3, 4, 100])
+def test_pages_include_null(manager, column, descending, page_size):
+    rows = manager.iter_archives(order_by=column, descending=descending, page_size=page_size)
+    assert [row['id'] for row in rows] == _expected(manager, column, descending)
+
+
+def test_resume_after_null_row(manager):
+    expected = _expected(manager, 'size', False)
+    rows = list(manager.iter_archives(order_by='size', descending=False, limit=2))
+    assert rows[-1]['size'] is None
+    rest = manager.iter_archives(after=rows[-1], order_by='size', descending=False, page_size=5)
+    assert [row['id'] for row in rows] + [row['id'] for row in rest] == expected
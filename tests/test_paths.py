@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成员路径映射测试 - 任何成员名都不能写到输出目录之外
+"""
+
+import os
+
+import pytest
+
+from core.paths import safe_member_path
+
+
+@pytest.mark.parametrize('name, parts', [
+    ('a/b.txt', ('a', 'b.txt')),
+    ('a\\b.txt', ('a', 'b.txt')),
+    ('/etc/passwd', ('etc', 'passwd')),
+    ('../../x.txt', ('x.txt',)),
+    ('a/./../b/', ('a', 'b')),
+])
+def test_member_path(tmp_path, name, parts):
+    assert safe_member_path(str(tmp_path), name) == os.path.join(str(tmp_path), *parts)
+
+
+@pytest.mark.parametrize('name', ['', '/', './..', '../'])
+def test_empty_member_path(tmp_path, name):
+    assert safe_member_path(str(tmp_path), name) is None
+
+
+def test_drive_is_stripped(tmp_path):
+    target = safe_member_path(str(tmp_path), 'C:/x.txt')
+    assert os.path.commonpath([str(tmp_path), target]) == str(tmp_path)
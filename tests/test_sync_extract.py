@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+同步解压测试 - 只写出变化的成员，只删除压缩包中没有的文件
+"""
+
+import os
+import zlib
+
+import pytest
+
+from core.archive_manager import ArchiveManager
+
+FORMATS = ['zip', '7z', 'tar.gz']
+
+# 修改时间取偶数秒，ZIP 的 DOS 时间 (2 秒精度) 可以精确表示
+MTIME = 1700000000
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ArchiveManager(db_path=str(tmp_path / 'archives.db'))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / 'src'
+    (root / 'sub').mkdir(parents=True)
+    contents = {'a.txt': b'alpha' * 100, 'b.bin': os.urandom(5000), 'sub/c.txt': b'gamma'}
+    for name, data in contents.items():
+        path = root / name
+        path.write_bytes(data)
+        os.utime(path, (MTIME, MTIME))
+    return root
+
+
+def _archive(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'src.{fmt}'
+    assert manager.create_archive([str(source)], str(archive), fmt)
+    return archive
+
+
+def _sync(manager, archive, output, **kwargs):
+    assert manager.extract_archive(str(archive), str(output), mode='sync', **kwargs)
+    return manager.last_extract_stats
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_rerun_skips_everything(manager, source, tmp_path, fmt):
+    archive = _archive(manager, source, tmp_path, fmt)
+    output = tmp_path / 'out'
+    
+    first = _sync(manager, archive, output)
+    assert first['extracted'] >= 3 and first['deleted'] == 0
+    assert (output / 'src' / 'sub' / 'c.txt').read_bytes() == b'gamma'
+    assert os.stat(output / 'src' / 'a.txt').st_mtime == MTIME
+    
+    second = _sync(manager, archive, output, verify_crc=True)
+    assert second['extracted'] == 0
+    assert second['skipped'] == first['extracted'] + first['skipped']
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_changed_member_is_rewritten(manager, source, tmp_path, fmt):
+    archive = _archive(manager, source, tmp_path, fmt)
+    output = tmp_path / 'out'
+    _sync(manager, archive, output)
+    
+    # 大小不同：不比较 CRC 也能发现
+    (output / 'src' / 'sub' / 'c.txt').write_bytes(b'changed')
+    stats = _sync(manager, archive, output)
+    assert stats['extracted'] == 1
+    assert (output / 'src' / 'sub' / 'c.txt').read_bytes() == b'gamma'
+    
+    # 大小与修改时间都相同：只有 CRC 能发现 (TAR 没有 CRC)
+    target = output / 'src' / 'a.txt'
+    target.write_bytes(b'x' * len(b'alpha' * 100))
+    os.utime(target, (MTIME, MTIME))
+    stats = _sync(manager, archive, output, verify_crc=True)
+    if fmt == 'tar.gz':
+        assert stats['extracted'] == 0
+    else:
+        assert stats['extracted'] == 1
+        assert target.read_bytes() == b'alpha' * 100
+    assert not [name for name in os.listdir(output / 'src') if name.endswith('.part')]
+
+
+def test_same_content_only_touches_mtime(manager, source, tmp_path):
+    archive = _archive(manager, source, tmp_path, 'zip')
+    output = tmp_path / 'out'
+    _sync(manager, archive, output)
+    
+    target = output / 'src' / 'a.txt'
+    os.utime(target, (MTIME, MTIME + 100))
+    inode = os.stat(target).st_ino
+    stats = _sync(manager, archive, output, verify_crc=True)
+    assert stats['extracted'] == 0
+    assert os.stat(target).st_mtime == MTIME
+    assert os.stat(target).st_ino == inode
+
+
+def test_delete_extraneous_only_removes_extraneous(manager, source, tmp_path):
+    archive = _archive(manager, source, tmp_path, 'zip')
+    output = tmp_path / 'out'
+    _sync(manager, archive, output)
+    
+    (output / 'junk.txt').write_bytes(b'junk')
+    (output / 'src' / 'sub' / 'junk.txt').write_bytes(b'junk')
+    (output / 'empty' / 'nested').mkdir(parents=True)
+    
+    stats = _sync(manager, archive, output, delete_extraneous=True)
+    assert stats == {'extracted': 0, 'skipped': stats['skipped'], 'deleted': 4}
+    assert sorted(os.listdir(output)) == ['src']
+    assert sorted(os.listdir(output / 'src')) == ['a.txt', 'b.bin', 'sub']
+    assert os.listdir(output / 'src' / 'sub') == ['c.txt']
+
+
+def test_delete_extraneous_requires_all_members(manager, source, tmp_path):
+    archive = _archive(manager, source, tmp_path, 'zip')
+    assert not manager.extract_archive(str(archive), str(tmp_path / 'out'), ['src/a.txt'],
+                                       mode='sync', delete_extraneous=True)
+
+
+def test_member_without_mtime(tmp_path):
+    target = tmp_path / 'a.txt'
+    target.write_bytes(b'alpha')
+    crc = zlib.crc32(b'alpha')
+    member = {'size': 5, 'modified': None, 'crc': crc}
+    up_to_date = ArchiveManager._output_up_to_date
+    
+    # 有 CRC 时按 CRC 判断
+    assert up_to_date(str(target), member, True, False)
+    assert not up_to_date(str(target), dict(member, crc=crc ^ 1), True, False)
+    # 没有 CRC 时只能比较大小，大小也未知时视为已变化
+    assert up_to_date(str(target), dict(member, crc=None), True, False)
+    assert not up_to_date(str(target), dict(member, crc=None), False, False)
+    assert not up_to_date(str(target), dict(member, size=6, crc=None), True, False)
+    assert not up_to_date(str(tmp_path / 'missing'), member, True, False)
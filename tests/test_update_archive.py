@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量更新测试 - 只写入变化的成员，失败时保持原压缩包不变
+"""
+
+import os
+import shutil
+import zipfile
+
+import pytest
+
+from core.archive_manager import ArchiveManager
+from core.jobs import JobCancelled
+
+FORMATS = ['zip', '7z']
+
+# 修改时间取偶数秒，ZIP 的 DOS 时间 (2 秒精度) 可以精确表示
+MTIME = 1700000000
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ArchiveManager(db_path=str(tmp_path / 'archives.db'))
+    yield manager
+    manager.close()
+
+
+def _write(path, data, mtime=MTIME):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / 'src'
+    _write(root / 'a.txt', b'alpha' * 100)
+    _write(root / 'b.bin', os.urandom(5000))
+    _write(root / 'sub' / 'c.txt', b'gamma')
+    return root
+
+
+def _members(archive):
+    """{成员名: 内容}，不含目录成员"""
+    if archive.suffix == '.zip':
+        with zipfile.ZipFile(archive) as zf:
+            assert zf.testzip() is None
+            return {info.filename: zf.read(info) for info in zf.infolist() if not info.is_dir()}
+    import py7zr
+    output = archive.parent / 'check'
+    shutil.rmtree(output, ignore_errors=True)
+    with py7zr.SevenZipFile(archive) as szf:
+        assert szf.testzip() is None
+        szf.reset()
+        szf.extractall(path=output)
+    return {path.relative_to(output).as_posix(): path.read_bytes()
+            for path in output.rglob('*') if path.is_file()}
+
+
+def _contents(root):
+    return {path.relative_to(root.parent).as_posix(): path.read_bytes()
+            for path in root.rglob('*') if path.is_file()}
+
+
+def _update(manager, archive, source, **kwargs):
+    assert manager.update_archive(str(archive), [str(source)], **kwargs)
+    return manager.last_update_stats
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_missing_archive_is_created(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'out.{fmt}'
+    stats = _update(manager, archive, source)
+    assert stats['added'] == 3
+    assert _members(archive) == _contents(source)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_unchanged_rerun_leaves_archive_alone(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'out.{fmt}'
+    _update(manager, archive, source)
+    before = archive.read_bytes()
+    
+    stats = _update(manager, archive, source, verify_crc=True)
+    assert stats == {'added': 0, 'replaced': 0, 'removed': 0, 'unchanged': 3}
+    assert archive.read_bytes() == before
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_addition_is_appended(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'out.{fmt}'
+    _update(manager, archive, source)
+    
+    _write(source / 'sub' / 'd.txt', b'delta')
+    stats = _update(manager, archive, source)
+    assert stats == {'added': 1, 'replaced': 0, 'removed': 0, 'unchanged': 3}
+    assert _members(archive) == _contents(source)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_same_size_edit_is_replaced(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'out.{fmt}'
+    _update(manager, archive, source)
+    
+    # 大小与修改时间都不变，小文件总是比较 CRC
+    _write(source / 'a.txt', b'ALPHA' * 100)
+    stats = _update(manager, archive, source)
+    assert stats == {'added': 0, 'replaced': 1, 'removed': 0, 'unchanged': 2}
+    assert _members(archive) == _contents(source)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_sync_removes_deleted_files(manager, source, tmp_path, fmt):
+    archive = tmp_path / f'out.{fmt}'
+    _update(manager, archive, source)
+    
+    os.remove(source / 'b.bin')
+    stats = _update(manager, archive, source, mode='append')
+    assert stats['removed'] == 0
+    assert 'src/b.bin' in _members(archive)
+    
+    stats = _update(manager, archive, source, mode='sync')
+    assert stats == {'added': 0, 'replaced': 0, 'removed': 1, 'unchanged': 2}
+    assert _members(archive) == _contents(source)
+
+
+def test_cancelled_append_restores_zip(manager, source, tmp_path):
+    archive = tmp_path / 'out.zip'
+    _update(manager, archive, source)
+    before = archive.read_bytes()
+    
+    _write(source / 'big.bin', os.urandom(3 * 1024 * 1024))
+    
+    def checkpoint():
+        # 新成员的数据已经写入压缩包之后再取消
+        if archive.stat().st_size > len(before):
+            raise JobCancelled()
+    
+    with pytest.raises(JobCancelled):
+        manager.update_archive(str(archive), [str(source)], checkpoint=checkpoint)
+    assert archive.read_bytes() == before
+
+
+def test_unsupported_format(manager, source, tmp_path):
+    assert not manager.update_archive(str(tmp_path / 'out.tar'), [str(source)])
+    assert not manager.update_archive(str(tmp_path / 'out.zip'), [str(source)], mode='mirror')
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ZIP 中央目录读取测试 - 结果必须与 zipfile 一致，损坏的文件必须报错
+"""
+
+import struct
+import zipfile
+
+import pytest
+
+from core import zipindex
+
+
+def _write_zip(path, count=20, comment=b''):
+    """写入 count 个成员 (大小各不相同，部分压缩)"""
+    with zipfile.ZipFile(path, 'w') as zf:
+        for i in range(count):
+            compress_type = zipfile.ZIP_DEFLATED if i % 2 else zipfile.ZIP_STORED
+            zf.writestr(f'dir/file{i}.txt', b'zipmaster ' * i * 50, compress_type)
+        zf.comment = comment
+    return path
+
+
+def _expected(path):
+    with zipfile.ZipFile(path) as zf:
+        return [(info.filename, info.file_size, info.compress_size, info.CRC)
+                for info in zf.infolist()]
+
+
+def _check(path):
+    entries = [entry[:4] for entry in zipindex.iter_entries(str(path))]
+    assert entries == _expected(path)
+    assert zipindex.count_entries(str(path)) == len(entries)
+
+
+def test_plain_zip(tmp_path):
+    _check(_write_zip(tmp_path / 'plain.zip'))
+
+
+def test_empty_zip(tmp_path):
+    path = _write_zip(tmp_path / 'empty.zip', count=0)
+    assert list(zipindex.iter_entries(str(path))) == []
+    assert zipindex.count_entries(str(path)) == 0
+
+
+@pytest.mark.parametrize('length', [1, 1000, 0xFFFF])
+def test_comment(tmp_path, length):
+    # 注释中含有 EOCD 签名也不能误判 (zipfile 本身会误判，期望值取自不带注释的同一压缩包)
+    comment = (b'PK\x05\x06' + b'c' * length)[:length]
+    expected = _expected(_write_zip(tmp_path / 'plain.zip'))
+    path = _write_zip(tmp_path / 'comment.zip', comment=comment)
+    assert [entry[:4] for entry in zipindex.iter_entries(str(path))] == expected
+    assert zipindex.count_entries(str(path)) == len(expected)
+
+
+def test_forced_zip64(tmp_path, monkeypatch):
+    monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 5)
+    monkeypatch.setattr(zipfile, 'ZIP64_LIMIT', 100)
+    path = _write_zip(tmp_path / 'zip64.zip')
+    assert b'PK\x06\x06' in path.read_bytes()
+    _check(path)
+
+
+def _insert_extensible_data(data, extensible):
+    """在 ZIP64 EOCD 记录末尾插入可扩展数据区，并修正记录大小与定位器中的偏移"""
+    locator = data.rfind(b'PK\x06\x07')
+    record = data.rfind(b'PK\x06\x06', 0, locator)
+    size, = struct.unpack_from('<Q', data, record + 4)
+    patched = bytearray(data[:locator] + extensible + data[locator:])
+    struct.pack_into('<Q', patched, record + 4, size + len(extensible))
+    return bytes(patched)
+
+
+def test_zip64_extensible_data_sector(tmp_path, monkeypatch):
+    monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 5)
+    path = _write_zip(tmp_path / 'zip64.zip')
+    expected = _expected(path)
+    patched = tmp_path / 'extensible.zip'
+    patched.write_bytes(_insert_extensible_data(path.read_bytes(), b'E' * 77))
+    
+    assert [entry[:4] for entry in zipindex.iter_entries(str(patched))] == expected
+    assert zipindex.count_entries(str(patched)) == len(expected)
+
+
+@pytest.mark.parametrize('zip64', [False, True])
+def test_prepended_data(tmp_path, monkeypatch, zip64):
+    if zip64:
+        monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 5)
+    path = _write_zip(tmp_path / 'plain.zip')
+    expected = _expected(path)
+    sfx = tmp_path / 'sfx.zip'
+    sfx.write_bytes(b'MZ' + b'\x00' * 70000 + path.read_bytes())
+    
+    assert [entry[:4] for entry in zipindex.iter_entries(str(sfx))] == expected
+    assert zipindex.central_directory_offset(str(sfx)) == \
+        zipindex.central_directory_offset(str(path)) + 70002
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.zip'
+    path.write_bytes(b'')
+    with pytest.raises(zipfile.BadZipFile):
+        zipindex.count_entries(str(path))
+
+
+def test_not_a_zip(tmp_path):
+    path = tmp_path / 'random.zip'
+    path.write_bytes(b'not a zip file' * 1000)
+    with pytest.raises(zipfile.BadZipFile):
+        zipindex.count_entries(str(path))
+
+
+@pytest.mark.parametrize('keep', [0.3, 0.9])
+def test_truncated(tmp_path, keep):
+    # 截掉开头使中央目录不完整 (EOCD 仍在)，不能返回错误的条目
+    data = _write_zip(tmp_path / 'plain.zip').read_bytes()
+    eocd = data.rfind(b'PK\x05\x06')
+    cd_offset, = struct.unpack_from('<L', data, eocd + 16)
+    cut = int(cd_offset + (eocd - cd_offset) * keep)
+    path = tmp_path / 'truncated.zip'
+    path.write_bytes(data[cut:])
+    with pytest.raises(zipfile.BadZipFile):
+        list(zipindex.iter_entries(str(path)))
+
+
+def test_truncated_tail(tmp_path):
+    data = _write_zip(tmp_path / 'plain.zip').read_bytes()
+    path = tmp_path / 'truncated.zip'
+    path.write_bytes(data[:-10])
+    with pytest.raises(zipfile.BadZipFile):
+        zipindex.count_entries(str(path))
+
+
+def test_corrupt_central_directory(tmp_path):
+    data = bytearray(_write_zip(tmp_path / 'plain.zip').read_bytes())
+    eocd = data.rfind(b'PK\x05\x06')
+    cd_offset, = struct.unpack_from('<L', data, eocd + 16)
+    # 破坏第三个中央目录文件头的签名
+    third = data.find(b'PK\x01\x02', data.find(b'PK\x01\x02', cd_offset + 4) + 4)
+    data[third:third + 4] = b'XXXX'
+    path = tmp_path / 'corrupt.zip'
+    path.write_bytes(bytes(data))
+    with pytest.raises(zipfile.BadZipFile):
+        list(zipindex.iter_entries(str(path)))
+
+
+def test_corrupt_zip64_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 5)
+    data = bytearray(_write_zip(tmp_path / 'zip64.zip').read_bytes())
+    record = data.rfind(b'PK\x06\x06')
+    data[record:record + 4] = b'XXXX'
+    path = tmp_path / 'corrupt.zip'
+    path.write_bytes(bytes(data))
+    with pytest.raises(zipfile.BadZipFile):
+        zipindex.count_entries(str(path))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行 ZIP 写入器测试 - 产物必须能被 zipfile 与 unzip -t 完整读取
+"""
+
+import os
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+
+from core.zipwriter import ParallelZipWriter, copy_entry
+
+
+def _make_sources(directory, sizes):
+    """按 {名称: 大小} 创建源文件 (一半随机、一半重复内容)，返回 [(路径, 名称, 内容)]"""
+    sources = []
+    for name, size in sizes.items():
+        data = os.urandom(size // 2) + b'zipmaster' * (size // 18) + b'x' * (size % 18)
+        path = directory / name.replace('/', '_')
+        path.write_bytes(data)
+        sources.append((str(path), name, data))
+    return sources
+
+
+def _check_archive(archive_path, expected):
+    """按顺序核对成员名称与内容，并用 zipfile 与 unzip -t 校验 CRC"""
+    with zipfile.ZipFile(archive_path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [name for name, _ in expected]
+        for name, data in expected:
+            assert zf.read(name) == data
+    
+    if shutil.which('unzip'):
+        result = subprocess.run(['unzip', '-tq', str(archive_path)], stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        assert result.returncode == 0, result.stdout
+
+
+# 故意不按字母顺序，检查写出顺序与提交顺序一致
+SIZES = {'z.txt': 5000, 'dir/a.bin': 300000, 'empty.txt': 0, 'm.txt': 1, 'b.txt': 70000}
+
+
+@pytest.mark.parametrize('compress_type', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_round_trip_preserves_order(tmp_path, compress_type):
+    sources = _make_sources(tmp_path, SIZES)
+    archive = tmp_path / 'out.zip'
+    with ParallelZipWriter(str(archive), compress_type, max_workers=4) as writer:
+        writer.write_all((path, name) for path, name, _ in sources)
+    
+    _check_archive(archive, [(name, data) for _, name, data in sources])
+    with zipfile.ZipFile(archive) as zf:
+        assert {info.compress_type for info in zf.infolist()} == {compress_type}
+
+
+def test_empty_files(tmp_path):
+    sources = _make_sources(tmp_path, {'a.txt': 0, 'b.txt': 0})
+    archive = tmp_path / 'out.zip'
+    with ParallelZipWriter(str(archive)) as writer:
+        writer.write_all((path, name) for path, name, _ in sources)
+    
+    _check_archive(archive, [('a.txt', b''), ('b.txt', b'')])
+    with zipfile.ZipFile(archive) as zf:
+        assert [info.file_size for info in zf.infolist()] == [0, 0]
+
+
+def test_store_incompressible(tmp_path):
+    sources = _make_sources(tmp_path, {'photo.jpg': 4000, 'notes.txt': 4000})
+    archive = tmp_path / 'out.zip'
+    with ParallelZipWriter(str(archive), store_incompressible=True) as writer:
+        writer.write_all((path, name) for path, name, _ in sources)
+    
+    _check_archive(archive, [(name, data) for _, name, data in sources])
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.getinfo('photo.jpg').compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo('notes.txt').compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_zip64(tmp_path, monkeypatch):
+    # 调低 zipfile 的限制，不必生成 4 GiB 的文件也能写出 ZIP64 记录
+    monkeypatch.setattr(zipfile, 'ZIP64_LIMIT', 1000)
+    monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 3)
+    sources = _make_sources(tmp_path, SIZES)
+    archive = tmp_path / 'out.zip'
+    with ParallelZipWriter(str(archive), max_workers=2) as writer:
+        writer.write_all((path, name) for path, name, _ in sources)
+    
+    assert b'PK\x06\x06' in archive.read_bytes()
+    _check_archive(archive, [(name, data) for _, name, data in sources])
+
+
+def test_append_keeps_existing_members(tmp_path):
+    first = _make_sources(tmp_path, {'one.txt': 1000, 'two.txt': 0})
+    second = _make_sources(tmp_path, {'three.txt': 20000})
+    archive = tmp_path / 'out.zip'
+    with ParallelZipWriter(str(archive)) as writer:
+        writer.write_all((path, name) for path, name, _ in first)
+    with ParallelZipWriter(str(archive), mode='a') as writer:
+        writer.write_all((path, name) for path, name, _ in second)
+    
+    _check_archive(archive, [(name, data) for _, name, data in first + second])
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_copy_entry_from_prepended_archive(tmp_path, parallel):
+    sources = _make_sources(tmp_path, SIZES)
+    plain = tmp_path / 'plain.zip'
+    with zipfile.ZipFile(plain, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for path, name, _ in sources:
+            zf.write(path, name)
+    # 自解压程序式的前置数据
+    sfx = tmp_path / 'sfx.zip'
+    sfx.write_bytes(b'MZ' + os.urandom(5000) + plain.read_bytes())
+    
+    archive = tmp_path / 'copy.zip'
+    with zipfile.ZipFile(sfx) as source:
+        infos = source.infolist()
+        if parallel:
+            with ParallelZipWriter(str(archive)) as writer:
+                for info in infos:
+                    writer.copy_entry(source, info)
+        else:
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_LZMA) as target:
+                for info in infos:
+                    copy_entry(target, source, info)
+    
+    _check_archive(archive, [(name, data) for _, name, data in sources])